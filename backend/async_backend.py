@@ -0,0 +1,101 @@
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from backend.library_backend import LibraryBackend
+
+class AsyncLibraryBackend:
+    """asyncio facade over LibraryBackend.
+
+    Every public LibraryBackend method is available as a coroutine that runs
+    on a bounded thread pool. Each worker thread checks out its own pooled
+    connection, so independent calls awaited together really run in parallel.
+    """
+    def __init__(self, backend=None, max_workers=None):
+        self.backend = backend or LibraryBackend()
+        
+        # One worker per pooled connection, so workers never wait on the pool
+        if max_workers is None:
+            max_workers = self.backend.db.pool_max_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="library-backend")
+    
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking callable on the backend executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    async def gather(self, *calls):
+        """Run several (method_name, *args) calls concurrently, results in order"""
+        return await asyncio.gather(*(getattr(self, name)(*args) for name, *args in calls))
+    
+    # ========== CONCURRENT HELPERS ==========
+    
+    async def get_system_statistics(self):
+        """Get comprehensive system statistics, running the queries concurrently"""
+        book_stats, borrower_stats, transaction_stats, overdue_books = await asyncio.gather(
+            self.get_book_statistics(),
+            self.get_borrower_statistics(),
+            self.get_transaction_statistics(),
+            self.get_overdue_books()
+        )
+        return LibraryBackend._combine_statistics(book_stats, borrower_stats,
+                                                 transaction_stats, overdue_books)
+    
+    async def get_borrowers_report_data(self):
+        """Get borrowers, active loans and overdue books for the borrowers report at once"""
+        return await asyncio.gather(
+            self.get_all_borrowers(),
+            self.get_active_loans(),
+            self.get_overdue_books()
+        )
+    
+    def close(self):
+        """Stop the worker threads"""
+        self.executor.shutdown(wait=True)
+
+def _async_method(name):
+    """Coroutine wrapper for a LibraryBackend method"""
+    async def method(self, *args, **kwargs):
+        return await self.run(getattr(self.backend, name), *args, **kwargs)
+    
+    method.__name__ = name
+    method.__doc__ = getattr(LibraryBackend, name).__doc__
+    return method
+
+def _async_iter_method(name):
+    """Async generator wrapper for a streaming LibraryBackend method"""
+    async def method(self, *args, **kwargs):
+        rows = getattr(self.backend, name)(*args, **kwargs)
+        chunk_size = kwargs.get('chunk_size', 500)
+        
+        def next_chunk():
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    break
+            return chunk
+        
+        try:
+            while True:
+                chunk = await self.run(next_chunk)
+                if not chunk:
+                    break
+                for row in chunk:
+                    yield row
+        finally:
+            await self.run(rows.close)
+    
+    method.__name__ = name
+    method.__doc__ = getattr(LibraryBackend, name).__doc__
+    return method
+
+# Generate async versions of every public method not defined by hand above
+for _name, _func in inspect.getmembers(LibraryBackend, inspect.isfunction):
+    if _name.startswith('_') or hasattr(AsyncLibraryBackend, _name):
+        continue
+    if _name.startswith('iter_'):
+        setattr(AsyncLibraryBackend, _name, _async_iter_method(_name))
+    else:
+        setattr(AsyncLibraryBackend, _name, _async_method(_name))
@@ -0,0 +1,137 @@
+import threading
+from bisect import bisect_left, insort
+
+from backend.search_index import STOPWORDS, tokenize
+
+# Later words of a value also start a key ("lord" finds "The Lord of the Rings"), up to this many
+MAX_WORD_STARTS = 4
+
+def normalize(text):
+    """Lower-case, accent-free words of text joined by single spaces"""
+    return " ".join(tokenize(text))
+
+class PrefixIndex:
+    """Sorted-array prefix index for autocomplete over a few text fields.
+
+    Every value is kept normalized in one sorted list of (key, row_id)
+    entries, once from its start and once from each of its first later
+    words. A lookup bisects to the typed prefix and walks forward only as
+    far as it needs, so it costs O(log n + limit) however big the table is.
+    Values of compact_fields (ISBNs) are keyed without separators, so
+    "9780441" and "978-0-441" find the same book.
+    """
+    def __init__(self, id_field, fields, compact_fields=()):
+        self.id_field = id_field
+        self.fields = tuple(fields)
+        self.compact_fields = frozenset(compact_fields)
+        self._entries = []         # sorted (key, row_id)
+        self._documents = {}       # row id -> tuple of its keys
+        self._lock = threading.RLock()
+
+        # Kept by LibraryBackend to know when to catch up with the table
+        self.sync_lock = threading.Lock()
+        self.built = False
+        self.synced_version = None
+        self.max_id = 0
+
+    # ========== UPDATES ==========
+
+    def build(self, rows):
+        """Index every row from scratch"""
+        entries = []
+        documents = {}
+        max_id = 0
+        for row in rows:
+            row_id = row[self.id_field]
+            keys = self._keys(row)
+            documents[row_id] = keys
+            entries.extend((key, row_id) for key in keys)
+            max_id = max(max_id, row_id)
+        entries.sort()
+
+        with self._lock:
+            self._entries = entries
+            self._documents = documents
+            self.max_id = max_id
+            self.built = True
+
+    def add(self, row):
+        """Index a new or changed row"""
+        row_id = row[self.id_field]
+        keys = self._keys(row)
+        with self._lock:
+            self._remove(row_id)
+            self._documents[row_id] = keys
+            for key in keys:
+                insort(self._entries, (key, row_id))
+            self.max_id = max(self.max_id, row_id)
+
+    def remove(self, row_id):
+        """Drop a deleted row"""
+        with self._lock:
+            self._remove(row_id)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _remove(self, row_id):
+        for key in self._documents.pop(row_id, ()):
+            index = bisect_left(self._entries, (key, row_id))
+            if index < len(self._entries) and self._entries[index] == (key, row_id):
+                del self._entries[index]
+
+    def _keys(self, row):
+        keys = set()
+        for field in self.fields:
+            words = tokenize(row.get(field))
+            if not words:
+                continue
+            if field in self.compact_fields:
+                keys.add("".join(words))
+                continue
+            keys.add(" ".join(words))
+            starts = [index for index in range(1, len(words)) if words[index] not in STOPWORDS]
+            for index in starts[:MAX_WORD_STARTS]:
+                keys.add(" ".join(words[index:]))
+        return tuple(keys)
+
+    # ========== LOOKUP ==========
+
+    def complete(self, text, limit=20):
+        """Ids of up to limit rows with a key starting with text, in key order"""
+        prefixes = {normalize(text)}
+        if self.compact_fields:
+            prefixes.add("".join(tokenize(text)))
+
+        with self._lock:
+            # One ordered walk per prefix form, merged on the key
+            matches = []
+            for prefix in prefixes:
+                index = bisect_left(self._entries, (prefix,))
+                found = set()
+                while index < len(self._entries) and len(found) < limit:
+                    key, row_id = self._entries[index]
+                    if not key.startswith(prefix):
+                        break
+                    matches.append((key, row_id))
+                    found.add(row_id)
+                    index += 1
+
+        matches.sort()
+        ids = []
+        seen = set()
+        for _, row_id in matches:
+            if row_id not in seen:
+                seen.add(row_id)
+                ids.append(row_id)
+                if len(ids) == limit:
+                    break
+        return ids
+
+    def stats(self):
+        with self._lock:
+            return {
+                'built': self.built,
+                'rows': len(self._documents),
+                'keys': len(self._entries)
+            }
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+class EntityCache:
+    """Thread-safe LRU cache of database rows keyed on primary key, with a TTL.
+
+    Rows are handed out as copies so a caller editing the dict cannot change
+    what later callers see. Writes through LibraryBackend invalidate the
+    affected keys; the TTL bounds staleness from writes made elsewhere.
+    """
+    def __init__(self, name, max_size=1000, ttl=60.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Bumped by every invalidation, so a load that raced one is not stored
+        self._generation = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, loader):
+        """Get the row for key, calling loader(key) on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._rows.get(key)
+            if entry is not None:
+                row, expires_at = entry
+                if now < expires_at:
+                    self._rows.move_to_end(key)
+                    self.hits += 1
+                    return dict(row)
+                del self._rows[key]
+                self.expired += 1
+            self.misses += 1
+            generation = self._generation
+
+        row = loader(key)
+        if row is not None:
+            self.put(key, row, generation)
+        return dict(row) if row is not None else None
+
+    def put(self, key, row, generation=None):
+        """Store a freshly loaded row, unless it was invalidated while loading"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._rows[key] = (dict(row), time.monotonic() + self.ttl)
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.max_size:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Forget the row for key after it was changed or deleted"""
+        with self._lock:
+            self._generation += 1
+            if self._rows.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Forget every row"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._rows)
+            self._rows.clear()
+
+    def stats(self):
+        """Snapshot of cache usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._rows),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
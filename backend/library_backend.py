@@ -1,28 +1,188 @@
 from database.db_connection import get_db_connection
+from database.statements import describe
+from backend.entity_cache import EntityCache
+from backend.result_cache import ResultCache, cached_result
+from backend.search_index import CatalogIndex
+from backend.trigram_index import TrigramIndex
+from backend.autocomplete import PrefixIndex, normalize
+from utils.helpers import validate_book_data, validate_borrower_data
 from datetime import datetime, timedelta
+import hashlib
 import logging
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
+# Shared by the list and streaming variants
+ALL_BOOKS_QUERY = """
+SELECT book_id, title, author, isbn, category, year, 
+       copies, available_copies, 
+       DATE(created_at) as created_date
+FROM books 
+ORDER BY title
+"""
+
+ALL_TRANSACTIONS_QUERY = """
+SELECT t.transaction_id, t.book_id, t.borrower_id,
+       DATE(t.borrow_date) as borrow_date,
+       DATE(t.due_date) as due_date,
+       DATE(t.return_date) as return_date,
+       t.status, t.fine_amount, t.created_at,
+       b.title, b.author,
+       br.name as borrower_name, br.email
+FROM transactions t
+JOIN books b ON t.book_id = b.book_id
+JOIN borrowers br ON t.borrower_id = br.borrower_id
+ORDER BY t.created_at DESC
+"""
+
+# Report over a borrow date range, read through idx_borrow_date
+TRANSACTIONS_BETWEEN_QUERY = """
+SELECT t.transaction_id, DATE(t.borrow_date) as borrow_date, t.status, t.fine_amount
+FROM transactions t
+WHERE t.borrow_date BETWEEN %s AND %s
+ORDER BY t.borrow_date
+"""
+
+# Keyset-paginated listings: past the first page {where} seeks beyond the sort
+# key of the last row shown, so every page is an index range, never an OFFSET.
+# The seeks are written "key >= x AND (...)" so the range alone bounds the scan
+BOOKS_PAGE_QUERY = """
+SELECT book_id, title, author, isbn, category, year, 
+       copies, available_copies, 
+       DATE(created_at) as created_date
+FROM books 
+{where}
+ORDER BY title, book_id
+LIMIT %s
+"""
+BOOKS_SEEK = "title >= %s AND (title > %s OR book_id > %s)"
+
+BORROWERS_PAGE_QUERY = """
+SELECT borrower_id, name, email, phone, address, 
+       DATE(created_date) as registered_date,
+       (SELECT COUNT(*) FROM transactions 
+        WHERE borrower_id = borrowers.borrower_id AND status = 'borrowed') as active_loans
+FROM borrowers 
+{where}
+ORDER BY name, borrower_id
+LIMIT %s
+"""
+BORROWERS_SEEK = "name >= %s AND (name > %s OR borrower_id > %s)"
+
+# Borrower search returns each hit's active-loan count with it, one query per search
+BORROWER_SEARCH_QUERY = """
+SELECT borrowers.*,
+       (SELECT COUNT(*) FROM transactions 
+        WHERE borrower_id = borrowers.borrower_id AND status = 'borrowed') as active_loans
+FROM borrowers 
+WHERE {condition}
+ORDER BY {order}
+"""
+
+TRANSACTIONS_PAGE_QUERY = """
+SELECT t.transaction_id, t.book_id, t.borrower_id,
+       DATE(t.borrow_date) as borrow_date,
+       DATE(t.due_date) as due_date,
+       DATE(t.return_date) as return_date,
+       t.status, t.fine_amount, t.created_at,
+       b.title, b.author,
+       br.name as borrower_name, br.email
+FROM transactions t
+JOIN books b ON t.book_id = b.book_id
+JOIN borrowers br ON t.borrower_id = br.borrower_id
+{where}
+ORDER BY t.created_at DESC, t.transaction_id DESC
+LIMIT %s
+"""
+TRANSACTIONS_SEEK = "t.created_at <= %s AND (t.created_at < %s OR t.transaction_id < %s)"
+
+# Key of the history row at an OFFSET, read from idx_created_at alone, for jumping into the list
+TRANSACTIONS_CURSOR_QUERY = """
+SELECT t.created_at, t.transaction_id
+FROM transactions t
+{where}
+ORDER BY t.created_at DESC, t.transaction_id DESC
+LIMIT 1 OFFSET %s
+"""
+
+# Row caches shared by every LibraryBackend (each page creates its own backend)
+BOOK_CACHE = EntityCache("books", max_size=2000, ttl=60.0)
+BORROWER_CACHE = EntityCache("borrowers", max_size=2000, ttl=60.0)
+
+# Report and statistics results, valid until a table they read changes
+RESULT_CACHE = ResultCache(max_size=256, ttl=300.0)
+
+# Full-text index of the catalog, built on the first search_catalog() call
+SEARCH_INDEX = CatalogIndex()
+SEARCH_FIELDS_QUERY = "SELECT book_id, title, author, category, isbn FROM books"
+
+# Typo-tolerant indexes, saved to INDEX_DIR on exit so startup can skip rebuilding them
+BOOK_FUZZY_INDEX = TrigramIndex("book_id", ("title", "author"))
+BORROWER_FUZZY_INDEX = TrigramIndex("borrower_id", ("name", "email"))
+BOOK_FUZZY_QUERY = "SELECT book_id, title, author FROM books"
+BORROWER_FUZZY_QUERY = "SELECT borrower_id, name, email FROM borrowers"
+INDEX_DIR = os.environ.get("LIBRARY_INDEX_DIR", os.path.join(os.path.expanduser("~"), ".library_index"))
+
+# Prefix indexes behind the borrow form's type-ahead comboboxes
+BOOK_COMPLETION_INDEX = PrefixIndex("book_id", ("title", "isbn"), compact_fields=("isbn",))
+BORROWER_COMPLETION_INDEX = PrefixIndex("borrower_id", ("name", "email"))
+BOOK_COMPLETION_QUERY = "SELECT book_id, title, isbn FROM books"
+BORROWER_COMPLETION_QUERY = "SELECT borrower_id, name, email FROM borrowers"
+
+# A saved index older than this is rebuilt, to pick up edits made by other desks
+INDEX_MAX_AGE = 24 * 3600
+
+def _cache_key(entity_id):
+    """Treeview values arrive as strings; key the caches on the integer id"""
+    try:
+        return int(entity_id)
+    except (TypeError, ValueError):
+        return entity_id
+
 class LibraryBackend:
     def __init__(self):
         self.db = get_db_connection()
+        self.book_cache = BOOK_CACHE
+        self.borrower_cache = BORROWER_CACHE
+        self.result_cache = RESULT_CACHE
+        self.search_index = SEARCH_INDEX
+        self.book_fuzzy_index = BOOK_FUZZY_INDEX
+        self.borrower_fuzzy_index = BORROWER_FUZZY_INDEX
+        self.book_completion_index = BOOK_COMPLETION_INDEX
+        self.borrower_completion_index = BORROWER_COMPLETION_INDEX
     
     # ========== BOOK MANAGEMENT ==========
     
-    def get_all_books(self):
+    def get_all_books(self, row_format="dict"):
         """Get all books from database"""
-        query = """
-        SELECT book_id, title, author, isbn, category, year, 
-               copies, available_copies, 
-               DATE(created_at) as created_date
-        FROM books 
-        ORDER BY title
-        """
-        return self.db.execute_query(query, fetch=True) or []
+        return self.db.execute_query(ALL_BOOKS_QUERY, fetch=True, row_format=row_format) or []
+    
+    def iter_all_books(self, chunk_size=500, row_format="dict"):
+        """Stream all books without loading the whole catalog into memory"""
+        return self.db.iter_query(ALL_BOOKS_QUERY, chunk_size=chunk_size, row_format=row_format)
+    
+    def get_books_page(self, after=None, limit=100):
+        """One page of books by title; after is the (title, book_id) of the previous page's last row"""
+        return self._keyset_page(BOOKS_PAGE_QUERY, BOOKS_SEEK, after, limit)
+    
+    def _keyset_page(self, query, seek, after, limit, filters=(), params=()):
+        """Run a *_PAGE_QUERY, seeking past the (sort value, id) cursor after"""
+        conditions = list(filters)
+        params = list(params)
+        if after is not None:
+            value, row_id = after
+            conditions.append(f"({seek})")
+            params.extend((value, value, row_id))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.db.execute_query(query.format(where=where), params + [limit], fetch=True) or []
     
     def get_book_by_id(self, book_id):
-        """Get book details by ID"""
+        """Get book details by ID (served from the book cache when fresh)"""
+        return self.book_cache.get(_cache_key(book_id), self._load_book)
+    
+    def _load_book(self, book_id):
         query = "SELECT * FROM books WHERE book_id = %s"
         result = self.db.execute_query(query, (book_id,), fetch=True)
         return result[0] if result else None
@@ -43,18 +203,165 @@ class LibraryBackend:
         
         return self.db.execute_query(query, (f"%{search_term}%",), fetch=True) or []
     
+    def search_catalog(self, search_text, limit=100):
+        """Ranked full-text search over title, author, category and ISBN
+        
+        Every word must match (the last one may be a prefix); results come
+        back best match first.
+        """
+        self._sync_search_index()
+        ranked = self.search_index.search(search_text, limit)
+        return self._rows_by_id("books", "book_id", [book_id for book_id, _ in ranked])
+    
+    def fuzzy_search_books(self, search_text, limit=50, threshold=None):
+        """Typo-tolerant search over title and author, closest match first"""
+        self._sync_index(self.book_fuzzy_index, BOOK_FUZZY_QUERY, "books", "book_id", "books_fuzzy")
+        ranked = self.book_fuzzy_index.search(search_text, limit, threshold)
+        return self._rows_by_id("books", "book_id", [book_id for book_id, _ in ranked])
+    
+    def _rows_by_id(self, table, id_column, ids):
+        """Fetch rows by primary key, in the order of ids"""
+        if not ids:
+            return []
+        placeholders = ", ".join(["%s"] * len(ids))
+        query = f"SELECT * FROM {table} WHERE {id_column} IN ({placeholders})"
+        rows = {row[id_column]: row for row in self.db.execute_query(query, ids, fetch=True) or []}
+        return [rows[row_id] for row_id in ids if row_id in rows]
+    
+    def _sync_search_index(self):
+        self._sync_index(self.search_index, SEARCH_FIELDS_QUERY, "books", "book_id")
+    
+    def _sync_index(self, index, fields_query, table, id_column, saved_name=None):
+        """Build a search index (or load its saved copy), then pick up rows added since"""
+        with index.sync_lock:
+            version = self.db.table_versions.snapshot((table,))
+            if index.built and index.synced_version == version:
+                return
+            
+            loaded = False
+            if not index.built and saved_name:
+                loaded = index.load(self._index_path(saved_name))
+            
+            if index.built:
+                query = f"{fields_query} WHERE {id_column} > %s"
+                rows = self.db.execute_query(query, (index.max_id,), fetch=True)
+                if rows is None:
+                    # Database unreachable: stay unsynced so the next search catches up,
+                    # and have a just-loaded copy checked again then
+                    if loaded:
+                        index.built = False
+                    return
+                for row in rows:
+                    index.add(row)
+            
+            # A saved copy that missed deletes or is too old is rebuilt instead
+            if loaded:
+                count = self.db.execute_query(f"SELECT COUNT(*) as count FROM {table}", fetch=True)
+                if (not count or count[0]['count'] != len(index)
+                        or time.time() - (index.built_at or 0) > INDEX_MAX_AGE):
+                    index.built = False
+            
+            if not index.built:
+                try:
+                    index.build(self.db.iter_query(fields_query))
+                except Exception as e:
+                    # A half-read table must not be searched, saved or marked synced
+                    logger.error(f"Could not build the {table} search index: {e}")
+                    index.built = False
+                    return
+                if saved_name:
+                    self._save_index(index, saved_name)
+            index.synced_version = version
+    
+    def _index_path(self, name):
+        # One file per database, so the SQLite and MariaDB copies never mix
+        target = self.db.engine.describe() if self.db.engine else self.db.database
+        digest = hashlib.sha1(target.encode()).hexdigest()[:10]
+        return os.path.join(INDEX_DIR, f"{name}-{digest}.pickle")
+    
+    def _save_index(self, index, name):
+        try:
+            index.save(self._index_path(name))
+        except OSError as e:
+            logger.warning(f"Could not save search index {name}: {e}")
+    
+    def warm_search_indexes(self):
+        """Build or load every search index now, so the first search does not pay for it"""
+        self._sync_search_index()
+        self._sync_index(self.book_fuzzy_index, BOOK_FUZZY_QUERY, "books", "book_id", "books_fuzzy")
+        self._sync_index(self.borrower_fuzzy_index, BORROWER_FUZZY_QUERY,
+                         "borrowers", "borrower_id", "borrowers_fuzzy")
+        self._sync_index(self.book_completion_index, BOOK_COMPLETION_QUERY, "books", "book_id")
+        self._sync_index(self.borrower_completion_index, BORROWER_COMPLETION_QUERY,
+                         "borrowers", "borrower_id")
+    
+    def save_search_indexes(self):
+        """Write the typo-tolerant indexes to disk (called on exit)"""
+        if self.book_fuzzy_index.built:
+            self._save_index(self.book_fuzzy_index, "books_fuzzy")
+        if self.borrower_fuzzy_index.built:
+            self._save_index(self.borrower_fuzzy_index, "borrowers_fuzzy")
+    
     def add_book(self, title, author, isbn, category, year, copies):
         """Add a new book to the database"""
         query = """
         INSERT INTO books (title, author, isbn, category, year, copies, available_copies)
         VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
-        return self.db.execute_query(query, (title, author, isbn, category, year, copies, copies))
+        book_id = self.db.execute_query(query, (title, author, isbn, category, year, copies, copies))
+        if book_id:
+            self._index_book({'book_id': book_id, 'title': title, 'author': author,
+                              'category': category, 'isbn': isbn})
+        return book_id
+    
+    def _index_book(self, book):
+        """Keep the built search indexes in step with a new or changed book"""
+        if self.search_index.built:
+            self.search_index.add(book)
+        if self.book_fuzzy_index.built:
+            self.book_fuzzy_index.add(book)
+        if self.book_completion_index.built:
+            self.book_completion_index.add(book)
+    
+    def add_books_bulk(self, books, batch_size=500):
+        """Add many books at once with one commit per batch
+        
+        books is a list of dicts with title, author, isbn, category, year and copies.
+        Returns (added_count, failed) where failed lists (index, reason) per bad row.
+        """
+        rows = []
+        row_indexes = []
+        failed = []
+        
+        for index, book in enumerate(books):
+            try:
+                errors = validate_book_data(book.get('title'), book.get('author'), book.get('copies'))
+                copies = int(book.get('copies'))
+                year = int(book['year']) if book.get('year') else None
+            except (TypeError, ValueError):
+                errors = ["Year and copies must be numbers"]
+            
+            if errors:
+                failed.append((index, "; ".join(errors)))
+                continue
+            
+            rows.append((book['title'], book['author'], book.get('isbn'), book.get('category'),
+                         year, copies, copies))
+            row_indexes.append(index)
+        
+        query = """
+        INSERT INTO books (title, author, isbn, category, year, copies, available_copies)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        added, db_failed = self.db.execute_many(query, rows, batch_size)
+        failed.extend((row_indexes[i], error) for i, error in db_failed)
+        
+        return added, sorted(failed)
     
     def update_book(self, book_id, title, author, isbn, category, year, copies):
         """Update book information"""
-        # Get current book to calculate available copies
-        current_book = self.get_book_by_id(book_id)
+        # Get current book to calculate available copies (fresh, not cached)
+        current_book = self._load_book(book_id)
         if not current_book:
             return False
         
@@ -69,6 +376,10 @@ class LibraryBackend:
         WHERE book_id = %s
         """
         result = self.db.execute_query(query, (title, author, isbn, category, year, copies, new_available, book_id))
+        self.book_cache.invalidate(_cache_key(book_id))
+        if result is not None:
+            self._index_book({'book_id': _cache_key(book_id), 'title': title, 'author': author,
+                              'category': category, 'isbn': isbn})
         return result is not None
     
     def delete_book(self, book_id):
@@ -86,8 +397,14 @@ class LibraryBackend:
         
         query = "DELETE FROM books WHERE book_id = %s"
         result = self.db.execute_query(query, (book_id,))
+        self.book_cache.invalidate(_cache_key(book_id))
+        if result:
+            self.search_index.remove(_cache_key(book_id))
+            self.book_fuzzy_index.remove(_cache_key(book_id))
+            self.book_completion_index.remove(_cache_key(book_id))
         return result is not None, "Book deleted successfully" if result else "Failed to delete book"
     
+    @cached_result("books")
     def get_book_statistics(self):
         """Get book statistics"""
         query = """
@@ -116,25 +433,58 @@ class LibraryBackend:
         """
         return self.db.execute_query(query, fetch=True) or []
     
+    def get_borrowers_page(self, after=None, limit=100):
+        """One page of borrowers by name; after is the (name, borrower_id) of the previous page's last row"""
+        return self._keyset_page(BORROWERS_PAGE_QUERY, BORROWERS_SEEK, after, limit)
+    
     def get_borrower_by_id(self, borrower_id):
-        """Get borrower details by ID"""
+        """Get borrower details by ID (served from the borrower cache when fresh)"""
+        return self.borrower_cache.get(_cache_key(borrower_id), self._load_borrower)
+    
+    def _load_borrower(self, borrower_id):
         query = "SELECT * FROM borrowers WHERE borrower_id = %s"
         result = self.db.execute_query(query, (borrower_id,), fetch=True)
         return result[0] if result else None
     
     def search_borrowers(self, search_term, search_by="name"):
-        """Search borrowers by various criteria"""
+        """Search borrowers by various criteria; rows include their active_loans count"""
         if search_by == "name":
-            query = "SELECT * FROM borrowers WHERE name LIKE %s ORDER BY name"
+            condition, order = "name LIKE %s", "name"
         elif search_by == "email":
-            query = "SELECT * FROM borrowers WHERE email LIKE %s ORDER BY email"
+            condition, order = "email LIKE %s", "email"
         elif search_by == "phone":
-            query = "SELECT * FROM borrowers WHERE phone LIKE %s ORDER BY phone"
+            condition, order = "phone LIKE %s", "phone"
         else:
-            query = "SELECT * FROM borrowers WHERE name LIKE %s OR email LIKE %s ORDER BY name"
-            return self.db.execute_query(query, (f"%{search_term}%", f"%{search_term}%"), fetch=True) or []
+            condition, order = "name LIKE %s OR email LIKE %s", "name"
         
-        return self.db.execute_query(query, (f"%{search_term}%",), fetch=True) or []
+        query = BORROWER_SEARCH_QUERY.format(condition=condition, order=order)
+        params = (f"%{search_term}%",) * condition.count("%s")
+        return self.db.execute_query(query, params, fetch=True) or []
+    
+    def fuzzy_search_borrowers(self, search_text, limit=50, threshold=None):
+        """Typo-tolerant search over borrower name and email, closest match first, with active_loans"""
+        self._sync_index(self.borrower_fuzzy_index, BORROWER_FUZZY_QUERY,
+                         "borrowers", "borrower_id", "borrowers_fuzzy")
+        ranked = self.borrower_fuzzy_index.search(search_text, limit, threshold)
+        borrowers = self._rows_by_id("borrowers", "borrower_id", [borrower_id for borrower_id, _ in ranked])
+        return self._with_active_loans(borrowers)
+    
+    def _with_active_loans(self, borrowers):
+        """Set each borrower's active_loans count, from one grouped query for all of them"""
+        if not borrowers:
+            return borrowers
+        ids = [borrower['borrower_id'] for borrower in borrowers]
+        placeholders = ", ".join(["%s"] * len(ids))
+        query = f"""
+        SELECT borrower_id, COUNT(*) as count FROM transactions
+        WHERE status = 'borrowed' AND borrower_id IN ({placeholders})
+        GROUP BY borrower_id
+        """
+        counts = {row['borrower_id']: row['count']
+                  for row in self.db.execute_query(query, ids, fetch=True) or []}
+        for borrower in borrowers:
+            borrower['active_loans'] = counts.get(borrower['borrower_id'], 0)
+        return borrowers
     
     def add_borrower(self, name, email, phone, address):
         """Add a new borrower to the database"""
@@ -150,8 +500,65 @@ class LibraryBackend:
         VALUES (%s, %s, %s, %s)
         """
         result = self.db.execute_query(query, (name, email, phone, address))
+        if result:
+            self._index_borrower({'borrower_id': result, 'name': name, 'email': email})
         return result is not None, "Borrower registered successfully" if result else "Failed to register borrower"
     
+    def _index_borrower(self, borrower):
+        """Keep the built borrower indexes in step with a new or changed borrower"""
+        if self.borrower_fuzzy_index.built:
+            self.borrower_fuzzy_index.add(borrower)
+        if self.borrower_completion_index.built:
+            self.borrower_completion_index.add(borrower)
+    
+    def add_borrowers_bulk(self, borrowers, batch_size=500):
+        """Register many borrowers at once with one commit per batch
+        
+        borrowers is a list of dicts with name, email, phone and address.
+        Returns (added_count, failed) where failed lists (index, reason) per bad row.
+        """
+        candidates = []
+        failed = []
+        seen_emails = set()
+        
+        for index, borrower in enumerate(borrowers):
+            email = (borrower.get('email') or "").strip()
+            errors = validate_borrower_data(borrower.get('name'), email)
+            if errors:
+                failed.append((index, "; ".join(errors)))
+            elif email.lower() in seen_emails:
+                failed.append((index, "Duplicate email in import"))
+            else:
+                seen_emails.add(email.lower())
+                candidates.append((index, (borrower['name'], email,
+                                           borrower.get('phone'), borrower.get('address'))))
+        
+        # Skip emails that are already registered, checked a batch at a time
+        rows = []
+        row_indexes = []
+        for start in range(0, len(candidates), batch_size):
+            chunk = candidates[start:start + batch_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            check_query = f"SELECT email FROM borrowers WHERE email IN ({placeholders})"
+            existing = self.db.execute_query(check_query, [row[1] for _, row in chunk], fetch=True) or []
+            existing_emails = {row['email'].lower() for row in existing}
+            
+            for index, row in chunk:
+                if row[1].lower() in existing_emails:
+                    failed.append((index, "Email already registered"))
+                else:
+                    rows.append(row)
+                    row_indexes.append(index)
+        
+        query = """
+        INSERT INTO borrowers (name, email, phone, address)
+        VALUES (%s, %s, %s, %s)
+        """
+        added, db_failed = self.db.execute_many(query, rows, batch_size)
+        failed.extend((row_indexes[i], error) for i, error in db_failed)
+        
+        return added, sorted(failed)
+    
     def update_borrower(self, borrower_id, name, email, phone, address):
         """Update borrower information"""
         # Check if new email conflicts with other borrowers
@@ -170,6 +577,9 @@ class LibraryBackend:
         WHERE borrower_id = %s
         """
         result = self.db.execute_query(query, (name, email, phone, address, borrower_id))
+        self.borrower_cache.invalidate(_cache_key(borrower_id))
+        if result is not None:
+            self._index_borrower({'borrower_id': _cache_key(borrower_id), 'name': name, 'email': email})
         return result is not None, "Borrower updated successfully" if result else "Failed to update borrower"
     
     def delete_borrower(self, borrower_id):
@@ -187,8 +597,13 @@ class LibraryBackend:
         
         query = "DELETE FROM borrowers WHERE borrower_id = %s"
         result = self.db.execute_query(query, (borrower_id,))
+        self.borrower_cache.invalidate(_cache_key(borrower_id))
+        if result:
+            self.borrower_fuzzy_index.remove(_cache_key(borrower_id))
+            self.borrower_completion_index.remove(_cache_key(borrower_id))
         return result is not None, "Borrower deleted successfully" if result else "Failed to delete borrower"
     
+    @cached_result("borrowers", "transactions")
     def get_borrower_statistics(self):
         """Get borrower statistics"""
         query = """
@@ -204,22 +619,33 @@ class LibraryBackend:
     
     # ========== TRANSACTION MANAGEMENT ==========
     
-    def get_all_transactions(self):
+    def get_all_transactions(self, row_format="dict"):
         """Get all transactions from database"""
-        query = """
-        SELECT t.transaction_id, t.book_id, t.borrower_id,
-               DATE(t.borrow_date) as borrow_date,
-               DATE(t.due_date) as due_date,
-               DATE(t.return_date) as return_date,
-               t.status, t.fine_amount, t.created_at,
-               b.title, b.author,
-               br.name as borrower_name, br.email
-        FROM transactions t
-        JOIN books b ON t.book_id = b.book_id
-        JOIN borrowers br ON t.borrower_id = br.borrower_id
-        ORDER BY t.created_at DESC
-        """
-        return self.db.execute_query(query, fetch=True) or []
+        return self.db.execute_query(ALL_TRANSACTIONS_QUERY, fetch=True, row_format=row_format) or []
+    
+    def iter_all_transactions(self, chunk_size=500, row_format="dict"):
+        """Stream the full transaction history without loading it into memory"""
+        return self.db.iter_query(ALL_TRANSACTIONS_QUERY, chunk_size=chunk_size, row_format=row_format)
+    
+    def iter_transactions_between(self, start_date, end_date, chunk_size=500, row_format="dict"):
+        """Stream id, borrow date, status and fine of transactions borrowed from start_date to end_date"""
+        return self.db.iter_query(TRANSACTIONS_BETWEEN_QUERY, (start_date, end_date),
+                                  chunk_size=chunk_size, row_format=row_format)
+    
+    def get_transactions_page(self, after=None, limit=100, status=None):
+        """One page of history, newest first; after is the (created_at, transaction_id) of the previous page's last row"""
+        if status:
+            return self._keyset_page(TRANSACTIONS_PAGE_QUERY, TRANSACTIONS_SEEK, after, limit,
+                                     ["t.status = %s"], [status])
+        return self._keyset_page(TRANSACTIONS_PAGE_QUERY, TRANSACTIONS_SEEK, after, limit)
+    
+    def get_transactions_cursor(self, position, status=None):
+        """Cursor that get_transactions_page() seeks past to start at row position, or None past the end"""
+        where = "WHERE t.status = %s" if status else ""
+        params = [status] if status else []
+        query = TRANSACTIONS_CURSOR_QUERY.format(where=where)
+        result = self.db.execute_query(query, params + [position - 1], fetch=True)
+        return (result[0]['created_at'], result[0]['transaction_id']) if result else None
     
     def get_transaction_by_id(self, transaction_id):
         """Get transaction details by ID"""
@@ -234,28 +660,11 @@ class LibraryBackend:
         return result[0] if result else None
     
     def borrow_book(self, book_id, borrower_id, borrow_date=None, due_date=None):
-        """Borrow a book"""
-        # Check if book is available
-        book = self.get_book_by_id(book_id)
-        if not book or book['available_copies'] <= 0:
-            return None, "Book not available for borrowing"
-        
-        # Check if borrower exists
-        borrower = self.get_borrower_by_id(borrower_id)
-        if not borrower:
-            return None, "Borrower not found"
+        """Borrow a book
         
-        # Check if borrower has overdue books
-        overdue_check = """
-        SELECT COUNT(*) as overdue_count 
-        FROM transactions 
-        WHERE borrower_id = %s AND status = 'borrowed' AND due_date < CURDATE()
+        The availability check, overdue check, copy decrement and insert run
+        in one transaction, so two desks cannot lend out the same last copy.
         """
-        overdue_result = self.db.execute_query(overdue_check, (borrower_id,), fetch=True)
-        
-        if overdue_result and overdue_result[0]['overdue_count'] > 0:
-            return None, f"Borrower has {overdue_result[0]['overdue_count']} overdue book(s)"
-        
         # Set dates
         if not borrow_date:
             borrow_date = datetime.now().date()
@@ -263,52 +672,119 @@ class LibraryBackend:
         if not due_date:
             due_date = borrow_date + timedelta(days=14)
         
-        # Insert transaction
-        query = """
+        # Take a copy only if one is left, the borrower exists and has nothing overdue.
+        # The UPDATE locks the book row, so concurrent checkouts queue up behind it.
+        reserve_query = """
+        UPDATE books 
+        SET available_copies = available_copies - 1
+        WHERE book_id = %s AND available_copies > 0
+          AND EXISTS (SELECT 1 FROM borrowers WHERE borrower_id = %s)
+          AND NOT EXISTS (
+              SELECT 1 FROM transactions 
+              WHERE borrower_id = %s AND status = 'borrowed' AND due_date < CURDATE()
+          )
+        """
+        
+        insert_query = """
         INSERT INTO transactions (book_id, borrower_id, borrow_date, due_date, status)
         VALUES (%s, %s, %s, %s, 'borrowed')
         """
-        transaction_id = self.db.execute_query(query, (book_id, borrower_id, borrow_date, due_date))
+        
+        try:
+            with self.db.transaction() as tx:
+                if tx.execute(reserve_query, (book_id, borrower_id, borrower_id)) == 0:
+                    message = self._checkout_refusal(tx, book_id, borrower_id)
+                    tx.rollback()
+                    return None, message
+                
+                tx.execute(insert_query, (book_id, borrower_id, borrow_date, due_date))
+                transaction_id = tx.lastrowid
+        except Exception as e:
+            logger.error(f"Borrow failed: {e}")
+            return None, "Failed to borrow book"
+        finally:
+            # available_copies changed (or may have, if the commit failed)
+            self.book_cache.invalidate(_cache_key(book_id))
         
         if transaction_id:
             return transaction_id, "Book borrowed successfully"
         
         return None, "Failed to borrow book"
     
-    def return_book(self, transaction_id, return_date=None):
-        """Return a borrowed book"""
-        transaction = self.get_transaction_by_id(transaction_id)
-        if not transaction:
-            return False, "Transaction not found"
+    def _checkout_refusal(self, tx, book_id, borrower_id):
+        """Explain why the checkout UPDATE matched no row"""
+        book = tx.fetch_one("SELECT available_copies FROM books WHERE book_id = %s", (book_id,))
+        if not book or book['available_copies'] <= 0:
+            return "Book not available for borrowing"
         
-        if transaction['status'] == 'returned':
-            return False, "Book already returned"
+        borrower = tx.fetch_one("SELECT borrower_id FROM borrowers WHERE borrower_id = %s", (borrower_id,))
+        if not borrower:
+            return "Borrower not found"
         
+        overdue_check = """
+        SELECT COUNT(*) as overdue_count 
+        FROM transactions 
+        WHERE borrower_id = %s AND status = 'borrowed' AND due_date < CURDATE()
+        """
+        overdue_result = tx.fetch_one(overdue_check, (borrower_id,))
+        return f"Borrower has {overdue_result['overdue_count']} overdue book(s)"
+    
+    def return_book(self, transaction_id, return_date=None):
+        """Return a borrowed book and put the copy back on the shelf"""
         if not return_date:
             return_date = datetime.now().date()
         
-        # Calculate fine if overdue
-        fine_amount = 0
-        due_date = transaction['due_date']
-        if isinstance(due_date, str):
-            due_date = datetime.strptime(due_date, '%Y-%m-%d').date()
-        
-        if return_date > due_date:
-            days_overdue = (return_date - due_date).days
-            fine_amount = days_overdue * 5.00  # $5 per day fine
-        
-        # Update transaction
-        query = """
-        UPDATE transactions 
-        SET return_date = %s, status = 'returned', fine_amount = %s
-        WHERE transaction_id = %s
-        """
-        result = self.db.execute_query(query, (return_date, fine_amount, transaction_id))
-        
-        if result is not None:
-            return True, f"Book returned successfully. Fine: ${fine_amount:.2f}"
+        book_id = None
+        try:
+            with self.db.transaction() as tx:
+                # Lock the loan so two desks cannot return it twice
+                transaction = tx.fetch_one("""
+                SELECT book_id, due_date, status 
+                FROM transactions 
+                WHERE transaction_id = %s 
+                FOR UPDATE
+                """, (transaction_id,))
+                
+                if not transaction:
+                    tx.rollback()
+                    return False, "Transaction not found"
+                
+                if transaction['status'] == 'returned':
+                    tx.rollback()
+                    return False, "Book already returned"
+                
+                # Calculate fine if overdue
+                fine_amount = 0
+                due_date = transaction['due_date']
+                if isinstance(due_date, str):
+                    due_date = datetime.strptime(due_date, '%Y-%m-%d').date()
+                
+                if return_date > due_date:
+                    days_overdue = (return_date - due_date).days
+                    fine_amount = days_overdue * 5.00  # $5 per day fine
+                
+                # Update transaction
+                tx.execute("""
+                UPDATE transactions 
+                SET return_date = %s, status = 'returned', fine_amount = %s
+                WHERE transaction_id = %s
+                """, (return_date, fine_amount, transaction_id))
+                
+                # Loans made before copies were tracked never decremented, so cap at copies
+                book_id = transaction['book_id']
+                tx.execute("""
+                UPDATE books 
+                SET available_copies = available_copies + 1
+                WHERE book_id = %s AND available_copies < copies
+                """, (book_id,))
+        except Exception as e:
+            logger.error(f"Return failed: {e}")
+            return False, "Failed to return book"
+        finally:
+            if book_id is not None:
+                self.book_cache.invalidate(_cache_key(book_id))
         
-        return False, "Failed to return book"
+        return True, f"Book returned successfully. Fine: ${fine_amount:.2f}"
     
     def get_active_loans(self):
         """Get all active loans"""
@@ -329,18 +805,23 @@ class LibraryBackend:
         """
         return self.db.execute_query(query, fetch=True) or []
     
-    def get_overdue_books(self):
+    def get_overdue_books(self, today=None):
         """Get all overdue books"""
+        # Resolved here rather than by CURDATE(), so the cached result is keyed on the day it used
+        return self._overdue_books(today or datetime.now().date())
+    
+    @cached_result("transactions", "books", "borrowers")
+    def _overdue_books(self, today):
         query = """
         SELECT t.*, b.title, b.author, br.name as borrower_name, br.email,
-               DATEDIFF(CURDATE(), t.due_date) as days_overdue
+               DATEDIFF(%s, t.due_date) as days_overdue
         FROM transactions t
         JOIN books b ON t.book_id = b.book_id
         JOIN borrowers br ON t.borrower_id = br.borrower_id
-        WHERE t.status = 'borrowed' AND t.due_date < CURDATE()
+        WHERE t.status = 'borrowed' AND t.due_date < %s
         ORDER BY t.due_date ASC
         """
-        return self.db.execute_query(query, fetch=True) or []
+        return self.db.execute_query(query, (today, today), fetch=True) or []
     
     def update_overdue_status(self):
         """Update status of overdue books"""
@@ -351,6 +832,7 @@ class LibraryBackend:
         """
         return self.db.execute_query(query)
     
+    @cached_result("transactions")
     def get_transaction_statistics(self):
         """Get transaction statistics"""
         query = """
@@ -370,11 +852,15 @@ class LibraryBackend:
     
     def get_monthly_report(self, year=None, month=None):
         """Get monthly transaction report"""
+        # The current month is resolved before the cache lookup, so it is part of the key
         if not year:
             year = datetime.now().year
         if not month:
             month = datetime.now().month
-        
+        return self._monthly_report(year, month)
+    
+    @cached_result("transactions")
+    def _monthly_report(self, year, month):
         query = """
         SELECT 
             DAY(borrow_date) as day,
@@ -389,6 +875,7 @@ class LibraryBackend:
         """
         return self.db.execute_query(query, (year, month), fetch=True) or []
     
+    @cached_result("books", "transactions")
     def get_category_report(self):
         """Get report by book category"""
         query = """
@@ -405,6 +892,7 @@ class LibraryBackend:
         """
         return self.db.execute_query(query, fetch=True) or []
     
+    @cached_result("borrowers", "transactions")
     def get_borrower_activity_report(self, limit=10):
         """Get most active borrowers"""
         query = """
@@ -424,6 +912,7 @@ class LibraryBackend:
         """
         return self.db.execute_query(query, (limit,), fetch=True) or []
     
+    @cached_result("books", "transactions")
     def get_popular_books_report(self, limit=10):
         """Get most popular books"""
         query = """
@@ -446,29 +935,39 @@ class LibraryBackend:
     
     def get_system_statistics(self):
         """Get comprehensive system statistics"""
+        return self._combine_statistics(
+            self.get_book_statistics(),
+            self.get_borrower_statistics(),
+            self.get_transaction_statistics(),
+            self.get_overdue_books()
+        )
+    
+    @staticmethod
+    def _combine_statistics(book_stats, borrower_stats, transaction_stats, overdue_books):
+        """Merge the separate statistics queries into one dashboard dict"""
         stats = {}
-        
-        # Book statistics
-        book_stats = self.get_book_statistics()
         stats.update(book_stats)
-        
-        # Borrower statistics
-        borrower_stats = self.get_borrower_statistics()
         stats.update(borrower_stats)
-        
-        # Transaction statistics
-        transaction_stats = self.get_transaction_statistics()
         stats.update(transaction_stats)
         
         # Additional stats
         stats['current_date'] = datetime.now().strftime('%Y-%m-%d')
-        stats['overdue_count'] = len(self.get_overdue_books())
+        stats['overdue_count'] = len(overdue_books)
         
         return stats
     
+    def cache_stats(self):
+        """Get hit/miss counters of the book, borrower and report caches"""
+        return {
+            'books': self.book_cache.stats(),
+            'borrowers': self.borrower_cache.stats(),
+            'results': self.result_cache.stats(),
+            'table_versions': self.db.table_versions.versions()
+        }
+    
     def execute_custom_query(self, query):
         """Execute custom SQL query (SELECT only for safety)"""
-        if not query.strip().upper().startswith('SELECT'):
+        if not describe(query).is_read:
             return None, "Only SELECT queries are allowed"
         
         try:
@@ -487,6 +986,39 @@ class LibraryBackend:
         """
         return self.db.execute_query(query, fetch=True) or []
     
+    def complete_books(self, prefix, limit=20, available_only=True):
+        """Books whose title or ISBN (or a later title word) starts with prefix
+        
+        Only ids come from the index; rows are read fresh so available_copies
+        is current. Unavailable hits are skipped, widening the lookup as needed.
+        """
+        if not normalize(prefix):
+            condition = "WHERE available_copies > 0" if available_only else ""
+            query = f"SELECT * FROM books {condition} ORDER BY title LIMIT %s"
+            return self.db.execute_query(query, (limit,), fetch=True) or []
+        
+        self._sync_index(self.book_completion_index, BOOK_COMPLETION_QUERY, "books", "book_id")
+        wanted = limit
+        while True:
+            ids = self.book_completion_index.complete(prefix, wanted)
+            books = self._rows_by_id("books", "book_id", ids)
+            if available_only:
+                books = [book for book in books if book['available_copies'] > 0]
+            if len(books) >= limit or len(ids) < wanted or wanted >= limit * 64:
+                return books[:limit]
+            wanted *= 4
+    
+    def complete_borrowers(self, prefix, limit=20):
+        """Borrowers whose name or email (or a later name word) starts with prefix"""
+        if not normalize(prefix):
+            query = "SELECT * FROM borrowers ORDER BY name LIMIT %s"
+            return self.db.execute_query(query, (limit,), fetch=True) or []
+        
+        self._sync_index(self.borrower_completion_index, BORROWER_COMPLETION_QUERY,
+                         "borrowers", "borrower_id")
+        ids = self.borrower_completion_index.complete(prefix, limit)
+        return self._rows_by_id("borrowers", "borrower_id", ids)
+    
     def get_categories(self):
         """Get unique book categories"""
         query = "SELECT DISTINCT category FROM books ORDER BY category"
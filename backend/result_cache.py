@@ -0,0 +1,91 @@
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+class ResultCache:
+    """LRU cache of query results that stay valid until their tables change.
+
+    Each entry remembers the table versions read before the query ran, so a
+    write that lands while the query runs also invalidates it. The TTL only
+    bounds staleness from writes made by other processes.
+    """
+    def __init__(self, max_size=256, ttl=300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get_or_compute(self, key, versions, tables, compute):
+        """Return the cached result for key, or compute() it and cache it"""
+        snapshot = versions.snapshot(tables)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, cached_snapshot, expires_at = entry
+                if cached_snapshot == snapshot and now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(result)
+                del self._entries[key]
+                self.stale += 1
+            self.misses += 1
+
+        result = compute()
+
+        # Failed queries come back as [] or {}; don't keep those around
+        if result:
+            with self._lock:
+                self._entries[key] = (copy.deepcopy(result), snapshot, now + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Forget every cached result"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of cache usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+def cached_result(*tables):
+    """Cache a LibraryBackend method's result until one of tables changes
+
+    The key is the method name, its arguments and today's date. A method
+    whose result depends on the current date or month should still resolve
+    it in an uncached wrapper and pass it in (see get_overdue_books), so the
+    key holds exactly the date the query used.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())), date.today())
+            try:
+                hash(key)
+            except TypeError:
+                return func(self, *args, **kwargs)
+            return self.result_cache.get_or_compute(
+                key, self.db.table_versions, tables, lambda: func(self, *args, **kwargs))
+        return wrapper
+    return decorator
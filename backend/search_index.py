@@ -0,0 +1,184 @@
+import re
+import sys
+import math
+import heapq
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+# Field weights for ranking; a term found in several fields scores each of them
+FIELD_WEIGHTS = {'title': 3.0, 'author': 2.0, 'category': 1.0, 'isbn': 5.0}
+FIELDS = tuple(FIELD_WEIGHTS)
+_FIELD_BITS = {field: 1 << index for index, field in enumerate(FIELDS)}
+_MASK_WEIGHTS = [sum(FIELD_WEIGHTS[field] for field in FIELDS if mask & _FIELD_BITS[field])
+                 for mask in range(1 << len(FIELDS))]
+
+STOPWORDS = frozenset({"a", "an", "and", "the", "of", "in", "on", "to", "for", "with"})
+
+# A trailing prefix this long or longer expands to at most this many terms
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_TERMS = 64
+
+_WORDS = re.compile(r"\w+")
+_ISBN_SEPARATORS = re.compile(r"(?<=[\dXx])[-\s](?=[\dXx])")
+_DIGIT_HYPHENS = re.compile(r"(?<=\d)-(?=[\dXx])")
+
+def tokenize(text):
+    """Lower-case, accent-free word tokens of text"""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [sys.intern(word) for word in _WORDS.findall(text.casefold())]
+
+def _isbn_token(isbn):
+    return sys.intern(_ISBN_SEPARATORS.sub("", str(isbn)).casefold()) if isbn else ""
+
+class CatalogIndex:
+    """In-process inverted index over book title, author, category and ISBN.
+
+    Postings map a term to {book_id: field_mask}, the fields the term occurs
+    in. A search ANDs all query terms (the last one also matches as a prefix,
+    for search-as-you-type) and ranks hits by idf times field weight, so a
+    lookup touches only the postings of the query terms, never the table.
+    """
+    def __init__(self):
+        self._postings = {}
+        self._documents = {}
+        self._vocabulary = []
+        self._lock = threading.RLock()
+
+        # Kept by LibraryBackend to know when to catch up with the books table
+        self.sync_lock = threading.Lock()
+        self.built = False
+        self.synced_version = None
+        self.max_id = 0
+
+    # ========== UPDATES ==========
+
+    def build(self, rows):
+        """Index every row from scratch (rows have book_id and the FIELDS)"""
+        postings = {}
+        documents = {}
+        max_id = 0
+        for row in rows:
+            book_id = row['book_id']
+            terms = self._terms(row)
+            documents[book_id] = tuple(terms)
+            for term, mask in terms.items():
+                postings.setdefault(term, {})[book_id] = mask
+            max_id = max(max_id, book_id)
+
+        with self._lock:
+            self._postings = postings
+            self._documents = documents
+            self._vocabulary = sorted(postings)
+            self.max_id = max_id
+            self.built = True
+
+    def add(self, row):
+        """Index a new or changed book"""
+        book_id = row['book_id']
+        terms = self._terms(row)
+        with self._lock:
+            self._remove(book_id)
+            self._documents[book_id] = tuple(terms)
+            for term, mask in terms.items():
+                posting = self._postings.get(term)
+                if posting is None:
+                    posting = self._postings[term] = {}
+                    insort(self._vocabulary, term)
+                posting[book_id] = mask
+            self.max_id = max(self.max_id, book_id)
+
+    def remove(self, book_id):
+        """Drop a deleted book"""
+        with self._lock:
+            self._remove(book_id)
+
+    def _remove(self, book_id):
+        for term in self._documents.pop(book_id, ()):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(book_id, None)
+            if not posting:
+                del self._postings[term]
+                index = bisect_left(self._vocabulary, term)
+                if index < len(self._vocabulary) and self._vocabulary[index] == term:
+                    del self._vocabulary[index]
+
+    def _terms(self, row):
+        """term -> mask of the fields it appears in"""
+        terms = {}
+        for field in ('title', 'author', 'category'):
+            for term in tokenize(row.get(field)):
+                if term not in STOPWORDS:
+                    terms[term] = terms.get(term, 0) | _FIELD_BITS[field]
+        isbn = _isbn_token(row.get('isbn'))
+        if isbn:
+            terms[isbn] = terms.get(isbn, 0) | _FIELD_BITS['isbn']
+        return terms
+
+    # ========== SEARCH ==========
+
+    def search(self, text, limit=100):
+        """Ranked (book_id, score) pairs of books matching every term of text"""
+        # "978-0-441" is typed as one ISBN, not three terms
+        terms = [term for term in tokenize(_DIGIT_HYPHENS.sub("", text)) if term not in STOPWORDS]
+        if not terms:
+            return []
+
+        with self._lock:
+            total = len(self._documents) or 1
+            postings = [self._postings.get(term, {}) for term in terms[:-1]]
+            postings.append(self._prefix_postings(terms[-1]))
+            if not all(postings):
+                return []
+
+            weights = [math.log(1 + total / len(posting)) for posting in postings]
+            order = sorted(range(len(postings)), key=lambda index: len(postings[index]))
+            smallest = postings[order[0]]
+
+            scores = []
+            for book_id in smallest:
+                score = 0.0
+                for index in order:
+                    mask = postings[index].get(book_id)
+                    if mask is None:
+                        break
+                    score += weights[index] * _MASK_WEIGHTS[mask]
+                else:
+                    scores.append((score, -book_id))
+
+        return [(-negated_id, score) for score, negated_id in heapq.nlargest(limit, scores)]
+
+    def _prefix_postings(self, prefix):
+        """Postings of prefix itself merged with those of terms it starts"""
+        exact = self._postings.get(prefix)
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return exact or {}
+        index = bisect_left(self._vocabulary, prefix)
+        expansions = []
+        while (index < len(self._vocabulary) and len(expansions) < MAX_PREFIX_TERMS
+               and self._vocabulary[index].startswith(prefix)):
+            if self._vocabulary[index] != prefix:
+                expansions.append(self._vocabulary[index])
+            index += 1
+        if not expansions:
+            return exact or {}
+
+        merged = dict(exact or {})
+        for term in expansions:
+            for book_id, mask in self._postings[term].items():
+                merged[book_id] = merged.get(book_id, 0) | mask
+        return merged
+
+    def stats(self):
+        with self._lock:
+            return {
+                'built': self.built,
+                'documents': len(self._documents),
+                'terms': len(self._postings),
+                'postings': sum(len(posting) for posting in self._postings.values())
+            }
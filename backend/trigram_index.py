@@ -0,0 +1,297 @@
+import heapq
+import math
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+
+from backend.search_index import tokenize, STOPWORDS
+
+# Bumped whenever the pickled layout or what gets indexed changes, so an old file is rebuilt
+FORMAT_VERSION = 2
+
+# Rows a search reads from the postings of its rarest word; the other query
+# words only check those rows, so a broad word never walks its whole posting list
+MAX_CANDIDATES = 5000
+
+def trigrams(word):
+    """Padded character trigrams of a word ("  t", " to", "tol", ...)"""
+    padded = f"  {word} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Typo-tolerant search over a few text fields of one table.
+
+    Matching happens at word level: each distinct word of the indexed fields
+    is split into trigrams once, a query word is compared against vocabulary
+    words by Dice similarity, and a row matches when every query word is
+    close enough to one of its words. Only vocabulary words sharing one of
+    the query word's rarest trigrams are ever compared (prefix filtering).
+    Candidate rows come from the query word with the fewest rows, at most
+    MAX_CANDIDATES of them, best-matching words first; the other words are
+    checked against those rows only. Stopwords are neither indexed nor
+    searched.
+    """
+    def __init__(self, id_field, fields, threshold=0.4, min_word_length=2):
+        self.id_field = id_field
+        self.fields = tuple(fields)
+        self.threshold = threshold
+        self.min_word_length = min_word_length
+
+        self._word_ids = {}        # word -> word id
+        self._words = []           # word id -> word (None once unused)
+        self._free_ids = []
+        self._trigrams = {}        # trigram -> set of word ids
+        self._postings = []        # word id -> set of row ids
+        self._documents = {}       # row id -> tuple of word ids
+        self._lock = threading.RLock()
+
+        # Kept by LibraryBackend to know when to catch up with the table
+        self.sync_lock = threading.Lock()
+        self.built = False
+        self.synced_version = None
+        self.max_id = 0
+        self.built_at = None
+
+    # ========== UPDATES ==========
+
+    def build(self, rows):
+        """Index every row from scratch"""
+        with self._lock:
+            self._clear()
+            try:
+                for row in rows:
+                    self._add(row)
+            except BaseException:
+                # Never leave a half-read table searchable
+                self._clear()
+                raise
+            self.built = True
+            self.built_at = time.time()
+
+    def add(self, row):
+        """Index a new or changed row"""
+        with self._lock:
+            self._add(row)
+
+    def remove(self, row_id):
+        """Drop a deleted row"""
+        with self._lock:
+            self._remove(row_id)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _clear(self):
+        self._word_ids = {}
+        self._words = []
+        self._free_ids = []
+        self._trigrams = {}
+        self._postings = []
+        self._documents = {}
+        self.max_id = 0
+
+    def _add(self, row):
+        row_id = row[self.id_field]
+        self._remove(row_id)
+
+        word_ids = set()
+        for field in self.fields:
+            for word in tokenize(row.get(field)):
+                if len(word) >= self.min_word_length and word not in STOPWORDS:
+                    word_ids.add(self._word_id(word))
+
+        for word_id in word_ids:
+            self._postings[word_id].add(row_id)
+        self._documents[row_id] = tuple(word_ids)
+        self.max_id = max(self.max_id, row_id)
+
+    def _word_id(self, word):
+        word_id = self._word_ids.get(word)
+        if word_id is not None:
+            return word_id
+
+        if self._free_ids:
+            word_id = self._free_ids.pop()
+            self._words[word_id] = word
+            self._postings[word_id] = set()
+        else:
+            word_id = len(self._words)
+            self._words.append(word)
+            self._postings.append(set())
+        self._word_ids[word] = word_id
+        for trigram in trigrams(word):
+            self._trigrams.setdefault(trigram, set()).add(word_id)
+        return word_id
+
+    def _remove(self, row_id):
+        for word_id in self._documents.pop(row_id, ()):
+            posting = self._postings[word_id]
+            posting.discard(row_id)
+            if posting:
+                continue
+
+            # Last row using this word: take it out of the vocabulary
+            word = self._words[word_id]
+            for trigram in trigrams(word):
+                word_set = self._trigrams.get(trigram)
+                if word_set is not None:
+                    word_set.discard(word_id)
+                    if not word_set:
+                        del self._trigrams[trigram]
+            del self._word_ids[word]
+            self._words[word_id] = None
+            self._free_ids.append(word_id)
+
+    # ========== SEARCH ==========
+
+    def similar_words(self, word, threshold=None):
+        """{word_id: similarity} of vocabulary words within threshold of word"""
+        threshold = self.threshold if threshold is None else threshold
+        query = trigrams(word)
+        size = len(query)
+
+        # Dice = 2c / (n + m) >= t bounds the other word's trigram count m and
+        # the overlap c; a match must share one of the (n - c + 1) rarest trigrams
+        min_size = math.ceil(size * threshold / (2 - threshold))
+        max_size = math.floor(size * (2 - threshold) / threshold)
+        min_common = math.ceil(threshold * (size + min_size) / 2)
+        rarest = sorted(query, key=lambda trigram: len(self._trigrams.get(trigram, ())))
+        prefix = rarest[:size - min_common + 1]
+
+        candidates = set()
+        for trigram in prefix:
+            candidates.update(self._trigrams.get(trigram, ()))
+
+        matches = {}
+        for word_id in candidates:
+            # A word has at most len + 1 distinct padded trigrams
+            if len(self._words[word_id]) + 1 < min_size:
+                continue
+            other = trigrams(self._words[word_id])
+            if not min_size <= len(other) <= max_size:
+                continue
+            similarity = 2 * len(query & other) / (size + len(other))
+            if similarity >= threshold:
+                matches[word_id] = similarity
+        return matches
+
+    def search(self, text, limit=50, threshold=None):
+        """Ranked (row_id, score) pairs; every query word must fuzzily match"""
+        words = [word for word in tokenize(text)
+                 if len(word) >= self.min_word_length and word not in STOPWORDS]
+        if not words:
+            return []
+
+        with self._lock:
+            # Per query word: (rows its similar words cover, {word_id: similarity})
+            matched = []
+            for word in words:
+                similar = self.similar_words(word, threshold)
+                if not similar:
+                    return []
+                matched.append((sum(len(self._postings[word_id]) for word_id in similar), similar))
+            matched.sort(key=lambda match: match[0])
+
+            # Row id -> summed best similarity per query word, seeded by the rarest word
+            scores = {}
+            for row_id, similarity in self._rows_by_similarity(matched[0][1]):
+                if row_id not in scores:
+                    scores[row_id] = similarity
+                    if len(scores) >= MAX_CANDIDATES:
+                        break
+
+            for breadth, similar in matched[1:]:
+                best = {}
+                if breadth <= len(scores):
+                    for word_id, similarity in similar.items():
+                        for row_id in self._postings[word_id]:
+                            if row_id in scores and similarity > best.get(row_id, 0.0):
+                                best[row_id] = similarity
+                else:
+                    for row_id in scores:
+                        for word_id in self._documents[row_id]:
+                            similarity = similar.get(word_id)
+                            if similarity is not None and similarity > best.get(row_id, 0.0):
+                                best[row_id] = similarity
+                scores = {row_id: scores[row_id] + similarity for row_id, similarity in best.items()}
+                if not scores:
+                    return []
+
+        top = heapq.nlargest(limit, ((total / len(matched), -row_id) for row_id, total in scores.items()))
+        return [(-negated_id, round(score, 3)) for score, negated_id in top]
+
+    def _rows_by_similarity(self, similar):
+        """(row_id, similarity) for the rows of similar's words, best match first"""
+        for word_id, similarity in sorted(similar.items(), key=lambda item: -item[1]):
+            for row_id in self._postings[word_id]:
+                yield row_id, similarity
+
+    # ========== PERSISTENCE ==========
+
+    def save(self, path):
+        """Write the index to path (atomically, via a temporary file)"""
+        with self._lock:
+            state = {
+                'format': FORMAT_VERSION,
+                'id_field': self.id_field,
+                'fields': self.fields,
+                'max_id': self.max_id,
+                'built_at': self.built_at,
+                'words': self._words,
+                'documents': self._documents
+            }
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(handle, 'wb') as file:
+                    pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary, path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+
+    def load(self, path):
+        """Read an index written by save(); False if missing or incompatible"""
+        try:
+            with open(path, 'rb') as file:
+                state = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return False
+        if (state.get('format') != FORMAT_VERSION or state.get('id_field') != self.id_field
+                or tuple(state.get('fields', ())) != self.fields):
+            return False
+
+        # Only words and row -> word ids are stored; the rest is rebuilt in memory
+        with self._lock:
+            self._clear()
+            self._words = state['words']
+            self._documents = state['documents']
+            self._postings = [set() for _ in self._words]
+            for word_id, word in enumerate(self._words):
+                if word is None:
+                    self._free_ids.append(word_id)
+                    continue
+                self._word_ids[sys.intern(word)] = word_id
+                for trigram in trigrams(word):
+                    self._trigrams.setdefault(trigram, set()).add(word_id)
+            for row_id, word_ids in self._documents.items():
+                for word_id in word_ids:
+                    self._postings[word_id].add(row_id)
+            self.max_id = state['max_id']
+            self.built_at = state['built_at']
+            self.built = True
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'built': self.built,
+                'rows': len(self._documents),
+                'words': len(self._word_ids),
+                'trigrams': len(self._trigrams),
+                'built_at': self.built_at
+            }
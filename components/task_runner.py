@@ -0,0 +1,159 @@
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from components.widgets import LoadingScreen, MessageBox
+
+logger = logging.getLogger(__name__)
+
+# How often Tk looks for finished work, and how long a task runs before the loading window shows
+POLL_MS = 20
+LOADING_DELAY_MS = 400
+
+class Task:
+    def __init__(self, work, on_done, on_error, owner, key, loading):
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.owner = owner
+        self.key = key
+        self.loading = loading
+        self.cancelled = False
+        self.future = None
+        self.started_at = time.monotonic()
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+class TaskRunner:
+    """Runs backend calls on a thread pool so the Tk main loop never waits on SQL.
+
+    Results are queued by the workers and handed to the callbacks on the Tk
+    thread from a root.after poll. A task submitted with the same (owner, key)
+    as a running one replaces it, and cancel(owner) drops everything a page
+    started when the user navigates away; a cancelled task's result is
+    discarded. Tasks with loading=True show the LoadingScreen once they have
+    run for LOADING_DELAY_MS, so quick ones never flash it.
+    """
+    def __init__(self, root, max_workers=4):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tk-task")
+        self._results = queue.Queue()
+        self._tasks = {}           # (owner id, key) -> Task
+        self._lock = threading.Lock()
+        self._polling = False
+        self._loading_screen = None
+
+    def submit(self, work, on_done=None, on_error=None, owner=None, key=None, loading=False):
+        """Run work() in a worker, then on_done(result) or on_error(exc) in Tk
+
+        on_error also gets any exception raised by on_done itself.
+        """
+        task = Task(work, on_done, on_error, owner, key, loading)
+        slot = (id(owner), key)
+        with self._lock:
+            previous = self._tasks.get(slot) if key is not None else None
+            if previous is not None:
+                previous.cancel()
+            self._tasks[slot if key is not None else (id(owner), id(task))] = task
+
+        # Workers see the caller's context, so queries keep their page/method tag
+        context = contextvars.copy_context()
+        task.future = self._executor.submit(context.run, self._run, task)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+        return task
+
+    def cancel(self, owner=None, key=None):
+        """Cancel the pending tasks of owner (all when None), or just its key one; how many were pending"""
+        cancelled = 0
+        with self._lock:
+            for slot, task in list(self._tasks.items()):
+                if (owner is None or task.owner is owner) and (key is None or task.key == key):
+                    task.cancel()
+                    del self._tasks[slot]
+                    cancelled += 1
+        self._update_loading()
+        return cancelled
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task):
+        if task.cancelled:
+            return
+        try:
+            self._results.put((task, True, task.work()))
+        except Exception as e:
+            self._results.put((task, False, e))
+
+    def _poll(self):
+        while True:
+            try:
+                task, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._finish(task, ok, value)
+
+        self._update_loading()
+        with self._lock:
+            pending = bool(self._tasks)
+        if pending:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _finish(self, task, ok, value):
+        with self._lock:
+            for slot, current in list(self._tasks.items()):
+                if current is task:
+                    del self._tasks[slot]
+        if task.cancelled:
+            return
+
+        # Close the loading window before a callback opens a message box
+        self._update_loading()
+        if ok:
+            if task.on_done is None:
+                return
+            try:
+                task.on_done(value)
+                return
+            except Exception as e:
+                # A result the page cannot show is reported like a failed task
+                logger.error(f"Error showing background task result: {e}")
+                value = e
+        self._fail(task, value)
+
+    def _fail(self, task, error):
+        """Hand error to the task's on_error, or report it in a message box"""
+        try:
+            if task.on_error is not None:
+                task.on_error(error)
+            else:
+                logger.error(f"Background task failed: {error}")
+                MessageBox.show_error(f"Operation failed: {error}")
+        except Exception as e:
+            # A broken error handler must not stop the poll loop
+            logger.error(f"Error handling background task failure: {e}")
+
+    def _update_loading(self):
+        """Show the loading window while a slow loading=True task runs"""
+        now = time.monotonic()
+        with self._lock:
+            slow = any(task.loading and now - task.started_at >= LOADING_DELAY_MS / 1000
+                       for task in self._tasks.values())
+            waiting = any(task.loading for task in self._tasks.values())
+
+        if slow and self._loading_screen is None:
+            self._loading_screen = LoadingScreen(self.root)
+        elif not waiting and self._loading_screen is not None:
+            self._loading_screen.close()
+            self._loading_screen = None
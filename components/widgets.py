@@ -69,12 +69,519 @@ class ModernTreeview(ttk.Treeview):
         self.v_scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
         self.h_scrollbar = ttk.Scrollbar(parent, orient=tk.HORIZONTAL, command=self.xview)
         self.configure(yscrollcommand=self.v_scrollbar.set, xscrollcommand=self.h_scrollbar.set)
+        
+        # Values last written by sync_rows, by item id
+        self._shown_values = {}
     
     def pack_with_scrollbars(self, **kwargs):
         self.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, **kwargs)
         self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
 
+    def sync_rows(self, rows, key=None):
+        """Show rows (tuples of column values), touching only the items that changed
+
+        Items are keyed on key(values), the first column (the ID) by default,
+        so a refresh after one write inserts, updates, moves or deletes just
+        the rows involved instead of rebuilding the whole tree.
+        """
+        key = key or (lambda values: values[0])
+        order = []
+        wanted = {}
+        for values in rows:
+            values = tuple(values)
+            iid = str(key(values))
+            if iid not in wanted:
+                order.append(iid)
+                wanted[iid] = values
+
+        # Rows still in the same relative order (the longest run of increasing
+        # old positions) stay put; the rest are deleted and re-inserted in place
+        current = list(self.get_children())
+        position = {iid: index for index, iid in enumerate(current)}
+        keep = _longest_increasing([iid for iid in order if iid in position], position)
+        stale = [iid for iid in current if iid not in keep]
+        if stale:
+            self.delete(*stale)
+
+        shown = self._shown_values
+        for index, iid in enumerate(order):
+            values = wanted[iid]
+            if iid not in keep:
+                self.insert("", index, iid=iid, values=values)
+            elif shown.get(iid) != values:
+                self.item(iid, values=values)
+
+        self._shown_values = wanted
+
+def _longest_increasing(items, position):
+    """Largest subset of items whose position[] values increase in list order"""
+    tails = []          # index into items of the smallest tail of each run length
+    previous = [None] * len(items)
+    for index, item in enumerate(items):
+        value = position[item]
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if position[items[tails[middle]]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        if low:
+            previous[index] = tails[low - 1]
+        if low == len(tails):
+            tails.append(index)
+        else:
+            tails[low] = index
+
+    kept = set()
+    index = tails[-1] if tails else None
+    while index is not None:
+        kept.add(items[index])
+        index = previous[index]
+    return kept
+
+class RowSource:
+    """Rows behind a VirtualTreeview, held as a bounded window of chunks
+
+    fetch(after, limit) is a keyset source as used by Pager and cursor(row)
+    the key the next chunk seeks past. seek(position) returns the key to
+    seek past to start at row position (an OFFSET probe on the sort index),
+    so jumping into the list reads one chunk there instead of every chunk on
+    the way. Chunks are kept by index; past max_chunks, the ones farthest
+    from the view are dropped and read again if it comes back. total sizes
+    the scrollbar until the end of the rows has been read.
+    """
+    def __init__(self, fetch, cursor, seek=None, total=None, chunk_size=200, max_chunks=8):
+        self.fetch = fetch
+        self.cursor = cursor
+        self.seek = seek
+        self.total = total
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.end = None            # row count, once the last chunk has been read
+        self._chunks = {}          # chunk index -> rows
+
+    @classmethod
+    def of(cls, rows, chunk_size=200):
+        """A source already holding every row of a list"""
+        source = cls(None, None, chunk_size=chunk_size, max_chunks=None)
+        source.store(0, [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)])
+        source.end = len(rows)
+        return source
+
+    def row(self, index):
+        """Row at index, or None while its chunk is not held"""
+        chunk = self._chunks.get(index // self.chunk_size)
+        offset = index % self.chunk_size
+        return chunk[offset] if chunk is not None and offset < len(chunk) else None
+
+    def length(self):
+        """Row count if known, otherwise an estimate for the scrollbar"""
+        if self.end is not None:
+            return self.end
+        read = (max(self._chunks) + 1) * self.chunk_size if self._chunks else 0
+        return max(self.total or 0, read + self.chunk_size)
+
+    def missing(self, start, stop):
+        """First and last chunk to read so rows start..stop are held, or None"""
+        if self.end is not None:
+            stop = min(stop, self.end)
+        if stop <= start:
+            return None
+        wanted = [index for index in range(start // self.chunk_size, (stop - 1) // self.chunk_size + 1)
+                  if index not in self._chunks]
+        if not wanted:
+            return None
+
+        first = wanted[0]
+        if self.seek is None and first > 0 and first - 1 not in self._chunks:
+            # Without an OFFSET probe the only way in is reading on from an earlier chunk
+            first = max((index + 1 for index in self._chunks if index < first), default=0)
+        return first, wanted[-1]
+
+    def reader(self, first, last):
+        """Work reading chunks first..last; call it on the Tk thread, run it anywhere"""
+        previous = self._chunks.get(first - 1)
+        after = self.cursor(previous[-1]) if previous else None
+        probe = first > 0 and not previous and self.seek is not None
+        # Past an empty chunk with no OFFSET probe there is nothing left to read on from
+        ended = first > 0 and not previous and not probe
+
+        def read():
+            if ended:
+                return []
+            start = self.seek(first * self.chunk_size) if probe else after
+            if probe and start is None:
+                return []          # the list is shorter than first
+            chunks = []
+            for index in range(first, last + 1):
+                rows = self.fetch(start, self.chunk_size)
+                chunks.append(rows)
+                if len(rows) < self.chunk_size:
+                    break
+                start = self.cursor(rows[-1])
+            return chunks
+        return read
+
+    def store(self, first, chunks):
+        """Keep chunks read from chunk first on"""
+        for index, rows in enumerate(chunks, first):
+            self._chunks[index] = rows
+            if len(rows) < self.chunk_size:
+                self.end = index * self.chunk_size + len(rows)
+                break
+        if not chunks:
+            # The probe found no row at chunk first, so the list ends before it
+            end = first * self.chunk_size
+            self.end = end if self.end is None else min(self.end, end)
+
+    def evict(self, position):
+        """Drop the chunks farthest from row position beyond max_chunks"""
+        if self.max_chunks is None or len(self._chunks) <= self.max_chunks:
+            return
+        center = position // self.chunk_size
+        by_distance = sorted(self._chunks, key=lambda index: abs(index - center), reverse=True)
+        for index in by_distance[:len(self._chunks) - self.max_chunks]:
+            del self._chunks[index]
+
+class VirtualTreeview(ModernTreeview):
+    """ModernTreeview that only creates Tk items for the rows on screen
+
+    Rows live in a RowSource; a pool of one item per visible line is reused
+    as the view scrolls, by rewriting the items' values. The scrollbar and
+    mouse wheel move the window over the source instead of the Treeview's
+    own yview, and selection is kept by row index so it survives scrolling.
+    row_values(row) turns a source row into the column values. Given a
+    TaskRunner, chunks the window needs are read in the background on
+    behalf of owner, and their lines show PLACEHOLDER until they arrive.
+    """
+    PLACEHOLDER = ("Loading...",)
+
+    def __init__(self, parent, columns, row_values=None, tasks=None, owner=None, **kwargs):
+        super().__init__(parent, columns, **kwargs)
+        self.row_values = row_values or (lambda row: row)
+        self.tasks = tasks
+        self.owner = owner
+        self._source = RowSource.of([])
+        self._reading = None       # chunk range being read in the background
+        self._offset = 0
+        self._visible = int(self.cget('height'))
+        self._items = []
+        self._selected = set()
+
+        # The scrollbar follows the window over the source, not the items
+        self.v_scrollbar.config(command=self._on_scrollbar)
+        self.configure(yscrollcommand=lambda *args: None)
+
+        self.bind('<Configure>', self._on_resize)
+        self.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        self.bind('<MouseWheel>', self._on_wheel)
+        self.bind('<Button-4>', lambda event: self._scroll_by(-3))
+        self.bind('<Button-5>', lambda event: self._scroll_by(3))
+        self.bind('<Up>', lambda event: self._move_focus(-1))
+        self.bind('<Down>', lambda event: self._move_focus(1))
+        self.bind('<Prior>', lambda event: self._move_focus(-self._visible))
+        self.bind('<Next>', lambda event: self._move_focus(self._visible))
+
+    def set_source(self, rows):
+        """Show rows (a RowSource or a list) from the top"""
+        self._source = rows if isinstance(rows, RowSource) else RowSource.of(rows)
+        self._reading = None
+        self._offset = 0
+        self._selected = set()
+        self.render()
+
+    def selected_rows(self):
+        """Source rows that are selected and still held, visible or not"""
+        rows = (self._source.row(index) for index in sorted(self._selected))
+        return [row for row in rows if row is not None]
+
+    def render(self):
+        """Rewrite the pooled items with the rows in the window"""
+        # Read one screen ahead so scrolling down rarely waits on the source
+        self._read(self._offset, self._offset + 2 * self._visible)
+        count = max(0, min(self._visible, self._source.length() - self._offset))
+        rows = [self._source.row(index) for index in range(self._offset, self._offset + count)]
+
+        while len(self._items) < len(rows):
+            self._items.append(self.insert("", tk.END))
+        while len(self._items) > len(rows):
+            self.delete(self._items.pop())
+
+        for item, row in zip(self._items, rows):
+            self.item(item, values=self.PLACEHOLDER if row is None else self.row_values(row))
+        self.selection_set([item for index, item in enumerate(self._items)
+                            if self._offset + index in self._selected])
+        self.yview_moveto(0)
+
+        total = self._source.length() or 1
+        self.v_scrollbar.set(self._offset / total, min(1.0, (self._offset + len(rows)) / total))
+
+    def _read(self, start, stop):
+        """Read the chunks behind rows start..stop that the source does not hold"""
+        wanted = self._source.missing(start, stop)
+        if wanted is None or wanted == self._reading:
+            return
+        source = self._source
+        read = source.reader(*wanted)
+        if self.tasks is None:
+            self._store(source, wanted, read())
+            return
+
+        # A newer range replaces the one in flight; its chunks would be off screen
+        self._reading = wanted
+        self.tasks.submit(read, lambda chunks: self._loaded(source, wanted, chunks),
+                          on_error=lambda error: self._read_failed(source, error),
+                          owner=self.owner, key=self)
+
+    def _store(self, source, wanted, chunks):
+        source.store(wanted[0], chunks)
+        source.evict(self._offset)
+
+    def _loaded(self, source, wanted, chunks):
+        if source is not self._source:
+            return
+        self._reading = None
+        self._store(source, wanted, chunks)
+        self.render()
+
+    def _read_failed(self, source, error):
+        if source is self._source:
+            # Scrolling asks again
+            self._reading = None
+            MessageBox.show_error(f"Failed to load rows: {error}")
+
+    def _scroll_to(self, offset):
+        offset = max(0, min(offset, self._source.length() - self._visible))
+        if offset != self._offset:
+            self._offset = offset
+            self.render()
+
+    def _scroll_by(self, count):
+        self._scroll_to(self._offset + count)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            # Straight to that row; the source seeks there instead of reading the rows before it
+            self._scroll_to(int(float(amount) * self._source.length()))
+        elif unit == 'pages':
+            self._scroll_by(int(amount) * self._visible)
+        else:
+            self._scroll_by(int(amount))
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_by(-3 * steps)
+
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # The first item's top edge is the height of the headings
+        box = self.bbox(self._items[0]) if self._items else None
+        header = box[1] if box else row_height
+        visible = max(1, (event.height - header) // row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self.render()
+
+    def _on_select(self, event=None):
+        window = range(self._offset, self._offset + len(self._items))
+        self._selected.difference_update(window)
+        self._selected.update(self._offset + self._items.index(item)
+                              for item in self.selection() if item in self._items)
+
+    def _move_focus(self, count):
+        """Arrow keys and Page Up/Down, scrolling the window at its edges"""
+        focus = self.focus()
+        current = self._offset + (self._items.index(focus) if focus in self._items else 0)
+        target = max(0, min(current + count, self._source.length() - 1))
+        if target < self._offset:
+            self._scroll_to(target)
+        elif target >= self._offset + self._visible:
+            self._scroll_to(target - self._visible + 1)
+
+        if 0 <= target - self._offset < len(self._items):
+            item = self._items[target - self._offset]
+            self._selected = {target}
+            self.selection_set(item)
+            self.focus(item)
+        return "break"
+
+class Pager(tk.Frame):
+    """Prev/Next controls for a keyset-paginated listing
+
+    fetch(after, limit) returns rows sorted on the listing's key, cursor(row)
+    gives the key the next page seeks past, and render(rows) shows a page.
+    The cursor each visited page started after is kept, so Prev re-seeks
+    instead of counting OFFSET rows. Given a TaskRunner, pages are fetched
+    in the background on behalf of owner.
+    """
+    def __init__(self, parent, fetch, cursor, render, page_size=100, tasks=None, owner=None, **kwargs):
+        super().__init__(parent, bg='white', **kwargs)
+        self.fetch = fetch
+        self.cursor = cursor
+        self.render = render
+        self.page_size = page_size
+        self.tasks = tasks
+        self.owner = owner
+        self._starts = [None]
+        self._next = None
+
+        self.prev_btn = tk.Button(self, text="◀ Prev", command=self.prev_page,
+                                  bg='#E5E7EB', fg='black', relief=tk.FLAT, padx=10)
+        self.prev_btn.pack(side=tk.LEFT, padx=2)
+
+        self.page_label = tk.Label(self, text="Page 1", font=('Helvetica', 10), bg='white')
+        self.page_label.pack(side=tk.LEFT, padx=8)
+
+        self.next_btn = tk.Button(self, text="Next ▶", command=self.next_page,
+                                  bg='#E5E7EB', fg='black', relief=tk.FLAT, padx=10)
+        self.next_btn.pack(side=tk.LEFT, padx=2)
+
+    def first_page(self):
+        self._starts = [None]
+        self.load()
+
+    def next_page(self):
+        if self._next is not None:
+            self._starts.append(self._next)
+            self.load()
+
+    def prev_page(self):
+        if len(self._starts) > 1:
+            self._starts.pop()
+            self.load()
+
+    def load(self):
+        """(Re)load the current page"""
+        # One row past the page tells whether there is a next page
+        after = self._starts[-1]
+        if self.tasks is None:
+            self._show(self.fetch(after, self.page_size + 1))
+        else:
+            self.tasks.submit(lambda: self.fetch(after, self.page_size + 1), self._show,
+                              owner=self.owner, key=self)
+
+    def cancel(self):
+        """Drop a page load still in flight (e.g. search results replaced the list)"""
+        if self.tasks is not None:
+            self.tasks.cancel(self.owner, key=self)
+
+    def suspend(self, text="Search results"):
+        """Stand aside while other rows fill the list; the next load() starts at page 1"""
+        self.cancel()
+        self._starts = [None]
+        self._next = None
+        self.page_label.config(text=text)
+        self.prev_btn.config(state=tk.DISABLED)
+        self.next_btn.config(state=tk.DISABLED)
+
+    def _show(self, rows):
+        if not rows and len(self._starts) > 1:
+            # Everything on this page was deleted; step back
+            self._starts.pop()
+            return self.load()
+
+        has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self._next = self.cursor(rows[-1]) if has_next else None
+
+        self.page_label.config(text=f"Page {len(self._starts)}")
+        self.prev_btn.config(state=tk.NORMAL if len(self._starts) > 1 else tk.DISABLED)
+        self.next_btn.config(state=tk.NORMAL if has_next else tk.DISABLED)
+        self.render(rows)
+
+class LiveSearch:
+    """Search-as-you-type for an Entry/StringVar and a "search by" combobox
+
+    search(text, mode) runs in the TaskRunner and returns (rows, complete);
+    complete means rows are every match, not a capped or fuzzy list. Typing
+    that extends the last complete search is answered at once by filtering
+    its rows with refine(mode, text), a row predicate (None when the mode
+    cannot be narrowed client-side). Anything else waits for a pause of
+    delay_ms and replaces whatever search is still in flight. version()
+    snapshots the searched tables, so rows from before a write are never
+    refined. reset() shows the unfiltered listing again.
+    """
+    def __init__(self, entry, variable, mode, search, render, reset, tasks, owner,
+                 refine=None, version=None, delay_ms=150):
+        self.entry = entry
+        self.variable = variable
+        self.mode = mode
+        self.search = search
+        self.render = render
+        self.reset = reset
+        self.tasks = tasks
+        self.owner = owner
+        self.refine = refine
+        self.version = version
+        self.delay_ms = delay_ms
+        self._job = None
+        self._last = None          # (mode, text, version, rows) of the last complete result
+
+        variable.trace_add('write', lambda *args: self.schedule())
+        entry.bind('<Return>', lambda event: self.run())
+        mode.bind('<<ComboboxSelected>>', lambda event: self.run())
+
+    def schedule(self):
+        """Narrow the last results now if possible, otherwise search once typing pauses"""
+        self._cancel_job()
+        text = self.variable.get().strip()
+        if not text:
+            return self.run()
+
+        rows = self._refined(text)
+        if rows is not None:
+            self.tasks.cancel(self.owner, key=self)
+            self.render(rows)
+            return
+        self._job = self.entry.after(self.delay_ms, self.run)
+
+    def run(self):
+        """Search for the current text now"""
+        self._cancel_job()
+        text = self.variable.get().strip()
+        if not text:
+            self.tasks.cancel(self.owner, key=self)
+            self._last = None
+            self.reset()
+            return
+
+        mode = self.mode.get()
+        # Taken before the query, so a write racing it makes the rows stale
+        version = self.version() if self.version else None
+        self.tasks.submit(lambda: self.search(text, mode),
+                          lambda result: self._show(mode, text, version, result),
+                          owner=self.owner, key=self)
+
+    def _show(self, mode, text, version, result):
+        rows, complete = result
+        self._last = (mode, text, version, rows) if complete else None
+        self.render(rows)
+
+    def _refined(self, text):
+        if self._last is None or self.refine is None:
+            return None
+        mode, previous, version, rows = self._last
+        if mode != self.mode.get() or not text.startswith(previous):
+            return None
+        if self.version and self.version() != version:
+            return None
+        keep = self.refine(mode, text)
+        if keep is None:
+            return None
+
+        rows = [row for row in rows if keep(row)]
+        self._last = (mode, text, version, rows)
+        return rows
+
+    def _cancel_job(self):
+        if self._job is not None:
+            self.entry.after_cancel(self._job)
+            self._job = None
+
 class InputField:
     def __init__(self, parent, label_text, input_type="entry", **kwargs):
         self.frame = tk.Frame(parent, bg='white')
@@ -0,0 +1,242 @@
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the timeout"""
+
+class PooledConnection:
+    """A driver connection plus the bookkeeping the pool needs"""
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.owner = None
+        self.depth = 0
+        self.broken = False
+        
+        # Prepared statement cache, attached by Database on first use
+        self.statements = None
+        
+        # Set while Database.transaction() owns this connection
+        self.in_transaction = False
+        
+        # Tables written inside that transaction, version-bumped on commit
+        self.changed_tables = set()
+
+class ConnectionPool:
+    """Thread-safe pool of database connections.
+
+    A thread that already holds a connection gets the same one back on a
+    nested checkout, so a page method that calls several backend methods
+    stays on a single connection (and a single transaction) per thread.
+    """
+    def __init__(self, factory, min_size=1, max_size=5, timeout=10.0, validate=None,
+                 validate_after=0.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+
+        self.factory = factory
+        self.validate = validate
+        
+        # Only validate connections that sat idle at least this many seconds
+        self.validate_after = validate_after
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+        # Counters
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.discarded = 0
+
+    def fill(self):
+        """Open connections until the pool holds min_size of them"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = PooledConnection(self.factory())
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def acquire(self, timeout=None, exclusive=False):
+        """Check out a connection, reusing the one this thread already holds
+        
+        An exclusive checkout always gets a connection of its own and is not
+        handed to nested calls, e.g. for a cursor that streams results.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None and not exclusive:
+            held.depth += 1
+            return held
+
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            conn = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {timeout:.1f}s "
+                            f"(pool size {self.max_size})")
+                    self.waits += 1
+                    self._cond.wait(remaining)
+
+            if create:
+                try:
+                    conn = PooledConnection(self.factory())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_alive(conn):
+                self._drop(conn)
+                continue
+
+            conn.owner = threading.get_ident()
+            conn.depth = 1
+            if not exclusive:
+                self._local.conn = conn
+            with self._cond:
+                self.checkouts += 1
+            return conn
+
+    def release(self, conn):
+        """Return a connection checked out with acquire()"""
+        if conn.broken:
+            return
+        conn.depth -= 1
+        if conn.depth > 0:
+            return
+
+        conn.owner = None
+        conn.last_used = time.monotonic()
+        if getattr(self._local, 'conn', None) is conn:
+            self._local.conn = None
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._close_raw(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def discard(self, conn):
+        """Throw away a broken connection instead of returning it to the pool"""
+        if conn.broken:
+            return
+        conn.broken = True
+        conn.depth = 0
+        conn.owner = None
+        if getattr(self._local, 'conn', None) is conn:
+            self._local.conn = None
+        self._drop(conn)
+
+    def clear_idle(self):
+        """Close every idle connection, e.g. after the server dropped them all"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self.discarded += len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_raw(conn)
+        return len(idle)
+
+    @contextmanager
+    def connection(self, timeout=None, exclusive=False):
+        """Context manager around acquire()/release()"""
+        conn = self.acquire(timeout, exclusive)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections; busy ones are closed when released"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._size -= 1
+                self._close_raw(self._idle.pop())
+            self._cond.notify_all()
+
+    def stats(self):
+        """Snapshot of pool usage"""
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'discarded': self.discarded
+            }
+
+    def _is_alive(self, conn):
+        """Liveness check run before handing out an idle connection"""
+        if self.validate is None:
+            return True
+        if time.monotonic() - conn.last_used < self.validate_after:
+            return True
+        try:
+            self.validate(conn.raw)
+            return True
+        except Exception as e:
+            logger.warning(f"Discarding dead pooled connection: {e}")
+            return False
+
+    def _drop(self, conn):
+        with self._cond:
+            self._size -= 1
+            self.discarded += 1
+            self._cond.notify()
+        self._close_raw(conn)
+
+    def _close_raw(self, conn):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
@@ -50,6 +50,12 @@ CREATE TABLE IF NOT EXISTS transactions (
     INDEX idx_due_date (due_date)
 );
 
+-- Indexes for the date-range reports and the history listing. They are not
+-- part of CREATE TABLE so that re-running this script adds them to an
+-- existing database too
+CREATE INDEX IF NOT EXISTS idx_borrow_date ON transactions (borrow_date);
+CREATE INDEX IF NOT EXISTS idx_created_at ON transactions (created_at);
+
 -- TABLE: users (for authentication)
 CREATE TABLE IF NOT EXISTS users (
     user_id INT PRIMARY KEY AUTO_INCREMENT,
@@ -0,0 +1,68 @@
+-- SQLite port of create_tables.sql, run automatically by the sqlite engine
+-- Keep both files in step when the schema changes
+
+-- TABLE: users (for authentication)
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    salt VARCHAR(255) NOT NULL,
+    role TEXT DEFAULT 'borrower' CHECK (role IN ('admin', 'librarian', 'borrower')),
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+    last_login TIMESTAMP NULL,
+    is_active BOOLEAN DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users (email);
+CREATE INDEX IF NOT EXISTS idx_users_role ON users (role);
+
+-- Books table
+CREATE TABLE IF NOT EXISTS books (
+    book_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    author VARCHAR(100) NOT NULL,
+    isbn VARCHAR(20),
+    category VARCHAR(50),
+    year INT,
+    copies INT DEFAULT 1,
+    available_copies INT DEFAULT 1,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books (title);
+CREATE INDEX IF NOT EXISTS idx_books_author ON books (author);
+CREATE INDEX IF NOT EXISTS idx_books_category ON books (category);
+CREATE INDEX IF NOT EXISTS idx_books_isbn ON books (isbn);
+
+-- Borrowers table (user_id is added by ALTER TABLE in the MariaDB script)
+CREATE TABLE IF NOT EXISTS borrowers (
+    borrower_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    phone VARCHAR(20),
+    address TEXT,
+    created_date DATE DEFAULT (DATE('now', 'localtime')),
+    user_id INT NULL REFERENCES users(user_id) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS idx_borrowers_name ON borrowers (name);
+CREATE INDEX IF NOT EXISTS idx_borrowers_email ON borrowers (email);
+CREATE INDEX IF NOT EXISTS idx_borrowers_user_id ON borrowers (user_id);
+
+-- Transactions table
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    book_id INT NOT NULL REFERENCES books(book_id) ON DELETE CASCADE,
+    borrower_id INT NOT NULL REFERENCES borrowers(borrower_id) ON DELETE CASCADE,
+    borrow_date DATE NOT NULL,
+    due_date DATE NOT NULL,
+    return_date DATE,
+    status TEXT DEFAULT 'borrowed' CHECK (status IN ('borrowed', 'returned', 'overdue')),
+    fine_amount DECIMAL(10,2) DEFAULT 0.00,
+    created_at TIMESTAMP DEFAULT (DATETIME('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_book_id ON transactions (book_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_borrower_id ON transactions (borrower_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_status ON transactions (status);
+CREATE INDEX IF NOT EXISTS idx_transactions_due_date ON transactions (due_date);
+CREATE INDEX IF NOT EXISTS idx_transactions_borrow_date ON transactions (borrow_date);
+CREATE INDEX IF NOT EXISTS idx_transactions_created_at ON transactions (created_at);
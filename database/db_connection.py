@@ -1,93 +1,570 @@
-import mariadb
+import os
 import logging
+import time
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
+from database.engines import DriverError, create_engine
+from database.connection_pool import ConnectionPool, PoolTimeoutError
+from database.statement_cache import StatementCache
+from database.row_formats import check_row_format, convert_rows
+from database.statements import describe, INSERT
+from database.query_stats import QueryStats
+from database.table_versions import TableVersions
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class DatabaseUnavailableError(Exception):
+    """Raised when no database connection can be obtained for a transaction"""
+
+class Transaction:
+    """Statements that run on one connection and are committed together"""
+    def __init__(self, db, conn):
+        self.db = db
+        self.conn = conn
+        self.lastrowid = None
+        self.rolled_back = False
+        self._cursor = None
+    
+    def _cursor_for(self, query):
+        if self.db.statement_cache_size > 0:
+            return self.db._statements(self.conn).get(query)
+        if self._cursor is None:
+            self._cursor = self.conn.raw.cursor(dictionary=True)
+        return self._cursor
+    
+    def execute(self, query, params=None):
+        """Run a write statement and return the affected row count"""
+        with self.db.stats.timed(query) as timing:
+            cursor = self._cursor_for(query)
+            cursor.execute(query, params or ())
+            self.lastrowid = cursor.lastrowid
+            timing['rows'] = cursor.rowcount
+        self.db._wrote(self.conn, describe(query))
+        return cursor.rowcount
+    
+    def fetch_all(self, query, params=None):
+        """Run a SELECT and return all rows"""
+        with self.db.stats.timed(query) as timing:
+            cursor = self._cursor_for(query)
+            cursor.execute(query, params or ())
+            rows = cursor.fetchall()
+            timing['rows'] = len(rows)
+        return rows
+    
+    def fetch_one(self, query, params=None):
+        """Run a SELECT and return the first row or None"""
+        rows = self.fetch_all(query, params)
+        return rows[0] if rows else None
+    
+    def rollback(self):
+        """Abandon the transaction; nothing is committed when the block exits"""
+        self.conn.raw.rollback()
+        self.rolled_back = True
+    
+    def close(self):
+        if self._cursor is not None:
+            try:
+                self._cursor.close()
+            except DriverError:
+                pass
+
 class Database:
-    def __init__(self):
-        self.connection = None
+    def __init__(self, pool_min_size=1, pool_max_size=5, pool_timeout=10.0,
+                 statement_cache_size=64, slow_query_ms=200.0, stats_dump_path=None,
+                 engine=None, sqlite_path=None, ping_after_idle=30.0,
+                 reconnect_backoff=0.5, reconnect_backoff_max=30.0):
+        self.pool = None
         self.host = "localhost"
         self.user = "root"
         self.password = "admin123"
         self.database = "librarymanagement_db"
         self.port = 3306
+        
+        # Storage engine: "mariadb" (default) or "sqlite" for an offline local file
+        self.engine_name = engine or os.environ.get("LIBRARY_DB_ENGINE", "mariadb")
+        self.sqlite_path = sqlite_path or os.environ.get("LIBRARY_DB_PATH", "library.db")
+        self.engine = None
+        
+        # Connection pool settings
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_timeout = pool_timeout
+        
+        # Prepared statement cache per connection (0 disables it)
+        self.statement_cache_size = statement_cache_size
+        self._statement_caches = weakref.WeakSet()
+        
+        # Per-statement timing and slow query log, dumped on close() if a path is set
+        self.stats = QueryStats(slow_query_ms=slow_query_ms)
+        self.stats_dump_path = stats_dump_path
+        
+        # Per-table change counters for result caches
+        self.table_versions = TableVersions()
+        
+        # Health checking: pooled connections idle this long are pinged before
+        # reuse; while the server is unreachable, reconnects back off exponentially
+        self.ping_after_idle = ping_after_idle
+        self.reconnect_backoff = reconnect_backoff
+        self.reconnect_backoff_max = reconnect_backoff_max
+        self._health_lock = threading.Lock()
+        self._down_since = None
+        self._retry_at = 0.0
+        self._backoff = reconnect_backoff
+        
+        # Health counters
+        self.outages = 0
+        self.disconnects = 0
+        self.reconnects = 0
+        self.downtime = 0.0
+        self.last_error = None
+    
+    def _create_connection(self):
+        """Open a new driver connection (used by the pool)"""
+        return self.engine.connect()
+    
+    def _ping(self, connection):
+        """Liveness check run when a pooled connection is borrowed"""
+        connection.ping()
     
     def connect(self):
-        """Establish database connection"""
+        """Establish the database connection pool"""
         try:
-            if self.connection is None:
-                self.connection = mariadb.connect(
+            if self.engine is None:
+                self.engine = create_engine(
+                    self.engine_name,
                     host=self.host,
                     user=self.user,
                     password=self.password,
                     database=self.database,
-                    port=self.port
+                    port=self.port,
+                    path=self.sqlite_path
+                )
+            
+            if self.pool is None:
+                pool = ConnectionPool(
+                    self._create_connection,
+                    min_size=self.pool_min_size,
+                    max_size=self.pool_max_size,
+                    timeout=self.pool_timeout,
+                    validate=self._ping,
+                    validate_after=self.ping_after_idle
                 )
-                logger.info("Database connection established successfully")
+                pool.fill()
+                self.pool = pool
+                logger.info(f"Database connection pool established to {self.engine.describe()} "
+                            f"(min={self.pool_min_size}, max={self.pool_max_size})")
+                
+                # Embedded engines create their own schema on first use
+                if self.engine.schema_script and not self.execute_script(self.engine.schema_script):
+                    return False
             return True
-        except mariadb.Error as e:
-            logger.error(f"Error connecting to MariaDB: {e}")
+        except (*DriverError, RuntimeError, ValueError) as e:
+            logger.error(f"Error connecting to the database: {e}")
+            self._mark_down(e)
             return False
     
-    def execute_query(self, query, params=None, fetch=False):
-        """Execute SQL query"""
-        if self.connection is None:
+    def _checkout(self, exclusive=False):
+        """Borrow a pooled connection, connecting first if needed"""
+        # While the server is down, fail fast until the next reconnect attempt is due
+        if self._down_since is not None and time.monotonic() < self._retry_at:
+            return None
+        
+        if self.pool is None:
             if not self.connect():
                 return None
+        try:
+            conn = self.pool.acquire(exclusive=exclusive)
+        except PoolTimeoutError as e:
+            logger.error(f"Could not get a database connection: {e}")
+            return None
+        except DriverError as e:
+            logger.error(f"Could not get a database connection: {e}")
+            self._mark_down(e)
+            return None
         
-        cursor = self.connection.cursor(dictionary=True)
+        self._mark_up()
+        return conn
+    
+    def _mark_down(self, error):
+        """Record a failed connection attempt and schedule the next one"""
+        with self._health_lock:
+            now = time.monotonic()
+            if self._down_since is None:
+                self._down_since = now
+                self._backoff = self.reconnect_backoff
+                self.outages += 1
+            else:
+                self._backoff = min(self._backoff * 2, self.reconnect_backoff_max)
+            self._retry_at = now + self._backoff
+            self.last_error = str(error)
+        logger.warning(f"Database unavailable, next reconnect attempt in {self._backoff:.1f}s")
+    
+    def _mark_up(self):
+        """Record that the database is reachable again"""
+        if self._down_since is None:
+            return
+        with self._health_lock:
+            if self._down_since is None:
+                return
+            outage = time.monotonic() - self._down_since
+            self._down_since = None
+            self.downtime += outage
+            self.reconnects += 1
+        logger.info(f"Database connection restored after {outage:.1f}s")
+    
+    def _handle_disconnect(self, conn, error):
+        """Drop a connection the server has gone away from
+        
+        Idle connections are dropped too: after a server restart or idle
+        timeout they are all dead. Returns False for ordinary query errors.
+        """
+        if not self.engine.is_disconnect(error):
+            return False
+        with self._health_lock:
+            self.disconnects += 1
+            self.last_error = str(error)
+        self.pool.discard(conn)
+        self.pool.clear_idle()
+        return True
+    
+    def _rollback(self, conn):
+        """Roll back after an error; drop the connection if that fails too"""
         try:
+            conn.raw.rollback()
+            return True
+        except DriverError:
+            self.pool.discard(conn)
+            return False
+    
+    def _statements(self, conn):
+        """Get the prepared statement cache of a pooled connection"""
+        if conn.statements is None:
+            conn.statements = StatementCache(conn.raw, self.statement_cache_size)
+            self._statement_caches.add(conn.statements)
+        return conn.statements
+    
+    def _wrote(self, conn, statement):
+        """Bump the version of the table a write changed (at commit inside a transaction)"""
+        if conn.in_transaction:
+            conn.changed_tables.add(statement.table)
+        else:
+            self._bump_versions({statement.table})
+    
+    def _bump_versions(self, tables):
+        # None stands for a write whose table could not be worked out
+        if None in tables:
+            self.table_versions.bump(None)
+        self.table_versions.bump([table for table in tables if table is not None])
+    
+    def execute_query(self, query, params=None, fetch=False, row_format="dict"):
+        """Execute SQL query
+        
+        row_format picks how fetched rows come back: "dict" (default),
+        plain "tuple", or "record" (a namedtuple built once per result shape).
+        A write returns lastrowid for an INSERT and the row count otherwise,
+        or None when called with fetch=True, as before.
+        """
+        check_row_format(row_format)
+        dictionary = row_format == "dict"
+        statement = describe(query)
+        
+        for attempt in range(2):
+            conn = self._checkout()
+            if conn is None:
+                return None
+            
+            # A read outside a transaction is safe to run again on a fresh connection
+            replayable = attempt == 0 and statement.is_read and not conn.in_transaction
+            statements = None
+            cursor = None
+            start = time.perf_counter()
+            rows = 0
+            failed = False
+            try:
+                if self.statement_cache_size > 0:
+                    statements = self._statements(conn)
+                    cursor = statements.get(query, dictionary)
+                else:
+                    cursor = conn.raw.cursor(dictionary=dictionary)
+                
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                
+                # Connections run in autocommit mode: a write outside
+                # Database.transaction() has already committed, a read has nothing to commit
+                if statement.is_read:
+                    if not fetch:
+                        return cursor.rowcount
+                    result = cursor.fetchall()
+                    rows = len(result)
+                    return convert_rows(result, cursor.description, row_format)
+                
+                rows = cursor.rowcount
+                self._wrote(conn, statement)
+                # fetch=True on a write has always returned None (the write still happens)
+                if fetch:
+                    return None
+                if statement.kind == INSERT:
+                    return cursor.lastrowid
+                return cursor.rowcount
+                    
+            except DriverError as e:
+                failed = True
+                if statements is not None:
+                    statements.invalidate(query, dictionary)
+                if self._handle_disconnect(conn, e):
+                    if replayable:
+                        logger.warning(f"Connection lost, replaying read: {e}")
+                        continue
+                    logger.error(f"Database error: {e}")
+                    return None
+                logger.error(f"Database error: {e}")
+                # Inside a transaction the rollback belongs to transaction(), which
+                # undoes the whole block; rolling back here and carrying on would
+                # let the rest of the block commit without the earlier statements
+                if conn.in_transaction:
+                    raise
+                self._rollback(conn)
+                return None
+            finally:
+                self.stats.record(query, (time.perf_counter() - start) * 1000, rows, failed)
+                if statements is None and cursor is not None:
+                    try:
+                        cursor.close()
+                    except DriverError:
+                        pass
+                self.pool.release(conn)
+    
+    @contextmanager
+    def transaction(self):
+        """Run several statements on one connection as a single unit
+        
+        Commits when the block exits normally and rolls back if it raises.
+        A nested transaction() on the same thread joins the outer one.
+        """
+        conn = self._checkout()
+        if conn is None:
+            raise DatabaseUnavailableError("No database connection")
+        
+        outer = conn.in_transaction
+        tx = Transaction(self, conn)
+        try:
+            if not outer:
+                conn.raw.begin()
+                conn.in_transaction = True
+            yield tx
+            if not outer and not tx.rolled_back:
+                conn.raw.commit()
+                self._bump_versions(conn.changed_tables)
+        except Exception as e:
+            if not outer:
+                logger.error(f"Transaction rolled back: {e}")
+                if not (isinstance(e, DriverError) and self._handle_disconnect(conn, e)):
+                    self._rollback(conn)
+            raise
+        finally:
+            tx.close()
+            if not outer:
+                conn.in_transaction = False
+                conn.changed_tables.clear()
+            self.pool.release(conn)
+    
+    def iter_query(self, query, params=None, chunk_size=500, row_format="dict"):
+        """Stream rows of a SELECT query instead of loading them all at once
+        
+        Rows come from an unbuffered cursor in fetchmany() chunks, so memory
+        stays flat however large the result is. The generator holds its own
+        connection until it is exhausted or closed. A failure raises instead
+        of ending the stream early, so a consumer never mistakes a partial
+        result for the whole one.
+        """
+        check_row_format(row_format)
+        conn = self._checkout(exclusive=True)
+        if conn is None:
+            raise DatabaseUnavailableError("No database connection")
+        
+        cursor = None
+        # Only time spent in the driver counts, not time the consumer spends per row
+        elapsed = 0.0
+        streamed = 0
+        failed = False
+        try:
+            start = time.perf_counter()
+            cursor = conn.raw.cursor(dictionary=row_format == "dict", buffered=False)
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
             
-            if fetch:
-                if 'SELECT' in query.upper() or 'SHOW' in query.upper():
-                    result = cursor.fetchall()
-                    return result
-                else:
-                    return None
-            else:
-                self.connection.commit()
-                if 'INSERT' in query.upper():
-                    return cursor.lastrowid
-                else:
-                    return cursor.rowcount
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                elapsed += time.perf_counter() - start
+                if not rows:
+                    break
+                streamed += len(rows)
+                yield from convert_rows(rows, cursor.description, row_format)
+                start = time.perf_counter()
+        except DriverError as e:
+            failed = True
+            logger.error(f"Database error while streaming: {e}")
+            self._handle_disconnect(conn, e)
+            raise
+        finally:
+            self.stats.record(query, elapsed * 1000, streamed, failed)
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except DriverError:
+                    pass
+            self.pool.release(conn)
+    
+    def execute_many(self, query, rows, batch_size=500):
+        """Execute a write statement for many parameter rows, one commit per batch
+        
+        Returns (written_count, failed) where failed lists (row_index, error)
+        for every row that could not be written.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0, []
+        
+        conn = self._checkout()
+        if conn is None:
+            return 0, [(index, "No database connection") for index in range(len(rows))]
+        
+        written = 0
+        failed = []
+        cursor = None
+        start = 0
+        began = time.perf_counter()
+        try:
+            cursor = conn.raw.cursor()
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                batch_failed = []
+                conn.raw.begin()
+                try:
+                    cursor.executemany(query, batch)
+                except DriverError as e:
+                    logger.warning(f"Batch starting at row {start} failed ({e}), retrying row by row")
+                    if not self._rollback(conn):
+                        raise
+                    
+                    # Find the bad rows; the good ones still go in with one commit
+                    conn.raw.begin()
+                    for offset, row in enumerate(batch):
+                        try:
+                            cursor.execute(query, row)
+                        except DriverError as row_error:
+                            batch_failed.append((start + offset, str(row_error)))
                 
-        except mariadb.Error as e:
-            logger.error(f"Database error: {e}")
-            if self.connection:
-                self.connection.rollback()
-            return None
+                conn.raw.commit()
+                self._wrote(conn, describe(query))
+                written += len(batch) - len(batch_failed)
+                failed.extend(batch_failed)
+            return written, failed
+        except DriverError as e:
+            logger.error(f"Database error during bulk write: {e}")
+            if not self._handle_disconnect(conn, e):
+                self._rollback(conn)
+            failed.extend((index, str(e)) for index in range(start, len(rows)))
+            return written, failed
         finally:
-            cursor.close()
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except DriverError:
+                    pass
+            self.stats.record(query, (time.perf_counter() - began) * 1000, written, bool(failed))
+            self.pool.release(conn)
     
     def execute_script(self, script_path):
         """Execute SQL script from file"""
+        conn = self._checkout()
+        if conn is None:
+            return False
+        
         try:
             with open(script_path, 'r') as file:
                 sql_script = file.read()
             
-            cursor = self.connection.cursor()
+            cursor = conn.raw.cursor()
             for statement in sql_script.split(';'):
                 if statement.strip():
                     cursor.execute(statement)
-            self.connection.commit()
+            conn.raw.commit()
             cursor.close()
+            self.table_versions.bump(None)
             return True
         except Exception as e:
             logger.error(f"Error executing script: {e}")
             return False
+        finally:
+            self.pool.release(conn)
+    
+    def statement_cache_stats(self):
+        """Get prepared statement cache counters summed over all connections"""
+        caches = list(self._statement_caches)
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        return {
+            'connections': len(caches),
+            'statements': sum(len(cache) for cache in caches),
+            'hits': hits,
+            'misses': misses,
+            'evictions': sum(cache.evictions for cache in caches),
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0
+        }
+    
+    def query_stats(self, sort_by='total_ms'):
+        """Get per-statement call counts and latencies, heaviest first"""
+        return self.stats.snapshot(sort_by)
+    
+    def slow_queries(self):
+        """Get the most recent queries slower than the threshold"""
+        return self.stats.slow_queries()
+    
+    def dump_query_stats(self, path=None):
+        """Write query statistics and the slow query log to a JSON file"""
+        return self.stats.dump(path or self.stats_dump_path)
+    
+    def connection_health(self):
+        """Get reconnect counters and current/total downtime"""
+        with self._health_lock:
+            now = time.monotonic()
+            down_for = now - self._down_since if self._down_since is not None else 0.0
+            return {
+                'state': 'down' if self._down_since is not None else 'up',
+                'down_for': round(down_for, 3),
+                'retry_in': round(max(0.0, self._retry_at - now), 3) if down_for else 0.0,
+                'outages': self.outages,
+                'disconnects': self.disconnects,
+                'reconnects': self.reconnects,
+                'downtime': round(self.downtime + down_for, 3),
+                'last_error': self.last_error
+            }
+    
+    def pool_stats(self):
+        """Get connection pool usage counters"""
+        return self.pool.stats() if self.pool else {}
     
     def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-            logger.info("Database connection closed")
+        """Close all pooled database connections"""
+        if self.stats_dump_path:
+            try:
+                self.dump_query_stats()
+            except OSError as e:
+                logger.error(f"Could not write query statistics: {e}")
+        
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+            logger.info("Database connection pool closed")
 
 # Singleton instance
 db_instance = None
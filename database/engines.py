@@ -0,0 +1,241 @@
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+try:
+    import mariadb
+except ImportError:  # SQLite-only installs
+    mariadb = None
+
+# Errors raised by whichever driver is in use; catch this instead of mariadb.Error
+DriverError = (sqlite3.Error, mariadb.Error) if mariadb else (sqlite3.Error,)
+
+SCHEMA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ========== MARIADB ==========
+
+# Server gone away, lost connection, can't connect, connection killed
+_DISCONNECT_ERRNOS = {1927, 2002, 2003, 2006, 2013, 2055, 4031}
+
+class MariaDBEngine:
+    """MariaDB server connections through the mariadb connector"""
+    name = "mariadb"
+
+    # Schema is created by hand with create_tables.sql (see README)
+    schema_script = None
+
+    def __init__(self, host, user, password, database, port=3306):
+        if mariadb is None:
+            raise RuntimeError("The mariadb package is not installed; use the sqlite engine")
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        self.port = port
+
+    def connect(self):
+        # Autocommit: single statements commit themselves and reads leave no
+        # transaction open; Database.transaction() calls begin() explicitly
+        return mariadb.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            port=self.port,
+            autocommit=True
+        )
+
+    def is_disconnect(self, error):
+        """True if error means the connection itself is gone"""
+        return (isinstance(error, mariadb.InterfaceError)
+                or getattr(error, 'errno', None) in _DISCONNECT_ERRNOS)
+
+    def describe(self):
+        return f"MariaDB {self.host}:{self.port}/{self.database}"
+
+# ========== SQLITE ==========
+
+# Dates go in as ISO text and come back typed, like the MariaDB connector returns them
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()))
+
+_TODAY = "DATE('now', 'localtime')"
+_NOW = "DATETIME('now', 'localtime')"
+
+_CURDATE = re.compile(r"\bCURDATE\s*\(\s*\)|\bCURRENT_DATE\b(?!\s*\()", re.I)
+_NOW_CALLS = re.compile(r"\bNOW\s*\(\s*\)|\bCURRENT_TIMESTAMP\b(?!\s*\()", re.I)
+_DATE_PARTS = re.compile(r"\b(YEAR|MONTH|DAY)\s*\(", re.I)
+_DATEDIFF = re.compile(r"\bDATEDIFF\s*\(", re.I)
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\b", re.I)
+
+_STRFTIME = {'YEAR': '%Y', 'MONTH': '%m', 'DAY': '%d'}
+
+def _call_arguments(query, start):
+    """Split the arguments of the call whose '(' is at query[start - 1]
+
+    Returns (arguments, end) where query[end] is just past the closing ')'.
+    """
+    depth = 0
+    quote = None
+    arguments = []
+    current = start
+    for index in range(start, len(query)):
+        char = query[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            if depth == 0:
+                arguments.append(query[current:index].strip())
+                return arguments, index + 1
+            depth -= 1
+        elif char == ',' and depth == 0:
+            arguments.append(query[current:index].strip())
+            current = index + 1
+    raise ValueError(f"Unbalanced parentheses in query: {query}")
+
+def _rewrite_calls(query, pattern, rewrite):
+    """Replace every call matched by pattern with rewrite(match, arguments)"""
+    while True:
+        match = pattern.search(query)
+        if match is None:
+            return query
+        arguments, end = _call_arguments(query, match.end())
+        query = query[:match.start()] + rewrite(match, arguments) + query[end:]
+
+@lru_cache(maxsize=1024)
+def translate_sqlite(query):
+    """Rewrite the MariaDB dialect used by the backend into SQLite SQL"""
+    query = query.replace('%s', '?')
+    query = _FOR_UPDATE.sub('', query)
+    query = _rewrite_calls(
+        query, _DATEDIFF,
+        lambda match, args: f"CAST(julianday({args[0]}) - julianday({args[1]}) AS INTEGER)")
+    query = _rewrite_calls(
+        query, _DATE_PARTS,
+        lambda match, args: (f"CAST(strftime('{_STRFTIME[match.group(1).upper()]}', {args[0]}) "
+                             f"AS INTEGER)"))
+    query = _CURDATE.sub(_TODAY, query)
+    query = _NOW_CALLS.sub(_NOW, query)
+    return query
+
+class SQLiteCursor:
+    """sqlite3 cursor with the parts of the mariadb cursor API the app uses"""
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self.dictionary = dictionary
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, query, params=()):
+        self._cursor.execute(translate_sqlite(query), tuple(params or ()))
+
+    def executemany(self, query, rows):
+        self._cursor.executemany(translate_sqlite(query), [tuple(row) for row in rows])
+
+    def fetchall(self):
+        return self._rows(self._cursor.fetchall())
+
+    def fetchmany(self, size):
+        return self._rows(self._cursor.fetchmany(size))
+
+    def fetchone(self):
+        rows = self._rows(self._cursor.fetchmany(1))
+        return rows[0] if rows else None
+
+    def close(self):
+        self._cursor.close()
+
+    def _rows(self, rows):
+        if not self.dictionary or not rows:
+            return rows
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+class SQLiteConnection:
+    """sqlite3 connection with the parts of the mariadb connection API the app uses"""
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, dictionary=False, prepared=False, buffered=True):
+        # sqlite3 keeps its own per-connection statement cache, so prepared
+        # and buffered make no difference here
+        return SQLiteCursor(self._connection.cursor(), dictionary)
+
+    def begin(self):
+        # IMMEDIATE takes the write lock up front, which stands in for the
+        # SELECT ... FOR UPDATE row locks the backend relies on under MariaDB
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def ping(self):
+        self._connection.execute("SELECT 1")
+
+    def close(self):
+        self._connection.close()
+
+class SQLiteEngine:
+    """Embedded SQLite database file, for offline use and tests"""
+    name = "sqlite"
+    schema_script = os.path.join(SCHEMA_DIR, "create_tables_sqlite.sql")
+
+    def __init__(self, path="library.db", busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+
+    def connect(self):
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,  # Autocommit, like the MariaDB engine
+            check_same_thread=False  # The pool hands a connection to one thread at a time
+        )
+        # WAL lets readers run alongside the single writer
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return SQLiteConnection(connection)
+
+    def is_disconnect(self, error):
+        """True if error means the connection itself is gone"""
+        return isinstance(error, sqlite3.ProgrammingError) and "closed" in str(error)
+
+    def describe(self):
+        return f"SQLite {self.path}"
+
+def create_engine(name, **settings):
+    """Build the engine called name ("mariadb" or "sqlite")"""
+    if name == "mariadb":
+        return MariaDBEngine(settings["host"], settings["user"], settings["password"],
+                             settings["database"], settings.get("port", 3306))
+    if name == "sqlite":
+        return SQLiteEngine(settings.get("path") or "library.db")
+    raise ValueError(f"Unknown database engine: {name!r} (expected 'mariadb' or 'sqlite')")
@@ -0,0 +1,194 @@
+import re
+import json
+import time
+import logging
+import inspect
+import functools
+import threading
+import contextvars
+from collections import deque, Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# "Page.method" of whatever UI code is issuing queries right now
+current_query_tag = contextvars.ContextVar("current_query_tag", default=None)
+
+@contextmanager
+def query_tag(tag):
+    """Attribute every query run inside the block to tag"""
+    token = current_query_tag.set(tag)
+    try:
+        yield
+    finally:
+        current_query_tag.reset(token)
+
+def tag_queries(cls):
+    """Class decorator: tag queries issued by each public method as "Class.method" """
+    for name, func in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(func):
+            continue
+        setattr(cls, name, _tagged(func, f"{cls.__name__}.{name}"))
+    return cls
+
+def _tagged(func, tag):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with query_tag(tag):
+            return func(*args, **kwargs)
+    return wrapper
+
+# ========== FINGERPRINTS ==========
+
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|\?")
+_IN_LISTS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_SPACES = re.compile(r"\s+")
+
+_fingerprints = {}
+
+def fingerprint(query):
+    """Normalize a statement so calls that differ only in literals group together"""
+    cached = _fingerprints.get(query)
+    if cached is not None:
+        return cached
+
+    text = _COMMENTS.sub(" ", query)
+    text = _STRINGS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _IN_LISTS.sub("IN (?+)", text)
+    text = _SPACES.sub(" ", text).strip()
+
+    if len(_fingerprints) < 4096:
+        _fingerprints[query] = text
+    return text
+
+# ========== STATISTICS ==========
+
+class StatementStats:
+    """Counters for one statement fingerprint"""
+    def __init__(self, fingerprint, samples=1000):
+        self.fingerprint = fingerprint
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.latencies = deque(maxlen=samples)
+        self.tags = Counter()
+
+    def percentile(self, fraction):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self):
+        return {
+            'fingerprint': self.fingerprint,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            'p50_ms': round(self.percentile(0.50), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'max_ms': round(self.max_ms, 3),
+            'tags': dict(self.tags.most_common())
+        }
+
+class QueryStats:
+    """Per-statement timing, counters and a slow query log for a Database"""
+    def __init__(self, slow_query_ms=200.0, slow_log_size=200):
+        self.slow_query_ms = slow_query_ms
+        self.enabled = True
+        self._statements = {}
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def record(self, query, elapsed_ms, rows=0, error=False):
+        """Record one execution of query"""
+        if not self.enabled:
+            return
+
+        key = fingerprint(query)
+        tag = current_query_tag.get() or "untagged"
+
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats(key)
+
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.latencies.append(elapsed_ms)
+            stats.tags[tag] += 1
+            if error:
+                stats.errors += 1
+            elif rows and rows > 0:
+                stats.rows += rows
+
+            if elapsed_ms >= self.slow_query_ms:
+                self._slow_log.append({
+                    'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'elapsed_ms': round(elapsed_ms, 3),
+                    'tag': tag,
+                    'fingerprint': key
+                })
+
+        if elapsed_ms >= self.slow_query_ms:
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms) from {tag}: {key}")
+
+    @contextmanager
+    def timed(self, query):
+        """Time the block as one execution of query; set result['rows'] inside"""
+        result = {'rows': 0}
+        start = time.perf_counter()
+        error = True
+        try:
+            yield result
+            error = False
+        finally:
+            self.record(query, (time.perf_counter() - start) * 1000, result['rows'], error)
+
+    def snapshot(self, sort_by='total_ms'):
+        """Per-statement statistics, heaviest first"""
+        with self._lock:
+            rows = [stats.to_dict() for stats in self._statements.values()]
+        return sorted(rows, key=lambda row: row[sort_by], reverse=True)
+
+    def by_tag(self):
+        """Query counts per calling page/method"""
+        totals = Counter()
+        with self._lock:
+            for stats in self._statements.values():
+                totals.update(stats.tags)
+        return dict(totals.most_common())
+
+    def slow_queries(self):
+        """Most recent slow queries, oldest first"""
+        with self._lock:
+            return list(self._slow_log)
+
+    def dump(self, path):
+        """Write statistics and the slow query log to a JSON file"""
+        report = {
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'slow_query_ms': self.slow_query_ms,
+            'statements': self.snapshot(),
+            'by_tag': self.by_tag(),
+            'slow_queries': self.slow_queries()
+        }
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+        return path
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._statements.clear()
+            self._slow_log.clear()
@@ -0,0 +1,23 @@
+from collections import namedtuple
+from functools import lru_cache
+
+# "dict" rows repeat every column name per row; "tuple" and "record" rows
+# only store the values, "record" adds attribute access by column name
+ROW_FORMATS = ("dict", "tuple", "record")
+
+def check_row_format(row_format):
+    """Reject unknown row formats early"""
+    if row_format not in ROW_FORMATS:
+        raise ValueError(f"Unknown row format '{row_format}', expected one of {ROW_FORMATS}")
+
+@lru_cache(maxsize=256)
+def record_class(columns):
+    """Get the namedtuple class for a result shape, created once per column list"""
+    return namedtuple("Row", columns, rename=True)
+
+def convert_rows(rows, description, row_format):
+    """Turn tuple rows from a plain cursor into the requested format"""
+    if row_format == "record":
+        make = record_class(tuple(column[0] for column in description))._make
+        return [make(row) for row in rows]
+    return rows
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+class StatementCache:
+    """Per-connection LRU cache of prepared cursors keyed on SQL text.
+
+    Re-executing a prepared cursor with the same statement lets the driver
+    reuse the server-side statement handle instead of parsing it again.
+    A connection is only ever used by one thread at a time, so no locking.
+    """
+    def __init__(self, connection, capacity=64):
+        self.connection = connection
+        self.capacity = capacity
+        self._cursors = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query, dictionary=True):
+        """Get the prepared cursor for a statement, preparing it on a miss"""
+        key = (query, dictionary)
+        cursor = self._cursors.get(key)
+        if cursor is not None:
+            self._cursors.move_to_end(key)
+            self.hits += 1
+            return cursor
+
+        self.misses += 1
+        cursor = self.connection.cursor(prepared=True, dictionary=dictionary)
+        self._cursors[key] = cursor
+
+        if len(self._cursors) > self.capacity:
+            _, evicted = self._cursors.popitem(last=False)
+            self._close(evicted)
+            self.evictions += 1
+
+        return cursor
+
+    def invalidate(self, query, dictionary=True):
+        """Drop a statement whose cursor hit an error"""
+        cursor = self._cursors.pop((query, dictionary), None)
+        if cursor is not None:
+            self._close(cursor)
+
+    def clear(self):
+        """Close every cached cursor"""
+        while self._cursors:
+            _, cursor = self._cursors.popitem()
+            self._close(cursor)
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def _close(self, cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
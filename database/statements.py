@@ -0,0 +1,85 @@
+import re
+from functools import lru_cache
+
+# Statement kinds
+READ = "read"        # Returns rows, nothing to commit
+WRITE = "write"      # Changes data or schema, returns a row count
+INSERT = "insert"    # Write that also returns the new row id
+
+_READ_VERBS = {"SELECT", "SHOW", "DESCRIBE", "DESC", "EXPLAIN", "VALUES", "TABLE"}
+_INSERT_VERBS = {"INSERT", "REPLACE"}
+_MAIN_VERBS = _READ_VERBS | _INSERT_VERBS | {"UPDATE", "DELETE"}
+
+# Keyword after which a write names its target table, per leading verb
+_TARGET_AFTER = {"INSERT": "INTO", "REPLACE": "INTO", "DELETE": "FROM",
+                 "CREATE": "TABLE", "ALTER": "TABLE", "DROP": "TABLE", "TRUNCATE": "TABLE"}
+_MODIFIERS = {"LOW_PRIORITY", "DELAYED", "HIGH_PRIORITY", "IGNORE", "QUICK", "TEMPORARY",
+              "IF", "NOT", "EXISTS"}
+
+_TOKENS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"[^\"]*\"|`[^`]*`|/\*.*?\*/|--[^\n]*|#[^\n]*|[()]|\w+", re.S)
+
+class Statement:
+    """What execute_query needs to know about one SQL text, worked out once"""
+    __slots__ = ("sql", "verb", "kind", "table")
+
+    def __init__(self, sql, verb, kind, table=None):
+        self.sql = sql
+        self.verb = verb
+        self.kind = kind
+        self.table = table  # Table a write changes; None for reads or if unknown
+
+    @property
+    def is_read(self):
+        return self.kind == READ
+
+    @property
+    def is_write(self):
+        return self.kind != READ
+
+    def __repr__(self):
+        return f"Statement({self.verb}, {self.kind}, {self.table})"
+
+def _main_verb(tokens):
+    """First keyword of the statement and its position, looking past the CTEs of a WITH clause"""
+    depth = 0
+    with_clause = False
+    for index, token in enumerate(tokens):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth = max(0, depth - 1)
+        elif token[0].isalpha():
+            word = token.upper()
+            if not with_clause:
+                if word != "WITH":
+                    return word, index
+                with_clause = True
+            elif depth == 0 and word in _MAIN_VERBS:
+                return word, index
+    return "", len(tokens)
+
+def _target_table(verb, tokens):
+    """Name of the table a write statement changes, lower-cased"""
+    if verb != "UPDATE" and verb not in _TARGET_AFTER:
+        return None
+
+    keyword = _TARGET_AFTER.get(verb)
+    seen_keyword = keyword is None  # UPDATE names its table straight away
+    for token in tokens:
+        word = token.upper()
+        if not seen_keyword:
+            seen_keyword = word == keyword
+        elif word not in _MODIFIERS and word != "TABLE" and (token[0].isalpha() or token[0] == "`"):
+            return token.strip("`").lower()
+    return None
+
+@lru_cache(maxsize=2048)
+def describe(sql):
+    """Classify a SQL statement as READ, WRITE or INSERT (cached per SQL text)"""
+    tokens = _TOKENS.findall(sql)
+    verb, position = _main_verb(tokens)
+    if verb in _READ_VERBS:
+        return Statement(sql, verb, READ)
+
+    kind = INSERT if verb in _INSERT_VERBS else WRITE
+    return Statement(sql, verb, kind, _target_table(verb, tokens[position + 1:]))
@@ -0,0 +1,51 @@
+import threading
+
+# Deleting a row here also changes rows in these tables (ON DELETE CASCADE / SET NULL)
+CASCADES = {
+    'books': ('transactions',),
+    'borrowers': ('transactions',),
+    'users': ('borrowers',),
+}
+
+class TableVersions:
+    """Per-table change counters, bumped by Database after every committed write.
+
+    A cache that remembers snapshot(tables) next to a result knows the result
+    is still current while the snapshot is unchanged. A write whose table is
+    unknown bumps the global counter, which is part of every snapshot.
+    """
+    def __init__(self, cascades=CASCADES):
+        self.cascades = cascades
+        self._versions = {}
+        self._global = 0
+        self._lock = threading.Lock()
+
+    def bump(self, tables):
+        """Record a change to tables (None means "could be anything")"""
+        with self._lock:
+            if tables is None:
+                self._global += 1
+                return
+            for table in self._with_cascades(tables):
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def snapshot(self, tables):
+        """Current versions of tables, comparable with =="""
+        with self._lock:
+            return (self._global,) + tuple(self._versions.get(table, 0) for table in tables)
+
+    def versions(self):
+        """All counters, for inspection"""
+        with self._lock:
+            return dict(self._versions, **{'*': self._global})
+
+    def _with_cascades(self, tables):
+        pending = list(tables)
+        seen = set()
+        while pending:
+            table = pending.pop()
+            if table in seen:
+                continue
+            seen.add(table)
+            pending.extend(self.cascades.get(table, ()))
+        return seen
@@ -1,17 +1,48 @@
 # main.py
+from utils.startup_timing import STARTUP, StartupTimer
+import time
+import logging
+import importlib
 import tkinter as tk
 from tkinter import ttk, messagebox
 import tkinter.font as tkfont
+from collections import OrderedDict
 from pages.login_page import LoginPage
 from pages.signup_page import SignupPage
-from pages.dashboard_page import DashboardPage
-from pages.books_page import BooksPage
-from pages.borrowers_page import BorrowersPage
-from pages.transactions_page import TransactionsPage
-from pages.reports_page import ReportsPage
 from backend.auth import AuthSystem
+from backend.library_backend import LibraryBackend
+from components.task_runner import TaskRunner
 from database.db_connection import get_db_connection
+from database.query_stats import tag_queries
 
+STARTUP.mark("imports")
+
+logger = logging.getLogger(__name__)
+
+# Pages behind the login screen, imported on first navigation or by the preload after login
+PAGE_MODULES = {
+    'dashboard': ('pages.dashboard_page', 'DashboardPage'),
+    'books': ('pages.books_page', 'BooksPage'),
+    'borrowers': ('pages.borrowers_page', 'BorrowersPage'),
+    'transactions': ('pages.transactions_page', 'TransactionsPage'),
+    'reports': ('pages.reports_page', 'ReportsPage'),
+}
+
+# Tables each page shows; a cached page is refreshed on activation only if one changed
+PAGE_TABLES = {
+    'dashboard': ('books', 'borrowers', 'transactions'),
+    'books': ('books',),
+    'borrowers': ('borrowers', 'transactions'),
+    'transactions': ('books', 'borrowers', 'transactions'),
+    'reports': ('books', 'borrowers', 'transactions'),
+}
+
+# Rough memory weight of a cached page (charts and report tables are heavy); past
+# MAX_PAGE_WEIGHT the least recently used pages are destroyed
+PAGE_WEIGHTS = {'reports': 3}
+MAX_PAGE_WEIGHT = 6
+
+@tag_queries
 class LibraryManagementSystem:
     def __init__(self, root):
         self.root = root
@@ -25,11 +56,21 @@ class LibraryManagementSystem:
         # Initialize systems
         self.db = get_db_connection()
         self.auth = AuthSystem()
+        STARTUP.mark("database and auth")
+        self.backend = LibraryBackend()
         self.current_user = None
         self.user_role = None
         
+        # Backend calls run here, off the Tk thread
+        self.tasks = TaskRunner(self.root)
+        
+        # Pages built since login, least recently shown first
+        self.pages = OrderedDict()
+        self.active_page = None
+        
         # Setup styles
         self.setup_styles()
+        STARTUP.mark("styles")
         
         # Create UI container
         self.container = tk.Frame(self.root, bg='white')
@@ -37,6 +78,10 @@ class LibraryManagementSystem:
         
         # Show login page by default
         self.show_login()
+        STARTUP.mark("login page built")
+        
+        # Idle callbacks run once the login screen has been drawn
+        self.root.after_idle(self.report_startup)
         
         # Bind closing event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -62,8 +107,16 @@ class LibraryManagementSystem:
         self.heading_font = tkfont.Font(family="Helvetica", size=12, weight="bold")
         self.normal_font = tkfont.Font(family="Helvetica", size=10)
     
+    def report_startup(self):
+        """Log how long it took to get the login screen up"""
+        STARTUP.mark("login screen drawn")
+        STARTUP.report()
+    
     def clear_container(self):
         """Clear the container"""
+        self.tasks.cancel()
+        self.pages.clear()
+        self.active_page = None
         for widget in self.container.winfo_children():
             widget.destroy()
     
@@ -90,6 +143,7 @@ class LibraryManagementSystem:
         
         # Show dashboard by default
         self.show_dashboard()
+        self.preload()
         
         # Update window title with username
         username = self.current_user['username'] if self.current_user else 'Guest'
@@ -227,65 +281,137 @@ class LibraryManagementSystem:
     
     def show_dashboard(self):
         """Show dashboard page"""
-        self.clear_content_area()
-        self.dashboard_page = DashboardPage(self.content_area, self)
+        self.dashboard_page = self.show_page('dashboard')
         self.update_sidebar_stats()
     
     def show_books(self):
         """Show books management page"""
-        self.clear_content_area()
-        self.books_page = BooksPage(self.content_area, self)
+        self.books_page = self.show_page('books')
     
     def show_borrowers(self):
         """Show borrowers management page"""
-        self.clear_content_area()
-        self.borrowers_page = BorrowersPage(self.content_area, self)
+        self.borrowers_page = self.show_page('borrowers')
     
     def show_transactions(self):
         """Show transactions management page"""
-        self.clear_content_area()
-        self.transactions_page = TransactionsPage(self.content_area, self)
+        self.transactions_page = self.show_page('transactions')
     
     def show_reports(self):
         """Show reports page"""
-        self.clear_content_area()
-        self.reports_page = ReportsPage(self.content_area, self)
+        self.reports_page = self.show_page('reports')
     
     def show_user_management(self):
         """Show user management page (admin/librarian only)"""
-        self.clear_content_area()
         # You can create a UserManagementPage later
-        tk.Label(self.content_area, text="User Management (Coming Soon)", 
-                font=('Helvetica', 20),
-                bg='white').pack(expand=True)
+        self.show_page('user_management', UserManagementPlaceholder)
     
-    def clear_content_area(self):
-        """Clear the content area"""
-        for widget in self.content_area.winfo_children():
-            widget.destroy()
+    def show_page(self, name, page_class=None):
+        """Show a cached page, building it on first use and refreshing it if its tables changed"""
+        self.hide_active_page(name)
+        tables = PAGE_TABLES.get(name, ())
+        
+        # Taken before loading, so a write racing the load leaves the page stale
+        versions = self.db.table_versions.snapshot(tables)
+        entry = self.pages.get(name)
+        if entry is None:
+            start = time.perf_counter()
+            page_class = page_class or self.page_class(name)
+            frame = tk.Frame(self.content_area, bg='white')
+            frame.pack(fill=tk.BOTH, expand=True)
+            entry = {'frame': frame, 'page': page_class(frame, self), 'versions': versions}
+            self.pages[name] = entry
+            logger.info(f"Built {name} page in {(time.perf_counter() - start) * 1000:.1f} ms")
+        else:
+            if self.active_page != name:
+                entry['frame'].pack(fill=tk.BOTH, expand=True)
+            if entry['versions'] != versions and hasattr(entry['page'], 'refresh'):
+                entry['page'].refresh()
+            entry['versions'] = versions
+        
+        self.pages.move_to_end(name)
+        self.active_page = name
+        self.evict_pages()
+        return entry['page']
+    
+    @staticmethod
+    def page_class(name):
+        """Import a page's module on first use and return its class"""
+        module_name, class_name = PAGE_MODULES[name]
+        return getattr(importlib.import_module(module_name), class_name)
+    
+    def preload(self):
+        """Import the remaining pages and matplotlib and warm the search indexes in a worker"""
+        self.tasks.submit(self.preload_modules, self.preload_done, owner=self, key="preload",
+                          on_error=lambda e: logger.warning(f"Background preload failed: {e}"))
+    
+    def preload_modules(self):
+        """Runs in a worker thread; returns its timings"""
+        timer = StartupTimer("Background preload", start=time.perf_counter())
+        for name in PAGE_MODULES:
+            self.page_class(name)
+            timer.mark(f"{name} page")
+        
+        # Charts of the reports page
+        importlib.import_module('pages.reports_page').load_matplotlib()
+        timer.mark("matplotlib")
+        
+        self.backend.warm_search_indexes()
+        timer.mark("search indexes")
+        return timer
+    
+    def preload_done(self, timer):
+        timer.report()
+    
+    def hide_active_page(self, next_page=None):
+        """Hide the page on screen, keeping its widgets for the next visit"""
+        entry = self.pages.get(self.active_page)
+        if entry is None or self.active_page == next_page:
+            return
+        entry['frame'].pack_forget()
+        
+        # Results for a hidden page are dropped; a load cut short means it must reload
+        if self.tasks.cancel(owner=entry['page']):
+            entry['versions'] = None
+        self.active_page = None
+    
+    def evict_pages(self):
+        """Destroy least recently shown pages while the cache is over MAX_PAGE_WEIGHT"""
+        weight = sum(PAGE_WEIGHTS.get(name, 1) for name in self.pages)
+        for name in list(self.pages):
+            if weight <= MAX_PAGE_WEIGHT:
+                break
+            if name == self.active_page:
+                continue
+            entry = self.pages.pop(name)
+            self.tasks.cancel(owner=entry['page'])
+            entry['frame'].destroy()
+            weight -= PAGE_WEIGHTS.get(name, 1)
     
     def update_sidebar_stats(self):
         """Update sidebar statistics"""
-        try:
-            # Query database for statistics
-            books_query = "SELECT COUNT(*) as count FROM books"
-            borrowers_query = "SELECT COUNT(*) as count FROM borrowers"
-            active_query = "SELECT COUNT(*) as count FROM transactions WHERE status = 'borrowed'"
-            overdue_query = "SELECT COUNT(*) as count FROM transactions WHERE status = 'borrowed' AND due_date < CURDATE()"
-            
-            books_count = self.db.execute_query(books_query, fetch=True)[0]['count']
-            borrowers_count = self.db.execute_query(borrowers_query, fetch=True)[0]['count']
-            active_loans = self.db.execute_query(active_query, fetch=True)[0]['count']
-            overdue_loans = self.db.execute_query(overdue_query, fetch=True)[0]['count']
-            
-            # Update labels
-            self.stats_labels['books_count'].config(text=str(books_count))
-            self.stats_labels['borrowers_count'].config(text=str(borrowers_count))
-            self.stats_labels['active_loans'].config(text=str(active_loans))
-            self.stats_labels['overdue_count'].config(text=str(overdue_loans))
-            
-        except Exception as e:
-            print(f"Error updating stats: {e}")
+        self.tasks.submit(self.fetch_sidebar_stats, self.show_sidebar_stats,
+                          owner=self, key="sidebar_stats",
+                          on_error=lambda e: logger.error(f"Error updating stats: {e}"))
+    
+    def fetch_sidebar_stats(self):
+        """Book, borrower, loan and overdue counts (runs in a worker thread)"""
+        # Query database for statistics
+        books_query = "SELECT COUNT(*) as count FROM books"
+        borrowers_query = "SELECT COUNT(*) as count FROM borrowers"
+        active_query = "SELECT COUNT(*) as count FROM transactions WHERE status = 'borrowed'"
+        overdue_query = "SELECT COUNT(*) as count FROM transactions WHERE status = 'borrowed' AND due_date < CURDATE()"
+        
+        return {
+            'books_count': self.db.execute_query(books_query, fetch=True)[0]['count'],
+            'borrowers_count': self.db.execute_query(borrowers_query, fetch=True)[0]['count'],
+            'active_loans': self.db.execute_query(active_query, fetch=True)[0]['count'],
+            'overdue_count': self.db.execute_query(overdue_query, fetch=True)[0]['count']
+        }
+    
+    def show_sidebar_stats(self, counts):
+        """Show the counts from fetch_sidebar_stats()"""
+        for name, count in counts.items():
+            self.stats_labels[name].config(text=str(count))
     
     # ========== AUTHENTICATION METHODS ==========
     
@@ -302,10 +428,20 @@ class LibraryManagementSystem:
     def on_closing(self):
         """Handle application closing"""
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
+            # Keep the fuzzy search indexes so the next start does not rebuild them
+            self.backend.save_search_indexes()
+            
             # Close database connection
+            self.tasks.shutdown()
             self.db.close()
             self.root.destroy()
 
+class UserManagementPlaceholder:
+    def __init__(self, parent, controller):
+        tk.Label(parent, text="User Management (Coming Soon)", 
+                font=('Helvetica', 20),
+                bg='white').pack(expand=True)
+
 def main():
     """Main application entry point"""
     root = tk.Tk()
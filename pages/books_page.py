@@ -1,15 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from components.widgets import ModernButton, ModernTreeview, InputField, MessageBox
-from backend.library_backend import LibraryBackend
-from utils.helpers import validate_book_data
+from components.widgets import ModernButton, ModernTreeview, Pager, LiveSearch, InputField, MessageBox
+from utils.helpers import validate_book_data, fold_text
+from database.query_stats import tag_queries
 
+# Rows per page of the listing
+PAGE_SIZE = 100
+
+# Books offered by the edit selector, and how long typing must pause before they are looked up
+EDIT_CHOICES_LIMIT = 20
+EDIT_CHOICES_DELAY_MS = 150
+
+# Book column searched by each "By" choice with LIKE; results can be narrowed client-side
+SEARCH_FIELDS = {'title': 'title', 'author': 'author', 'category': 'category', 'isbn': 'isbn'}
+
+@tag_queries
 class BooksPage:
     def __init__(self, parent, controller):
         self.parent = parent
         self.controller = controller
-        self.backend = LibraryBackend()
+        self.backend = controller.backend
         self.current_book_id = None
+        self._edit_choices_job = None
         
         self.setup_ui()
         self.load_books()
@@ -45,7 +57,7 @@ class BooksPage:
                 font=('Helvetica', 10),
                 bg='white').pack(side=tk.LEFT, padx=(0, 5))
         
-        self.search_by = ttk.Combobox(search_frame, values=["Title", "Author", "Category", "ISBN"],
+        self.search_by = ttk.Combobox(search_frame, values=["Title", "Author", "Category", "ISBN", "All Fields"],
                                      state="readonly", width=15)
         self.search_by.set("Title")
         self.search_by.pack(side=tk.LEFT, padx=(0, 10))
@@ -59,6 +71,13 @@ class BooksPage:
                              relief=tk.FLAT, padx=10)
         clear_btn.pack(side=tk.LEFT)
         
+        # Results follow the search box as it is typed into
+        self.live_search = LiveSearch(self.search_entry, self.search_var, self.search_by,
+                                      search=self.find_books, render=self.show_search_results,
+                                      reset=self.load_books, refine=self.book_filter,
+                                      version=lambda: self.backend.db.table_versions.snapshot(('books',)),
+                                      tasks=self.controller.tasks, owner=self)
+        
         # Notebook for tabs
         self.notebook = ttk.Notebook(self.main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
@@ -106,6 +125,13 @@ class BooksPage:
                     command=self.delete_selected_book,
                     bg='#EF4444').pack(side=tk.LEFT, padx=5)
         
+        # Page through the catalog by (title, book_id)
+        self.books_pager = Pager(action_frame, fetch=self.backend.get_books_page,
+                                 cursor=lambda book: (book['title'], book['book_id']),
+                                 render=self.show_books, page_size=PAGE_SIZE,
+                                 tasks=self.controller.tasks, owner=self)
+        self.books_pager.pack(side=tk.RIGHT, padx=5)
+        
         # Statistics
         stats_frame = tk.Frame(self.view_tab, bg='white')
         stats_frame.pack(fill=tk.X, pady=10)
@@ -175,9 +201,11 @@ class BooksPage:
                 font=('Helvetica', 10, 'bold'),
                 bg='white').pack(side=tk.LEFT, padx=(0, 10))
         
-        self.book_selector = ttk.Combobox(select_frame, state="readonly", width=40)
+        # Type part of a title or ISBN; matches come from the completion index, not the page on screen
+        self.book_selector = ttk.Combobox(select_frame, width=40)
         self.book_selector.pack(side=tk.LEFT, padx=(0, 10))
         self.book_selector.bind('<<ComboboxSelected>>', self.load_book_for_edit)
+        self.book_selector.bind('<KeyRelease>', self.schedule_edit_choices)
         
         load_btn = ModernButton(select_frame, text="📥 Load", 
                                command=self.load_selected_book)
@@ -216,76 +244,119 @@ class BooksPage:
         update_btn.pack(pady=20)
     
     def load_books(self):
-        """Load books into treeview"""
-        # Clear existing items
-        for item in self.books_tree.get_children():
-            self.books_tree.delete(item)
-        
-        # Get books from backend
-        books = self.backend.get_all_books()
-        
-        # Add to treeview
-        total_books = len(books)
-        total_copies = 0
-        available_copies = 0
-        
-        for book in books:
-            self.books_tree.insert("", tk.END, values=(
-                book['book_id'],
-                book['title'],
-                book['author'],
-                book['category'],
-                book['year'],
-                book['copies'],
-                book['available_copies']
-            ))
-            
-            total_copies += book['copies']
-            available_copies += book['available_copies']
+        """Load the current page of books into treeview"""
+        self.books_pager.load()
+        self.load_totals()
+        self.load_edit_choices()
+    
+    def load_totals(self):
+        """Totals come from the statistics query, not from the rows on screen"""
+        self.controller.tasks.submit(self.backend.get_book_statistics, self.show_totals,
+                                     owner=self, key="totals")
+    
+    def refresh(self):
+        """Reload the page or search results on screen after the books changed while it was hidden"""
+        if self.search_var.get().strip():
+            self.live_search.run()
+            self.load_totals()
+            self.load_edit_choices()
+        else:
+            self.load_books()
+    
+    def show_totals(self, stats):
+        """Show catalog totals from get_book_statistics()"""
+        total_copies = stats.get('total_copies') or 0
+        available_copies = stats.get('available_copies') or 0
         
         # Update statistics
-        self.total_books_label.config(text=f"Total Books: {total_books}")
+        self.total_books_label.config(text=f"Total Books: {stats.get('total_books') or 0}")
         self.available_label.config(text=f"Available: {available_copies}")
         self.borrowed_label.config(text=f"Borrowed: {total_copies - available_copies}")
-        
-        # Update book selector for edit tab
-        book_options = [f"{book['title']} by {book['author']} (ID: {book['book_id']})" 
-                       for book in books]
-        self.book_selector['values'] = book_options
-        if book_options:
-            self.book_selector.set(book_options[0])
     
-    def search_books(self):
-        """Search books based on criteria"""
-        search_term = self.search_var.get()
-        search_by = self.search_by.get().lower()
-        
-        if not search_term:
-            self.load_books()
+    def show_books(self, books):
+        """Show one page of books"""
+        # Only rows that changed since the last refresh are touched
+        self.books_tree.sync_rows(self.book_values(book) for book in books)
+    
+    @staticmethod
+    def book_option(book):
+        """Edit selector text for a book; load_selected_book() reads the ID back"""
+        return f"{book['title']} by {book['author']} (ID: {book['book_id']})"
+    
+    def schedule_edit_choices(self, event):
+        """Look up matching books once typing pauses, not on every key"""
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
             return
-        
-        books = self.backend.search_books(search_term, search_by)
-        
-        # Clear existing items
-        for item in self.books_tree.get_children():
-            self.books_tree.delete(item)
-        
-        # Add search results
-        for book in books:
-            self.books_tree.insert("", tk.END, values=(
-                book['book_id'],
-                book['title'],
-                book['author'],
-                book['category'],
-                book['year'],
-                book['copies'],
-                book['available_copies']
-            ))
+        if self._edit_choices_job is not None:
+            self.parent.after_cancel(self._edit_choices_job)
+        self._edit_choices_job = self.parent.after(EDIT_CHOICES_DELAY_MS, self.load_edit_choices)
+    
+    def load_edit_choices(self):
+        """Fill the edit selector with any book matching what was typed, on or off the current page"""
+        self._edit_choices_job = None
+        text = self.book_selector.get()
+        if text in self.book_selector['values']:
+            text = ""
+        self.controller.tasks.submit(
+            lambda: self.backend.complete_books(text, EDIT_CHOICES_LIMIT, available_only=False),
+            self.show_edit_choices, owner=self, key="edit_choices")
+    
+    def show_edit_choices(self, books):
+        """Offer the books found by load_edit_choices()"""
+        self.book_selector['values'] = [self.book_option(book) for book in books]
+    
+    def search_books(self):
+        """Search books now (Search button)"""
+        self.live_search.run()
+    
+    def find_books(self, search_term, search_by):
+        """(books, complete): complete when they are every LIKE match (runs in a worker thread)"""
+        search_by = search_by.lower()
+        if search_by == "all fields":
+            # Ranked full-text search: every word must match somewhere
+            books = self.backend.search_catalog(search_term)
+            complete = False
+        else:
+            books = self.backend.search_books(search_term, search_by)
+            complete = True
+        
+        if not books and search_by in ("title", "author", "all fields"):
+            # Nothing matched exactly; fall back to close spellings ("Tolkein")
+            books = self.backend.fuzzy_search_books(search_term)
+            complete = False
+        return books, complete
+    
+    @staticmethod
+    def book_filter(search_by, search_term):
+        """Row predicate matching search_books' LIKE, or None if it cannot be applied here"""
+        field = SEARCH_FIELDS.get(search_by.lower())
+        # LIKE wildcards match more than the literal text would
+        if field is None or '%' in search_term or '_' in search_term:
+            return None
+        needle = fold_text(search_term)
+        return lambda book: needle in fold_text(book[field])
+    
+    def show_search_results(self, books):
+        """Show search results; the pager is off until the search is cleared"""
+        self.books_pager.suspend()
+        self.books_tree.sync_rows(self.book_values(book) for book in books)
+    
+    @staticmethod
+    def book_values(book):
+        return (
+            book['book_id'],
+            book['title'],
+            book['author'],
+            book['category'],
+            book['year'],
+            book['copies'],
+            book['available_copies']
+        )
     
     def clear_search(self):
         """Clear search and reload all books"""
+        # The live search reloads the listing once the box is empty
         self.search_var.set("")
-        self.load_books()
     
     def add_book(self):
         """Add a new book"""
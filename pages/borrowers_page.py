@@ -1,15 +1,28 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from components.widgets import ModernButton, ModernTreeview, InputField, MessageBox
-from backend.library_backend import LibraryBackend
-from utils.helpers import validate_borrower_data, validate_email, validate_phone
+from components.widgets import ModernButton, ModernTreeview, Pager, LiveSearch, InputField, MessageBox
+from utils.helpers import validate_borrower_data, validate_email, validate_phone, fold_text
+from database.query_stats import tag_queries
 
+# Rows per page of the listing
+PAGE_SIZE = 100
+
+# Borrowers offered by the edit selector, and how long typing must pause before they are looked up
+EDIT_CHOICES_LIMIT = 20
+EDIT_CHOICES_DELAY_MS = 150
+
+# Borrower column searched by each "By" choice with LIKE; results can be narrowed client-side
+SEARCH_FIELDS = {'name': 'name', 'email': 'email', 'phone': 'phone'}
+
+@tag_queries
 class BorrowersPage:
     def __init__(self, parent, controller):
         self.parent = parent
         self.controller = controller
-        self.backend = LibraryBackend()
+        self.backend = controller.backend
         self.current_borrower_id = None
+        self.edit_choices = {}          # selector option -> borrower_id
+        self._edit_choices_job = None
         
         self.setup_ui()
         self.load_borrowers()
@@ -59,6 +72,14 @@ class BorrowersPage:
                              relief=tk.FLAT, padx=10)
         clear_btn.pack(side=tk.LEFT)
         
+        # Results follow the search box as it is typed into (loan counts come with the rows)
+        self.live_search = LiveSearch(self.search_entry, self.search_var, self.search_by,
+                                      search=self.find_borrowers, render=self.show_search_results,
+                                      reset=self.load_borrowers, refine=self.borrower_filter,
+                                      version=lambda: self.backend.db.table_versions.snapshot(
+                                          ('borrowers', 'transactions')),
+                                      tasks=self.controller.tasks, owner=self)
+        
         # Notebook for tabs
         self.notebook = ttk.Notebook(self.main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
@@ -106,6 +127,13 @@ class BorrowersPage:
                     command=self.delete_selected_borrower,
                     bg='#EF4444').pack(side=tk.LEFT, padx=5)
         
+        # Page through borrowers by (name, borrower_id)
+        self.borrowers_pager = Pager(action_frame, fetch=self.backend.get_borrowers_page,
+                                     cursor=lambda borrower: (borrower['name'], borrower['borrower_id']),
+                                     render=self.show_borrowers, page_size=PAGE_SIZE,
+                                     tasks=self.controller.tasks, owner=self)
+        self.borrowers_pager.pack(side=tk.RIGHT, padx=5)
+        
         # Statistics
         stats_frame = tk.Frame(self.view_tab, bg='white')
         stats_frame.pack(fill=tk.X, pady=10)
@@ -157,9 +185,11 @@ class BorrowersPage:
                 font=('Helvetica', 10, 'bold'),
                 bg='white').pack(side=tk.LEFT, padx=(0, 10))
         
-        self.borrower_selector = ttk.Combobox(select_frame, state="readonly", width=40)
+        # Type part of a name or email; matches come from the completion index, not the page on screen
+        self.borrower_selector = ttk.Combobox(select_frame, width=40)
         self.borrower_selector.pack(side=tk.LEFT, padx=(0, 10))
         self.borrower_selector.bind('<<ComboboxSelected>>', self.load_borrower_for_edit)
+        self.borrower_selector.bind('<KeyRelease>', self.schedule_edit_choices)
         
         load_btn = ModernButton(select_frame, text="📥 Load", 
                                command=self.load_selected_borrower)
@@ -181,80 +211,122 @@ class BorrowersPage:
         update_btn.pack(pady=20)
     
     def load_borrowers(self):
-        """Load borrowers into treeview"""
-        # Clear existing items
-        for item in self.borrowers_tree.get_children():
-            self.borrowers_tree.delete(item)
-        
-        # Get borrowers from backend
-        borrowers = self.backend.get_all_borrowers()
-        
-        # Add to treeview
-        total_borrowers = len(borrowers)
-        total_active_loans = 0
-        
-        for borrower in borrowers:
-            self.borrowers_tree.insert("", tk.END, values=(
-                borrower['borrower_id'],
-                borrower['name'],
-                borrower['email'],
-                borrower['phone'] or "",
-                borrower['active_loans'],
-                borrower['registered_date']
-            ))
-            
-            total_active_loans += borrower['active_loans']
+        """Load the current page of borrowers into treeview"""
+        self.borrowers_pager.load()
+        self.load_totals()
+        self.load_edit_choices()
+    
+    def load_totals(self):
+        """Totals come from the statistics queries, not from the rows on screen"""
+        self.controller.tasks.submit(self.fetch_totals, self.show_totals, owner=self, key="totals")
+    
+    def refresh(self):
+        """Reload the page or search results on screen after borrowers or loans changed while it was hidden"""
+        if self.search_var.get().strip():
+            self.live_search.run()
+            self.load_totals()
+            self.load_edit_choices()
+        else:
+            self.load_borrowers()
+    
+    def fetch_totals(self):
+        """Borrower, loan and overdue totals (runs in a worker thread)"""
+        return (self.backend.get_borrower_statistics(),
+                self.backend.get_transaction_statistics(),
+                self.backend.get_overdue_books())
+    
+    def show_totals(self, totals):
+        """Show the totals fetched by fetch_totals()"""
+        borrower_stats, transaction_stats, overdue = totals
         
         # Update statistics
-        self.total_borrowers_label.config(text=f"Total Borrowers: {total_borrowers}")
-        self.active_loans_label.config(text=f"Active Loans: {total_active_loans}")
-        
-        # Get overdue count
-        overdue = self.backend.get_overdue_books()
+        self.total_borrowers_label.config(text=f"Total Borrowers: {borrower_stats.get('total_borrowers') or 0}")
+        self.active_loans_label.config(text=f"Active Loans: {transaction_stats.get('active_loans') or 0}")
         self.overdue_label.config(text=f"Overdue: {len(overdue)}")
-        
-        # Update borrower selector for edit tab
-        borrower_options = [f"{borrower['name']} ({borrower['email']})" 
-                           for borrower in borrowers]
-        self.borrower_selector['values'] = borrower_options
-        if borrower_options:
-            self.borrower_selector.set(borrower_options[0])
     
-    def search_borrowers(self):
-        """Search borrowers based on criteria"""
-        search_term = self.search_var.get()
-        search_by = self.search_by.get().lower()
-        
-        if not search_term:
-            self.load_borrowers()
+    def show_borrowers(self, borrowers):
+        """Show one page of borrowers"""
+        # Only rows that changed since the last refresh are touched
+        self.borrowers_tree.sync_rows((
+            borrower['borrower_id'],
+            borrower['name'],
+            borrower['email'],
+            borrower['phone'] or "",
+            borrower['active_loans'],
+            borrower['registered_date']
+        ) for borrower in borrowers)
+    
+    def schedule_edit_choices(self, event):
+        """Look up matching borrowers once typing pauses, not on every key"""
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
             return
-        
+        if self._edit_choices_job is not None:
+            self.parent.after_cancel(self._edit_choices_job)
+        self._edit_choices_job = self.parent.after(EDIT_CHOICES_DELAY_MS, self.load_edit_choices)
+    
+    def load_edit_choices(self):
+        """Fill the edit selector with any borrower matching what was typed, on or off the current page"""
+        self._edit_choices_job = None
+        text = self.borrower_selector.get()
+        if text in self.edit_choices:
+            text = ""
+        self.controller.tasks.submit(
+            lambda: self.backend.complete_borrowers(text, EDIT_CHOICES_LIMIT),
+            self.show_edit_choices, owner=self, key="edit_choices")
+    
+    def show_edit_choices(self, borrowers):
+        """Offer the borrowers found by load_edit_choices()"""
+        # An option still on screen keeps resolving to its borrower after the list changes
+        selected = self.borrower_selector.get()
+        kept = {selected: self.edit_choices[selected]} if selected in self.edit_choices else {}
+        self.edit_choices = {f"{borrower['name']} ({borrower['email']})": borrower['borrower_id']
+                             for borrower in borrowers}
+        self.borrower_selector['values'] = list(self.edit_choices)
+        self.edit_choices.update(kept)
+    
+    def search_borrowers(self):
+        """Search borrowers now (Search button)"""
+        self.live_search.run()
+    
+    def find_borrowers(self, search_term, search_by):
+        """(borrowers, complete): complete when they are every LIKE match (runs in a worker thread)"""
+        search_by = search_by.lower()
         borrowers = self.backend.search_borrowers(search_term, search_by)
-        
-        # Clear existing items
-        for item in self.borrowers_tree.get_children():
-            self.borrowers_tree.delete(item)
-        
-        # Add search results
-        for borrower in borrowers:
-            # Get active loans count
-            active_loans = self.backend.get_active_loans()
-            borrower_active_loans = sum(1 for loan in active_loans 
-                                      if loan['borrower_id'] == borrower['borrower_id'])
-            
-            self.borrowers_tree.insert("", tk.END, values=(
-                borrower['borrower_id'],
-                borrower['name'],
-                borrower['email'],
-                borrower['phone'] or "",
-                borrower_active_loans,
-                borrower['created_date']
-            ))
+        complete = True
+        if not borrowers and search_by in ("name", "email"):
+            # Nothing matched exactly; fall back to close spellings ("Jonh Smith")
+            borrowers = self.backend.fuzzy_search_borrowers(search_term)
+            complete = False
+        
+        # Both searches return each borrower's active-loan count with the rows
+        return borrowers, complete
+    
+    @staticmethod
+    def borrower_filter(search_by, search_term):
+        """Row predicate matching search_borrowers' LIKE, or None if it cannot be applied here"""
+        field = SEARCH_FIELDS.get(search_by.lower())
+        # LIKE wildcards match more than the literal text would
+        if field is None or '%' in search_term or '_' in search_term:
+            return None
+        needle = fold_text(search_term)
+        return lambda borrower: needle in fold_text(borrower[field])
+    
+    def show_search_results(self, borrowers):
+        """Show search results; the pager is off until the search is cleared"""
+        self.borrowers_pager.suspend()
+        self.borrowers_tree.sync_rows((
+            borrower['borrower_id'],
+            borrower['name'],
+            borrower['email'],
+            borrower['phone'] or "",
+            borrower['active_loans'],
+            borrower['created_date']
+        ) for borrower in borrowers)
     
     def clear_search(self):
         """Clear search and reload all borrowers"""
+        # The live search reloads the listing once the box is empty
         self.search_var.set("")
-        self.load_borrowers()
     
     def add_borrower(self):
         """Add a new borrower"""
@@ -314,16 +386,12 @@ class BorrowersPage:
         if not selected:
             return
         
-        # Find borrower by email (extracted from selection)
-        try:
-            email = selected.split("(")[1].strip(")")
-            borrowers = self.backend.get_all_borrowers()
-            borrower = next((b for b in borrowers if b['email'] == email), None)
-            
-            if borrower:
-                self.load_borrower_by_id(borrower['borrower_id'])
-        except:
+        # The option maps to its borrower; typed text that matches nothing is not a selection
+        borrower_id = self.edit_choices.get(selected)
+        if borrower_id is None:
             MessageBox.show_error("Invalid selection")
+            return
+        self.load_borrower_by_id(borrower_id)
     
     def load_borrower_for_edit(self, event=None):
         """Load borrower when selected from combobox"""
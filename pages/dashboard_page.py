@@ -1,14 +1,15 @@
 import tkinter as tk
 from tkinter import ttk
 from components.widgets import CardFrame, ModernButton, MessageBox
-from backend.library_backend import LibraryBackend
 from datetime import datetime
+from database.query_stats import tag_queries
 
+@tag_queries
 class DashboardPage:
     def __init__(self, parent, controller):
         self.parent = parent
         self.controller = controller
-        self.backend = LibraryBackend()
+        self.backend = controller.backend
         
         self.setup_ui()
         self.load_data()
@@ -82,40 +83,47 @@ class DashboardPage:
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
     
     def load_data(self):
-        """Load dashboard data"""
-        try:
-            stats = self.backend.get_system_statistics()
-            
-            # Update cards
-            card_values = {
-                'books_count': str(stats.get('total_books', 0)),
-                'borrowers_count': str(stats.get('total_borrowers', 0)),
-                'active_loans': str(stats.get('active_loans', 0)),
-                'overdue_count': str(stats.get('overdue_count', 0)),
-                'available_copies': str(stats.get('available_copies', 0)),
-                'total_fines': f"${stats.get('total_fines', 0):.2f}"
-            }
-            
-            for key, card in self.cards.items():
-                card.update_value(card_values.get(key, "0"))
-            
-            # Update recent activity
-            self.update_recent_activity()
-            
-        except Exception as e:
-            MessageBox.show_error(f"Failed to load dashboard data: {str(e)}")
+        """Load dashboard data in the background"""
+        self.controller.tasks.submit(
+            self.fetch_data, self.show_data, owner=self, key="load_data",
+            on_error=lambda e: MessageBox.show_error(f"Failed to load dashboard data: {str(e)}"))
+    
+    def refresh(self):
+        """Reload after the tables shown here changed while the page was hidden"""
+        self.load_data()
     
-    def update_recent_activity(self):
+    def fetch_data(self):
+        """Statistics and the 10 most recent transactions (runs in a worker thread)"""
+        return self.backend.get_system_statistics(), self.backend.get_transactions_page(limit=10)
+    
+    def show_data(self, data):
+        """Update cards and recent activity with fetched data"""
+        stats, transactions = data
+        
+        # Update cards
+        card_values = {
+            'books_count': str(stats.get('total_books', 0)),
+            'borrowers_count': str(stats.get('total_borrowers', 0)),
+            'active_loans': str(stats.get('active_loans', 0)),
+            'overdue_count': str(stats.get('overdue_count', 0)),
+            'available_copies': str(stats.get('available_copies', 0)),
+            'total_fines': f"${stats.get('total_fines') or 0:.2f}"
+        }
+        
+        for key, card in self.cards.items():
+            card.update_value(card_values.get(key, "0"))
+        
+        # Update recent activity
+        self.update_recent_activity(transactions)
+    
+    def update_recent_activity(self, transactions):
         """Update recent activity treeview"""
         # Clear existing items
         for item in self.activity_tree.get_children():
             self.activity_tree.delete(item)
         
-        # Get recent transactions
-        transactions = self.backend.get_all_transactions()
-        
-        # Add to treeview (limit to 10)
-        for tx in transactions[:10]:
+        # Add to treeview
+        for tx in transactions:
             status = tx['status']
             status_icon = {
                 'borrowed': '🟡',
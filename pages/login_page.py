@@ -3,7 +3,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from backend.auth import AuthSystem
 from components.widgets import ModernButton, InputField, MessageBox
+from database.query_stats import tag_queries
 
+@tag_queries
 class LoginPage:
     def __init__(self, parent, controller):
         self.parent = parent
@@ -103,24 +105,29 @@ class LoginPage:
                                  "Please enter username/email and password")
             return
         
-        # Show loading
+        # Show loading while the check runs off the Tk thread
         self.parent.config(cursor='watch')
-        self.parent.update()
-        
-        try:
-            success, message = self.auth.login(username, password)
-            
-            if success:
-                user = self.auth.get_current_user()
-                messagebox.showinfo("Login Successful", message)
-                self.controller.show_main_app(user['role'])
-            else:
-                messagebox.showerror("Login Failed", message)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Login error: {str(e)}")
-        finally:
-            self.parent.config(cursor='')
+        self.controller.tasks.submit(
+            lambda: self.auth.login(username, password),
+            self.finish_login, on_error=self.login_failed,
+            owner=self, key="login", loading=True)
+    
+    def finish_login(self, result):
+        """Handle the (success, message) of AuthSystem.login"""
+        self.parent.config(cursor='')
+        success, message = result
+        
+        if success:
+            user = self.auth.get_current_user()
+            messagebox.showinfo("Login Successful", message)
+            self.controller.show_main_app(user['role'])
+        else:
+            messagebox.showerror("Login Failed", message)
+    
+    def login_failed(self, error):
+        """Report an exception raised while logging in"""
+        self.parent.config(cursor='')
+        messagebox.showerror("Error", f"Login error: {str(error)}")
     
     def show_forgot_password(self):
         """Show forgot password dialog"""
@@ -2,16 +2,21 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
 from components.widgets import ModernButton, ModernTreeview, MessageBox
-from backend.library_backend import LibraryBackend
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from database.query_stats import tag_queries
 
+def load_matplotlib():
+    """Figure and FigureCanvasTkAgg, imported on the first chart instead of with the page"""
+    # matplotlib (and numpy under it) is most of this page's import time
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg
+
+@tag_queries
 class ReportsPage:
     def __init__(self, parent, controller):
         self.parent = parent
         self.controller = controller
-        self.backend = LibraryBackend()
+        self.backend = controller.backend
         
         self.setup_ui()
         self.load_dashboard()
@@ -342,47 +347,60 @@ class ReportsPage:
     
     def load_dashboard(self):
         """Load dashboard data"""
-        try:
-            stats = self.backend.get_system_statistics()
-            
-            # Update metrics
-            self.metric_labels["Total Books"].config(text=str(stats.get('total_books', 0)))
-            self.metric_labels["Total Borrowers"].config(text=str(stats.get('total_borrowers', 0)))
-            self.metric_labels["Active Loans"].config(text=str(stats.get('active_loans', 0)))
-            self.metric_labels["Overdue Books"].config(text=str(stats.get('overdue_books', 0)))
-            self.metric_labels["Available Books"].config(text=str(stats.get('available_copies', 0)))
-            self.metric_labels["Total Fines"].config(text=f"${stats.get('total_fines', 0):.2f}")
-            
-            # Load category chart
-            self.load_category_chart()
-            
-            # Load monthly trend chart
-            self.load_monthly_trend_chart()
-            
-            # Load top books
-            self.load_top_books()
-            
-            # Load top borrowers
-            self.load_top_borrowers()
-            
-        except Exception as e:
-            MessageBox.show_error(f"Failed to load dashboard: {str(e)}")
+        self.controller.tasks.submit(
+            self.fetch_dashboard, self.show_dashboard, owner=self, key="dashboard",
+            on_error=lambda e: MessageBox.show_error(f"Failed to load dashboard: {str(e)}"))
+    
+    def fetch_dashboard(self):
+        """Statistics, categories and top lists for the dashboard tab (runs in a worker thread)"""
+        return {
+            'stats': self.backend.get_system_statistics(),
+            'categories': self.backend.get_category_report(),
+            'top_books': self.backend.get_popular_books_report(limit=10),
+            'top_borrowers': self.backend.get_borrower_activity_report(limit=10)
+        }
+    
+    def show_dashboard(self, data):
+        """Show the data fetched by fetch_dashboard()"""
+        stats = data['stats']
+        
+        # Update metrics
+        self.metric_labels["Total Books"].config(text=str(stats.get('total_books', 0)))
+        self.metric_labels["Total Borrowers"].config(text=str(stats.get('total_borrowers', 0)))
+        self.metric_labels["Active Loans"].config(text=str(stats.get('active_loans', 0)))
+        self.metric_labels["Overdue Books"].config(text=str(stats.get('overdue_books', 0)))
+        self.metric_labels["Available Books"].config(text=str(stats.get('available_copies', 0)))
+        self.metric_labels["Total Fines"].config(text=f"${stats.get('total_fines') or 0:.2f}")
+        
+        # Load category chart
+        self.load_category_chart(data['categories'])
+        
+        # Load monthly trend chart
+        self.load_monthly_trend_chart()
+        
+        # Load top books
+        self.load_top_books(data['top_books'])
+        
+        # Load top borrowers
+        self.load_top_borrowers(data['top_borrowers'])
     
-    def load_category_chart(self):
+    def refresh(self):
+        """Reload the dashboard tab; the other reports are rebuilt on request"""
+        self.load_dashboard()
+    
+    def load_category_chart(self, categories):
         """Load book categories pie chart"""
         # Clear previous chart
         for widget in self.category_canvas_frame.winfo_children():
             widget.destroy()
         
-        # Get category data
-        categories = self.backend.get_category_report()
-        
         if not categories:
             tk.Label(self.category_canvas_frame, text="No category data available",
                     bg='white').pack(expand=True)
             return
         
         # Create figure
+        Figure, FigureCanvasTkAgg = load_matplotlib()
         fig = Figure(figsize=(5, 4), dpi=100)
         ax = fig.add_subplot(111)
         
@@ -413,15 +431,12 @@ class ReportsPage:
         tk.Label(self.monthly_canvas_frame, text="Monthly trend data would be displayed here",
                 bg='white').pack(expand=True)
     
-    def load_top_books(self):
+    def load_top_books(self, top_books):
         """Load top borrowed books"""
         # Clear existing items
         for item in self.top_books_tree.get_children():
             self.top_books_tree.delete(item)
         
-        # Get top books
-        top_books = self.backend.get_popular_books_report(limit=10)
-        
         # Add to treeview
         for i, book in enumerate(top_books, 1):
             self.top_books_tree.insert("", tk.END, values=(
@@ -431,15 +446,12 @@ class ReportsPage:
                 book['times_borrowed'] or 0
             ))
     
-    def load_top_borrowers(self):
+    def load_top_borrowers(self, top_borrowers):
         """Load top active borrowers"""
         # Clear existing items
         for item in self.top_borrowers_tree.get_children():
             self.top_borrowers_tree.delete(item)
         
-        # Get top borrowers
-        top_borrowers = self.backend.get_borrower_activity_report(limit=10)
-        
         # Add to treeview
         for i, borrower in enumerate(top_borrowers, 1):
             self.top_borrowers_tree.insert("", tk.END, values=(
@@ -451,99 +463,81 @@ class ReportsPage:
     
     def load_books_report(self):
         """Load books report"""
-        # Clear existing items
-        for item in self.books_report_tree.get_children():
-            self.books_report_tree.delete(item)
-        
-        # Get all books
-        books = self.backend.get_all_books()
-        
+        self.controller.tasks.submit(
+            lambda: self.backend.get_all_books(row_format="record"),
+            self.show_books_report, owner=self, key="books_report", loading=True,
+            on_error=lambda e: MessageBox.show_error(f"Failed to load books report: {str(e)}"))
+    
+    def show_books_report(self, books):
+        """Show every book fetched by load_books_report()"""
         # Update categories filter
-        categories = list(set(book['category'] for book in books))
+        categories = list(set(book.category for book in books))
         self.category_filter['values'] = ["All Categories"] + categories
         if categories:
             self.category_filter.set("All Categories")
         
-        # Add to treeview and calculate statistics
-        total_titles = len(books)
-        total_copies = 0
-        available_copies = 0
-        
-        for book in books:
-            borrowed = book['copies'] - book['available_copies']
-            status = "Available" if book['available_copies'] > 0 else "Unavailable"
-            
-            self.books_report_tree.insert("", tk.END, values=(
-                book['book_id'],
-                book['title'],
-                book['author'],
-                book['category'],
-                book['year'],
-                book['copies'],
-                book['available_copies'],
-                borrowed,
-                status
-            ))
-            
-            total_copies += book['copies']
-            available_copies += book['available_copies']
-        
-        # Update statistics
-        self.books_total_label.config(text=f"Total Titles: {total_titles}")
-        self.books_copies_label.config(text=f"Total Copies: {total_copies}")
-        self.books_available_label.config(text=f"Available: {available_copies}")
-        self.books_borrowed_label.config(text=f"Borrowed: {total_copies - available_copies}")
+        self.show_books_rows(books)
     
     def filter_books_report(self):
         """Filter books report by category and availability"""
         category_filter = self.category_filter.get()
         availability_filter = self.availability_filter.get()
         
-        # Clear existing items
-        for item in self.books_report_tree.get_children():
-            self.books_report_tree.delete(item)
-        
-        # Get all books
-        books = self.backend.get_all_books()
-        
+        # Same key as load_books_report, so the later request wins
+        self.controller.tasks.submit(
+            lambda: self.backend.get_all_books(row_format="record"),
+            lambda books: self.show_filtered_books(books, category_filter, availability_filter),
+            owner=self, key="books_report", loading=True,
+            on_error=lambda e: MessageBox.show_error(f"Failed to load books report: {str(e)}"))
+    
+    def show_filtered_books(self, books, category_filter, availability_filter):
+        """Show the books matching the filters chosen in filter_books_report()"""
         # Apply filters
         filtered_books = []
         for book in books:
             # Category filter
-            if category_filter != "All Categories" and book['category'] != category_filter:
+            if category_filter != "All Categories" and book.category != category_filter:
                 continue
             
             # Availability filter
-            if availability_filter == "Available" and book['available_copies'] <= 0:
+            if availability_filter == "Available" and book.available_copies <= 0:
                 continue
-            elif availability_filter == "Unavailable" and book['available_copies'] > 0:
+            elif availability_filter == "Unavailable" and book.available_copies > 0:
                 continue
             
             filtered_books.append(book)
         
-        # Add filtered books to treeview
-        total_titles = len(filtered_books)
+        self.show_books_rows(filtered_books)
+    
+    def show_books_rows(self, books):
+        """Fill the books report tree and its totals"""
+        # Add to treeview and calculate statistics
+        total_titles = len(books)
         total_copies = 0
         available_copies = 0
         
-        for book in filtered_books:
-            borrowed = book['copies'] - book['available_copies']
-            status = "Available" if book['available_copies'] > 0 else "Unavailable"
+        rows = []
+        for book in books:
+            borrowed = book.copies - book.available_copies
+            status = "Available" if book.available_copies > 0 else "Unavailable"
             
-            self.books_report_tree.insert("", tk.END, values=(
-                book['book_id'],
-                book['title'],
-                book['author'],
-                book['category'],
-                book['year'],
-                book['copies'],
-                book['available_copies'],
+            rows.append((
+                book.book_id,
+                book.title,
+                book.author,
+                book.category,
+                book.year,
+                book.copies,
+                book.available_copies,
                 borrowed,
                 status
             ))
             
-            total_copies += book['copies']
-            available_copies += book['available_copies']
+            total_copies += book.copies
+            available_copies += book.available_copies
+        
+        # Only rows that changed since the last refresh are touched
+        self.books_report_tree.sync_rows(rows)
         
         # Update statistics
         self.books_total_label.config(text=f"Total Titles: {total_titles}")
@@ -559,14 +553,20 @@ class ReportsPage:
     
     def load_borrowers_report(self):
         """Load borrowers report"""
-        # Clear existing items
-        for item in self.borrowers_report_tree.get_children():
-            self.borrowers_report_tree.delete(item)
-        
-        # Get all borrowers with their activity
-        borrowers = self.backend.get_all_borrowers()
-        active_loans = self.backend.get_active_loans()
-        overdue_books = self.backend.get_overdue_books()
+        self.controller.tasks.submit(
+            self.fetch_borrowers_report, self.show_borrowers_report,
+            owner=self, key="borrowers_report", loading=True,
+            on_error=lambda e: MessageBox.show_error(f"Failed to load borrowers report: {str(e)}"))
+    
+    def fetch_borrowers_report(self):
+        """Every borrower with the active and overdue loans (runs in a worker thread)"""
+        return (self.backend.get_all_borrowers(),
+                self.backend.get_active_loans(),
+                self.backend.get_overdue_books())
+    
+    def show_borrowers_report(self, report):
+        """Show the borrowers fetched by fetch_borrowers_report()"""
+        borrowers, active_loans, overdue_books = report
         
         # Create dictionaries for quick lookup
         active_counts = {}
@@ -585,6 +585,7 @@ class ReportsPage:
         active_borrowers = 0
         borrowers_with_fines = 0
         
+        rows = []
         for borrower in borrowers:
             borrower_id = borrower['borrower_id']
             active = active_counts.get(borrower_id, 0)
@@ -596,7 +597,7 @@ class ReportsPage:
             # Get total fines (simplified)
             total_fines = 0.00  # This should be calculated from transactions
             
-            self.borrowers_report_tree.insert("", tk.END, values=(
+            rows.append((
                 borrower['borrower_id'],
                 borrower['name'],
                 borrower['email'],
@@ -613,6 +614,8 @@ class ReportsPage:
             if total_fines > 0:
                 borrowers_with_fines += 1
         
+        self.borrowers_report_tree.sync_rows(rows)
+        
         # Update statistics
         self.borrowers_total_label.config(text=f"Total Borrowers: {total_borrowers}")
         self.borrowers_active_label.config(text=f"Active Borrowers: {active_borrowers}")
@@ -630,85 +633,90 @@ class ReportsPage:
             if start_date > end_date:
                 MessageBox.show_error("Start date must be before end date")
                 return
+        except ValueError:
+            MessageBox.show_error("Please enter valid dates in YYYY-MM-DD format")
+            return
+        
+        # Scanning the history runs in the background, behind the loading window
+        self.controller.tasks.submit(
+            lambda: self.summarize_transactions(start_date, end_date),
+            self.show_transaction_report, owner=self, key="transaction_report", loading=True,
+            on_error=lambda e: MessageBox.show_error(f"Error generating report: {str(e)}"))
+    
+    def summarize_transactions(self, start_date, end_date):
+        """Totals and per-day counts for the date range (runs in a worker thread)"""
+        # Only the date range is read, streamed as compact records
+        filtered_transactions = list(self.backend.iter_transactions_between(
+            start_date.date(), end_date.date(), row_format="record"))
+        
+        totals = {
+            'transactions': len(filtered_transactions),
+            'borrowed': sum(1 for tx in filtered_transactions if tx.status == 'borrowed'),
+            'returned': sum(1 for tx in filtered_transactions if tx.status == 'returned'),
+            'fines': sum(float(tx.fine_amount or 0) for tx in filtered_transactions)
+        }
+        
+        # Group by date for detail tree
+        daily_data = {}
+        for tx in filtered_transactions:
+            date = tx.borrow_date
+            if date not in daily_data:
+                daily_data[date] = {'transactions': 0, 'borrowed': 0, 'returned': 0, 'fines': 0}
             
-            # Get all transactions
-            transactions = self.backend.get_all_transactions()
-            
-            # Filter by date range
-            filtered_transactions = []
-            for tx in transactions:
-                tx_date = datetime.strptime(tx['borrow_date'], '%Y-%m-%d')
-                if start_date <= tx_date <= end_date:
-                    filtered_transactions.append(tx)
-            
-            # Update statistics
-            total_transactions = len(filtered_transactions)
-            borrowed = sum(1 for tx in filtered_transactions if tx['status'] == 'borrowed')
-            returned = sum(1 for tx in filtered_transactions if tx['status'] == 'returned')
-            total_fines = sum(float(tx['fine_amount'] or 0) for tx in filtered_transactions)
-            
-            self.transactions_total_label.config(text=f"Total Transactions: {total_transactions}")
-            self.transactions_borrowed_label.config(text=f"Books Borrowed: {borrowed}")
-            self.transactions_returned_label.config(text=f"Books Returned: {returned}")
-            self.transactions_fines_label.config(text=f"Total Fines: ${total_fines:.2f}")
-            
-            # Group by date for detail tree
-            daily_data = {}
-            for tx in filtered_transactions:
-                date = tx['borrow_date']
-                if date not in daily_data:
-                    daily_data[date] = {'transactions': 0, 'borrowed': 0, 'returned': 0, 'fines': 0}
-                
-                daily_data[date]['transactions'] += 1
-                if tx['status'] == 'borrowed':
-                    daily_data[date]['borrowed'] += 1
-                elif tx['status'] == 'returned':
-                    daily_data[date]['returned'] += 1
-                
-                daily_data[date]['fines'] += float(tx['fine_amount'] or 0)
+            daily_data[date]['transactions'] += 1
+            if tx.status == 'borrowed':
+                daily_data[date]['borrowed'] += 1
+            elif tx.status == 'returned':
+                daily_data[date]['returned'] += 1
             
-            # Clear and populate detail tree
-            for item in self.transaction_detail_tree.get_children():
-                self.transaction_detail_tree.delete(item)
+            daily_data[date]['fines'] += float(tx.fine_amount or 0)
+        
+        return totals, daily_data
+    
+    def show_transaction_report(self, report):
+        """Show the summary computed by summarize_transactions()"""
+        totals, daily_data = report
+        
+        # Update statistics
+        self.transactions_total_label.config(text=f"Total Transactions: {totals['transactions']}")
+        self.transactions_borrowed_label.config(text=f"Books Borrowed: {totals['borrowed']}")
+        self.transactions_returned_label.config(text=f"Books Returned: {totals['returned']}")
+        self.transactions_fines_label.config(text=f"Total Fines: ${totals['fines']:.2f}")
+        
+        # Populate detail tree, one row per day
+        self.transaction_detail_tree.sync_rows((
+            date,
+            data['transactions'],
+            data['borrowed'],
+            data['returned'],
+            f"${data['fines']:.2f}"
+        ) for date, data in sorted(daily_data.items()))
+        
+        # Clear previous chart
+        for widget in self.chart_frame.winfo_children():
+            widget.destroy()
+        
+        # Create simple bar chart if there's data
+        if daily_data:
+            dates = list(sorted(daily_data.keys()))
+            transaction_counts = [daily_data[date]['transactions'] for date in dates]
             
-            for date, data in sorted(daily_data.items()):
-                self.transaction_detail_tree.insert("", tk.END, values=(
-                    date,
-                    data['transactions'],
-                    data['borrowed'],
-                    data['returned'],
-                    f"${data['fines']:.2f}"
-                ))
+            # Create figure
+            Figure, FigureCanvasTkAgg = load_matplotlib()
+            fig = Figure(figsize=(8, 4), dpi=100)
+            ax = fig.add_subplot(111)
             
-            # Clear previous chart
-            for widget in self.chart_frame.winfo_children():
-                widget.destroy()
+            # Create bar chart
+            ax.bar(dates, transaction_counts)
+            ax.set_xlabel('Date')
+            ax.set_ylabel('Number of Transactions')
+            ax.set_title('Daily Transaction Count')
+            ax.tick_params(axis='x', rotation=45)
             
-            # Create simple bar chart if there's data
-            if daily_data:
-                dates = list(sorted(daily_data.keys()))
-                transaction_counts = [daily_data[date]['transactions'] for date in dates]
-                
-                # Create figure
-                fig = Figure(figsize=(8, 4), dpi=100)
-                ax = fig.add_subplot(111)
-                
-                # Create bar chart
-                ax.bar(dates, transaction_counts)
-                ax.set_xlabel('Date')
-                ax.set_ylabel('Number of Transactions')
-                ax.set_title('Daily Transaction Count')
-                ax.tick_params(axis='x', rotation=45)
-                
-                # Create canvas
-                canvas = FigureCanvasTkAgg(fig, self.chart_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            else:
-                tk.Label(self.chart_frame, text="No transaction data for selected date range",
-                        bg='white').pack(expand=True)
-                
-        except ValueError:
-            MessageBox.show_error("Please enter valid dates in YYYY-MM-DD format")
-        except Exception as e:
-            MessageBox.show_error(f"Error generating report: {str(e)}")
\ No newline at end of file
+            # Create canvas
+            canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        else:
+            tk.Label(self.chart_frame, text="No transaction data for selected date range",
+                    bg='white').pack(expand=True)
\ No newline at end of file
@@ -3,7 +3,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from backend.auth import AuthSystem
 from components.widgets import ModernButton
+from database.query_stats import tag_queries
 
+@tag_queries
 class SignupPage:
     def __init__(self, parent, controller):
         self.parent = parent
@@ -1,17 +1,30 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
-from components.widgets import ModernButton, ModernTreeview, InputField, MessageBox
-from backend.library_backend import LibraryBackend
+from components.widgets import ModernButton, ModernTreeview, VirtualTreeview, RowSource, InputField, MessageBox
 from utils.helpers import get_current_date, calculate_due_date
+from database.query_stats import tag_queries
 
+# Type-ahead comboboxes show this many matches, looked up this long after the last key
+COMPLETION_LIMIT = 20
+COMPLETION_DELAY_MS = 150
+
+# History rows fetched per query as the list scrolls
+PAGE_SIZE = 200
+
+# Transaction statistics holding the row count of each history filter
+STATUS_TOTALS = {None: 'total_transactions', 'borrowed': 'active_loans',
+                 'returned': 'returned_books', 'overdue': 'overdue_books'}
+
+@tag_queries
 class TransactionsPage:
     def __init__(self, parent, controller):
         self.parent = parent
         self.controller = controller
-        self.backend = LibraryBackend()
+        self.backend = controller.backend
         
         self.setup_ui()
+        self.load_loans()
         self.load_transactions()
     
     def setup_ui(self):
@@ -65,8 +78,10 @@ class TransactionsPage:
                 font=('Helvetica', 10, 'bold'),
                 bg='white').pack(anchor=tk.W, pady=(0, 5))
         
-        self.book_selector = ttk.Combobox(book_frame, state="readonly", width=50)
+        self.book_selector = ttk.Combobox(book_frame, width=50)
         self.book_selector.pack(fill=tk.X, pady=(0, 10))
+        self.book_selector.bind('<KeyRelease>',
+                                lambda event: self.schedule_completion(event, self.complete_books))
         
         # Borrower selection
         borrower_frame = tk.Frame(form_frame, bg='white')
@@ -76,8 +91,16 @@ class TransactionsPage:
                 font=('Helvetica', 10, 'bold'),
                 bg='white').pack(anchor=tk.W, pady=(0, 5))
         
-        self.borrower_selector = ttk.Combobox(borrower_frame, state="readonly", width=50)
+        self.borrower_selector = ttk.Combobox(borrower_frame, width=50)
         self.borrower_selector.pack(fill=tk.X, pady=(0, 10))
+        self.borrower_selector.bind('<KeyRelease>',
+                                    lambda event: self.schedule_completion(event, self.complete_borrowers))
+        # Pending completion lookup per combobox, so typing in one never cancels the other's
+        self._completion_jobs = {}
+        
+        # Records behind each combobox option, by index, so a selection needs no lookup
+        self.book_choices = []
+        self.borrower_choices = []
         
         # Date selection
         dates_frame = tk.Frame(form_frame, bg='white')
@@ -114,10 +137,10 @@ class TransactionsPage:
         self.borrow_info_label.pack(fill=tk.X, pady=(0, 20))
         
         # Borrow button
-        borrow_btn = ModernButton(form_frame, text="📖 Borrow Book", 
-                                 command=self.borrow_book,
-                                 bg='#10B981')
-        borrow_btn.pack(pady=10)
+        self.borrow_btn = ModernButton(form_frame, text="📖 Borrow Book", 
+                                      command=self.borrow_book,
+                                      bg='#10B981')
+        self.borrow_btn.pack(pady=10)
         
         # Refresh button
         refresh_btn = tk.Button(form_frame, text="🔄 Refresh Lists", 
@@ -145,6 +168,7 @@ class TransactionsPage:
         self.loan_selector = ttk.Combobox(loans_frame, state="readonly", width=50)
         self.loan_selector.pack(fill=tk.X, pady=(0, 10))
         self.loan_selector.bind('<<ComboboxSelected>>', self.display_loan_details)
+        self.loan_choices = []
         
         # Loan details frame
         self.details_frame = tk.LabelFrame(form_frame, text="Loan Details", 
@@ -189,20 +213,17 @@ class TransactionsPage:
         self.return_date_entry.pack(fill=tk.X)
         
         # Return button
-        return_btn = ModernButton(form_frame, text="📚 Return Book", 
-                                 command=self.return_book,
-                                 bg='#F59E0B')
-        return_btn.pack(pady=10)
+        self.return_btn = ModernButton(form_frame, text="📚 Return Book", 
+                                      command=self.return_book,
+                                      bg='#F59E0B')
+        self.return_btn.pack(pady=10)
         
         # Refresh button
         refresh_btn = tk.Button(form_frame, text="🔄 Refresh Active Loans", 
-                               command=self.refresh_active_loans,
+                               command=self.load_loans,
                                bg='#E5E7EB', fg='black',
                                relief=tk.FLAT, padx=15)
         refresh_btn.pack(pady=5)
-        
-        # Initial load of active loans
-        self.refresh_active_loans()
     
     def setup_active_tab(self):
         """Setup active loans tab"""
@@ -242,14 +263,18 @@ class TransactionsPage:
         action_frame.pack(fill=tk.X, pady=10, padx=20)
         
         ModernButton(action_frame, text="🔄 Refresh", 
-                    command=self.load_active_loans).pack(side=tk.LEFT, padx=5)
+                    command=self.load_loans).pack(side=tk.LEFT, padx=5)
     
     def setup_history_tab(self):
         """Setup transaction history tab"""
         # Treeview for transaction history
         columns = ("ID", "Book", "Borrower", "Borrow Date", "Due Date", "Return Date", "Status", "Fine")
-        self.history_tree = ModernTreeview(self.history_tab, columns=columns)
+        # Only the rows on screen become Tk items; the rest load in the background as it scrolls
+        self.history_tree = VirtualTreeview(self.history_tab, columns=columns,
+                                            row_values=self.history_values,
+                                            tasks=self.controller.tasks, owner=self)
         self.history_tree.pack_with_scrollbars(pady=10, padx=20)
+        self.history_status = None
         
         for col in columns:
             self.history_tree.heading(col, text=col)
@@ -286,28 +311,129 @@ class TransactionsPage:
         
         ModernButton(action_frame, text="🔄 Refresh", 
                     command=self.load_transactions).pack(side=tk.LEFT, padx=5)
+
+    
+    def refresh(self):
+        """Reload the loan lists and history after a change made elsewhere"""
+        # Matches loaded before the change may be stale ("3 available"); the book and
+        # borrower picked in the form are reloaded by ID so they stay selectable
+        self.reload_choice(self.book_selector, self.book_choices, 'book_id',
+                           self.backend.get_book_by_id, self.set_book_choices)
+        self.reload_choice(self.borrower_selector, self.borrower_choices, 'borrower_id',
+                           self.backend.get_borrower_by_id, self.set_borrower_choices)
+        self.load_loans()
+        self.load_transactions()
+        
+        # A borrow or return cancelled by leaving the page never re-enabled its button
+        self.borrow_btn.config(state=tk.NORMAL)
+        self.return_btn.config(state=tk.NORMAL)
     
     def refresh_lists(self):
         """Refresh book and borrower lists for borrowing"""
-        # Get available books
-        available_books = self.backend.get_available_books()
-        book_options = [f"{book['title']} by {book['author']} ({book['available_copies']} available)" 
-                       for book in available_books]
-        self.book_selector['values'] = book_options
-        if book_options:
-            self.book_selector.set(book_options[0])
-        
-        # Get all borrowers
-        borrowers = self.backend.get_all_borrowers()
-        borrower_options = [f"{borrower['name']} ({borrower['email']})" 
-                           for borrower in borrowers]
-        self.borrower_selector['values'] = borrower_options
-        if borrower_options:
-            self.borrower_selector.set(borrower_options[0])
+        # Only the first matches are loaded; typing narrows them down
+        self.book_selector.set("")
+        self.complete_books(select_first=True)
+        
+        self.borrower_selector.set("")
+        self.complete_borrowers(select_first=True)
         
         # Clear info label
         self.borrow_info_label.config(text="")
     
+    # Options are unique (book and loan IDs, borrower e-mail) so current() finds the right index
+    @staticmethod
+    def book_option(book):
+        return (f"{book['title']} by {book['author']} "
+                f"(ID: {book['book_id']}, {book['available_copies']} available)")
+    
+    @staticmethod
+    def borrower_option(borrower):
+        return f"{borrower['name']} ({borrower['email']})"
+    
+    @staticmethod
+    def loan_option(loan):
+        return (f"{loan['title']} borrowed by {loan['borrower_name']} "
+                f"(Due: {loan['due_date']}, #{loan['transaction_id']})")
+    
+    def set_book_choices(self, books):
+        self.book_choices = books
+        self.book_selector['values'] = [self.book_option(book) for book in books]
+    
+    def set_borrower_choices(self, borrowers):
+        self.borrower_choices = borrowers
+        self.borrower_selector['values'] = [self.borrower_option(borrower) for borrower in borrowers]
+    
+    def reload_choice(self, selector, choices, key, fetch, set_choices):
+        """Replace a combobox's options with a fresh copy of the record selected in it"""
+        record = self.chosen(selector, choices)
+        if record is None:
+            # Typed text is kept and completed as usual
+            set_choices([])
+            return
+        
+        option = selector.get()
+        self.controller.tasks.submit(
+            lambda: fetch(record[key]),
+            lambda fresh: self.show_reloaded_choice(selector, option, fresh, set_choices),
+            owner=self, key=("reload", key))
+    
+    def show_reloaded_choice(self, selector, option, record, set_choices):
+        """Offer the record reloaded by reload_choice(), unless another one was picked meanwhile"""
+        if selector.get() != option:
+            return
+        set_choices([record] if record else [])
+        if record:
+            selector.current(0)
+        else:
+            # Deleted meanwhile; its option text would no longer match anything
+            selector.set("")
+    
+    @staticmethod
+    def chosen(selector, choices):
+        """Record behind the option shown in selector, or None if the text is not one of them"""
+        index = selector.current()
+        return choices[index] if 0 <= index < len(choices) else None
+    
+    def schedule_completion(self, event, complete):
+        """Look up matches once typing pauses, not on every key"""
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        job = self._completion_jobs.get(event.widget)
+        if job is not None:
+            self.parent.after_cancel(job)
+        self._completion_jobs[event.widget] = self.parent.after(COMPLETION_DELAY_MS, complete)
+    
+    def complete_books(self, select_first=False):
+        """Look up available books matching what was typed, in a worker thread"""
+        self._completion_jobs.pop(self.book_selector, None)
+        text = self.book_selector.get()
+        if text in self.book_selector['values']:
+            return
+        self.controller.tasks.submit(
+            lambda: self.backend.complete_books(text, COMPLETION_LIMIT),
+            lambda books: self.show_completion(self.book_selector, text, books,
+                                               self.set_book_choices, select_first),
+            owner=self, key="complete_books")
+    
+    def complete_borrowers(self, select_first=False):
+        """Look up borrowers matching what was typed, in a worker thread"""
+        self._completion_jobs.pop(self.borrower_selector, None)
+        text = self.borrower_selector.get()
+        if text in self.borrower_selector['values']:
+            return
+        self.controller.tasks.submit(
+            lambda: self.backend.complete_borrowers(text, COMPLETION_LIMIT),
+            lambda borrowers: self.show_completion(self.borrower_selector, text, borrowers,
+                                                   self.set_borrower_choices, select_first),
+            owner=self, key="complete_borrowers")
+    
+    def show_completion(self, selector, text, records, set_choices, select_first):
+        """Fill a combobox with the matches for text, picking the first one if asked"""
+        set_choices(records)
+        # Typing since the lookup started has already scheduled the next one
+        if select_first and records and selector.get() == text:
+            selector.current(0)
+    
     def borrow_book(self):
         """Process book borrowing"""
         # Get selected book
@@ -318,41 +444,18 @@ class TransactionsPage:
             MessageBox.show_warning("Please select both book and borrower")
             return
         
-        # Extract book ID from selection
-        try:
-            # Find book by matching title
-            available_books = self.backend.get_available_books()
-            book = None
-            for b in available_books:
-                display_text = f"{b['title']} by {b['author']} ({b['available_copies']} available)"
-                if display_text == book_selection:
-                    book = b
-                    break
-            
-            if not book:
-                MessageBox.show_error("Selected book not found")
-                return
-            
-            book_id = book['book_id']
-        except:
-            MessageBox.show_error("Invalid book selection")
+        # The options were loaded with their records; availability is checked by the backend
+        book = self.chosen(self.book_selector, self.book_choices)
+        if not book:
+            MessageBox.show_error("Please choose a book from the list")
             return
+        book_id = book['book_id']
         
-        # Extract borrower ID from selection
-        try:
-            # Find borrower by matching email
-            email = borrower_selection.split("(")[1].strip(")")
-            borrowers = self.backend.get_all_borrowers()
-            borrower = next((b for b in borrowers if b['email'] == email), None)
-            
-            if not borrower:
-                MessageBox.show_error("Selected borrower not found")
-                return
-            
-            borrower_id = borrower['borrower_id']
-        except:
-            MessageBox.show_error("Invalid borrower selection")
+        borrower = self.chosen(self.borrower_selector, self.borrower_choices)
+        if not borrower:
+            MessageBox.show_error("Please choose a borrower from the list")
             return
+        borrower_id = borrower['borrower_id']
         
         # Get dates
         borrow_date_str = self.borrow_date.get()
@@ -369,10 +472,17 @@ class TransactionsPage:
             MessageBox.show_error("Please enter valid dates in YYYY-MM-DD format")
             return
         
-        # Process borrow
-        transaction_id, message = self.backend.borrow_book(book_id, borrower_id, 
-                                                          borrow_date, due_date)
-        
+        # Process borrow; the button stays disabled until the result is in
+        self.borrow_btn.config(state=tk.DISABLED)
+        self.controller.tasks.submit(
+            lambda: self.backend.borrow_book(book_id, borrower_id, borrow_date, due_date),
+            self.finish_borrow, on_error=self.borrow_failed,
+            owner=self, key="borrow", loading=True)
+    
+    def finish_borrow(self, result):
+        """Report the outcome of borrow_book()"""
+        self.borrow_btn.config(state=tk.NORMAL)
+        transaction_id, message = result
         if transaction_id:
             MessageBox.show_success(f"{message}\nTransaction ID: {transaction_id}")
             
@@ -383,36 +493,41 @@ class TransactionsPage:
             self.due_date.insert(0, calculate_due_date(get_current_date()))
             
             self.refresh_lists()
-            self.load_active_loans()
+            self.load_loans()
             self.load_transactions()
         else:
             MessageBox.show_error(message)
     
-    def refresh_active_loans(self):
-        """Refresh active loans for return tab"""
-        active_loans = self.backend.get_active_loans()
-        loan_options = [f"{loan['title']} borrowed by {loan['borrower_name']} (Due: {loan['due_date']})" 
-                       for loan in active_loans]
+    def borrow_failed(self, error):
+        self.borrow_btn.config(state=tk.NORMAL)
+        MessageBox.show_error(f"Failed to borrow book: {error}")
+    
+    def load_loans(self):
+        """Read the active loans once for both the return tab and the active loans tab"""
+        self.controller.tasks.submit(self.backend.get_active_loans, self.show_loans,
+                                     owner=self, key="loans")
+    
+    def show_loans(self, loans):
+        """Show the loans read by load_loans() on both tabs"""
+        self.show_loan_choices(loans)
+        self.show_active_loans(loans)
+    
+    def show_loan_choices(self, loans):
+        """Offer the active loans on the return tab"""
+        self.loan_choices = loans
+        loan_options = [self.loan_option(loan) for loan in self.loan_choices]
         self.loan_selector['values'] = loan_options
         if loan_options:
             self.loan_selector.set(loan_options[0])
             self.display_loan_details()
+        else:
+            # The last loan was returned; its text would no longer match an option
+            self.loan_selector.set("")
+            self.details_frame.pack_forget()
     
     def display_loan_details(self, event=None):
         """Display details of selected loan"""
-        selection = self.loan_selector.get()
-        if not selection:
-            return
-        
-        # Find the selected loan
-        active_loans = self.backend.get_active_loans()
-        selected_loan = None
-        for loan in active_loans:
-            display_text = f"{loan['title']} borrowed by {loan['borrower_name']} (Due: {loan['due_date']})"
-            if display_text == selection:
-                selected_loan = loan
-                break
-        
+        selected_loan = self.chosen(self.loan_selector, self.loan_choices)
         if not selected_loan:
             return
         
@@ -434,20 +549,11 @@ class TransactionsPage:
     
     def return_book(self):
         """Process book return"""
-        selection = self.loan_selector.get()
-        if not selection:
+        if not self.loan_selector.get():
             MessageBox.show_warning("Please select a loan to return")
             return
         
-        # Find the selected loan
-        active_loans = self.backend.get_active_loans()
-        selected_loan = None
-        for loan in active_loans:
-            display_text = f"{loan['title']} borrowed by {loan['borrower_name']} (Due: {loan['due_date']})"
-            if display_text == selection:
-                selected_loan = loan
-                break
-        
+        selected_loan = self.chosen(self.loan_selector, self.loan_choices)
         if not selected_loan:
             MessageBox.show_error("Selected loan not found")
             return
@@ -460,9 +566,17 @@ class TransactionsPage:
             MessageBox.show_error("Please enter a valid date in YYYY-MM-DD format")
             return
         
-        # Process return
-        success, message = self.backend.return_book(selected_loan['transaction_id'], return_date)
-        
+        # Process return; the button stays disabled until the result is in
+        self.return_btn.config(state=tk.DISABLED)
+        self.controller.tasks.submit(
+            lambda: self.backend.return_book(selected_loan['transaction_id'], return_date),
+            self.finish_return, on_error=self.return_failed,
+            owner=self, key="return", loading=True)
+    
+    def finish_return(self, result):
+        """Report the outcome of return_book()"""
+        self.return_btn.config(state=tk.NORMAL)
+        success, message = result
         if success:
             MessageBox.show_success(message)
             
@@ -471,31 +585,28 @@ class TransactionsPage:
             self.return_date_entry.insert(0, get_current_date())
             self.details_frame.pack_forget()
             
-            self.refresh_active_loans()
-            self.load_active_loans()
+            self.load_loans()
             self.load_transactions()
         else:
             MessageBox.show_error(message)
     
-    def load_active_loans(self):
-        """Load active loans into treeview"""
-        # Clear existing items
-        for item in self.active_tree.get_children():
-            self.active_tree.delete(item)
-        
-        # Get active loans
-        active_loans = self.backend.get_active_loans()
-        
+    def return_failed(self, error):
+        self.return_btn.config(state=tk.NORMAL)
+        MessageBox.show_error(f"Failed to return book: {error}")
+    
+    def show_active_loans(self, active_loans):
+        """Show active loans in the treeview"""
         # Add to treeview
         total_active = len(active_loans)
         total_overdue = 0
         total_fines = 0
         
+        rows = []
         for loan in active_loans:
             status = "Overdue" if loan['days_overdue'] > 0 else "On Time"
             fine = loan['days_overdue'] * 5.00 if loan['days_overdue'] > 0 else 0
             
-            self.active_tree.insert("", tk.END, values=(
+            rows.append((
                 loan['transaction_id'],
                 loan['title'],
                 loan['borrower_name'],
@@ -509,66 +620,60 @@ class TransactionsPage:
                 total_overdue += 1
                 total_fines += fine
         
+        # Only loans that changed since the last refresh are touched
+        self.active_tree.sync_rows(rows)
+        
         # Update statistics
         self.total_active_label.config(text=f"Total Active: {total_active}")
         self.total_overdue_label.config(text=f"Overdue: {total_overdue}")
         self.total_fines_label.config(text=f"Total Fines: ${total_fines:.2f}")
     
     def load_transactions(self):
-        """Load transaction history"""
-        # Clear existing items
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        
-        # Get all transactions
-        transactions = self.backend.get_all_transactions()
-        
-        # Add to treeview
-        for tx in transactions:
-            fine_amount = f"${float(tx['fine_amount']):.2f}" if tx['fine_amount'] else "$0.00"
-            
-            self.history_tree.insert("", tk.END, values=(
-                tx['transaction_id'],
-                tx['title'],
-                tx['borrower_name'],
-                tx['borrow_date'],
-                tx['due_date'],
-                tx['return_date'] or "Not returned",
-                tx['status'].title(),
-                fine_amount
-            ))
+        """Load transaction history, newest first, a page at a time as it scrolls"""
+        # The filter is read now, so a later one replaces this load under the same key
+        status = self.history_status
+        self.controller.tasks.submit(self.backend.get_transaction_statistics,
+                                     lambda stats: self.show_transactions(stats, status),
+                                     owner=self, key="history")
+    
+    def show_transactions(self, stats, status):
+        """Start the history list over, sized by the count in stats"""
+        rows = RowSource(lambda after, limit: self.fetch_history(after, limit, status),
+                         lambda tx: (tx['created_at'], tx['transaction_id']),
+                         seek=lambda position: self.seek_history(position, status),
+                         total=stats.get(STATUS_TOTALS[status]), chunk_size=PAGE_SIZE)
+        self.history_tree.set_source(rows)
+    
+    def fetch_history(self, after, limit, status):
+        """Keyset source: history under a status filter"""
+        return self.backend.get_transactions_page(after, limit, status=status)
+    
+    def seek_history(self, position, status):
+        """Cursor to start the history under a status filter at row position"""
+        return self.backend.get_transactions_cursor(position, status=status)
+    
+    @staticmethod
+    def history_values(tx):
+        fine_amount = f"${float(tx['fine_amount']):.2f}" if tx['fine_amount'] else "$0.00"
+        return (
+            tx['transaction_id'],
+            tx['title'],
+            tx['borrower_name'],
+            tx['borrow_date'],
+            tx['due_date'],
+            tx['return_date'] or "Not returned",
+            tx['status'].title(),
+            fine_amount
+        )
     
     def filter_history(self):
         """Filter transaction history by status"""
         status_filter = self.status_filter.get()
-        if status_filter == "All":
-            self.load_transactions()
-            return
-        
-        # Clear existing items
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        
-        # Get filtered transactions
-        transactions = self.backend.get_all_transactions()
-        filtered = [tx for tx in transactions if tx['status'] == status_filter.lower()]
-        
-        # Add to treeview
-        for tx in filtered:
-            fine_amount = f"${float(tx['fine_amount']):.2f}" if tx['fine_amount'] else "$0.00"
-            
-            self.history_tree.insert("", tk.END, values=(
-                tx['transaction_id'],
-                tx['title'],
-                tx['borrower_name'],
-                tx['borrow_date'],
-                tx['due_date'],
-                tx['return_date'] or "Not returned",
-                tx['status'].title(),
-                fine_amount
-            ))
+        self.history_status = None if status_filter == "All" else status_filter.lower()
+        self.load_transactions()
     
     def clear_filter(self):
         """Clear history filter"""
         self.status_filter.set("All")
+        self.history_status = None
         self.load_transactions()
\ No newline at end of file
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+import pytest
+
+# Tests run on the embedded SQLite engine; the index directory is read when the backend is imported
+os.environ["LIBRARY_DB_ENGINE"] = "sqlite"
+os.environ.setdefault("LIBRARY_INDEX_DIR", tempfile.mkdtemp(prefix="library-index-"))
+
+from database import db_connection
+from database.db_connection import Database
+from backend import library_backend
+from backend.entity_cache import EntityCache
+from backend.result_cache import ResultCache
+from backend.search_index import CatalogIndex
+from backend.trigram_index import TrigramIndex
+from backend.autocomplete import PrefixIndex
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh SQLite database, installed as the shared connection"""
+    database = Database(engine="sqlite", sqlite_path=str(tmp_path / "library.db"))
+    assert database.connect()
+    monkeypatch.setattr(db_connection, "db_instance", database)
+    yield database
+    database.close()
+
+@pytest.fixture
+def backend(db, tmp_path, monkeypatch):
+    """LibraryBackend over db, with caches and indexes of its own"""
+    monkeypatch.setattr(library_backend, "INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(library_backend, "BOOK_CACHE", EntityCache("books"))
+    monkeypatch.setattr(library_backend, "BORROWER_CACHE", EntityCache("borrowers"))
+    monkeypatch.setattr(library_backend, "RESULT_CACHE", ResultCache())
+    monkeypatch.setattr(library_backend, "SEARCH_INDEX", CatalogIndex())
+    monkeypatch.setattr(library_backend, "BOOK_FUZZY_INDEX", TrigramIndex("book_id", ("title", "author")))
+    monkeypatch.setattr(library_backend, "BORROWER_FUZZY_INDEX", TrigramIndex("borrower_id", ("name", "email")))
+    monkeypatch.setattr(library_backend, "BOOK_COMPLETION_INDEX",
+                        PrefixIndex("book_id", ("title", "isbn"), compact_fields=("isbn",)))
+    monkeypatch.setattr(library_backend, "BORROWER_COMPLETION_INDEX", PrefixIndex("borrower_id", ("name", "email")))
+    return library_backend.LibraryBackend()
@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+
+def add_books(backend, count, copies=1):
+    """Add books "Book 000".. with ISBNs 978000000000N; returns their ids"""
+    return [backend.add_book(f"Book {index:03d}", f"Author {index % 7}", f"978{index:010d}",
+                             "Fiction" if index % 2 else "Science", 2000 + index % 20, copies)
+            for index in range(count)]
+
+def add_borrowers(backend, count):
+    """Add borrowers "Borrower 000".. ; returns their ids"""
+    for index in range(count):
+        backend.add_borrower(f"Borrower {index:03d}", f"borrower{index}@example.com", "555-0100", "")
+    return [row['borrower_id'] for row in backend.get_all_borrowers()]
+
+def add_history(backend, count):
+    """One loan per day over the last count days, every third one returned; returns their ids"""
+    book_ids = add_books(backend, count)
+    borrower_ids = add_borrowers(backend, count)
+    start = date.today() - timedelta(days=count)
+    ids = []
+    for index, (book_id, borrower_id) in enumerate(zip(book_ids, borrower_ids)):
+        borrowed = start + timedelta(days=index)
+        transaction_id, message = backend.borrow_book(book_id, borrower_id, borrowed,
+                                                      date.today() + timedelta(days=14))
+        assert transaction_id, message
+        ids.append(transaction_id)
+    for transaction_id in ids[::3]:
+        backend.return_book(transaction_id)
+    return ids
@@ -0,0 +1,70 @@
+import asyncio
+import inspect
+
+import pytest
+
+from backend.async_backend import AsyncLibraryBackend
+from backend.library_backend import LibraryBackend
+from tests.factories import add_books, add_borrowers
+
+@pytest.fixture
+def async_backend(backend):
+    facade = AsyncLibraryBackend(backend)
+    yield facade
+    facade.close()
+
+def test_every_public_method_has_an_async_version():
+    for name, _ in inspect.getmembers(LibraryBackend, inspect.isfunction):
+        if name.startswith('_'):
+            continue
+        method = getattr(AsyncLibraryBackend, name)
+        if name.startswith('iter_'):
+            assert inspect.isasyncgenfunction(method), name
+        else:
+            assert inspect.iscoroutinefunction(method), name
+
+    assert AsyncLibraryBackend.get_book_by_id.__doc__ == LibraryBackend.get_book_by_id.__doc__
+
+def test_workers_match_the_pool_size(async_backend, backend):
+    assert async_backend.executor._max_workers == backend.db.pool_max_size
+
+def test_async_methods_return_backend_results(async_backend, backend):
+    [book_id] = add_books(backend, 1)
+
+    book = asyncio.run(async_backend.get_book_by_id(book_id))
+
+    assert book['title'] == "Book 000"
+
+def test_gather_returns_results_in_order(async_backend, backend):
+    add_books(backend, 2)
+    add_borrowers(backend, 3)
+
+    books, borrowers = asyncio.run(async_backend.gather(("get_all_books",), ("get_all_borrowers",)))
+
+    assert (len(books), len(borrowers)) == (2, 3)
+
+def test_concurrent_statistics_match_the_backend(async_backend, backend):
+    add_books(backend, 3, copies=2)
+
+    assert asyncio.run(async_backend.get_system_statistics()) == backend.get_system_statistics()
+
+def test_iter_methods_are_async_generators(async_backend, backend):
+    add_books(backend, 5)
+
+    async def titles():
+        return [book['title'] async for book in async_backend.iter_all_books(chunk_size=2)]
+
+    assert asyncio.run(titles()) == [f"Book {index:03d}" for index in range(5)]
+    assert backend.db.pool.stats()['in_use'] == 0
+
+def test_leaving_an_async_iteration_early_releases_the_stream(async_backend, backend):
+    add_books(backend, 5)
+
+    async def first_title():
+        rows = async_backend.iter_all_books(chunk_size=2)
+        async for book in rows:
+            await rows.aclose()
+            return book['title']
+
+    assert asyncio.run(first_title()) == "Book 000"
+    assert backend.db.pool.stats()['in_use'] == 0
@@ -0,0 +1,60 @@
+from backend.autocomplete import PrefixIndex
+
+BOOKS = [
+    {'book_id': 1, 'title': "Dune", 'isbn': "978-0-441-01359-3"},
+    {'book_id': 2, 'title': "Dune Messiah", 'isbn': "9780441172696"},
+    {'book_id': 3, 'title': "The Left Hand of Darkness", 'isbn': "9780441478125"},
+    {'book_id': 4, 'title': "Émile", 'isbn': None},
+]
+
+def built_index():
+    index = PrefixIndex("book_id", ("title", "isbn"), compact_fields=("isbn",))
+    index.build(BOOKS)
+    return index
+
+def test_prefix_of_title_completes():
+    assert built_index().complete("dun") == [1, 2]
+
+def test_later_words_complete_too():
+    assert built_index().complete("messi") == [2]
+    assert built_index().complete("left ha") == [3]
+
+def test_case_and_accents_are_ignored():
+    assert built_index().complete("EMI") == [4]
+
+def test_isbn_completes_with_or_without_hyphens():
+    index = built_index()
+    assert index.complete("9780441013") == [1]
+    assert index.complete("978-0-441-17") == [2]
+
+def test_limit_caps_results():
+    assert len(built_index().complete("9780441", limit=2)) == 2
+
+def test_add_and_remove_keep_index_current():
+    index = built_index()
+    index.add({'book_id': 5, 'title': "Dune Chronicles", 'isbn': None})
+    assert index.complete("dune c") == [5]
+
+    index.add({'book_id': 5, 'title': "Renamed", 'isbn': None})
+    assert index.complete("dune c") == []
+
+    index.remove(5)
+    assert index.complete("renamed") == []
+
+def test_backend_completion_skips_unavailable_books(backend):
+    available = backend.add_book("Dune", "Frank Herbert", "9780441013593", "Science Fiction", 1965, 1)
+    lent = backend.add_book("Dune Messiah", "Frank Herbert", "9780441172696", "Science Fiction", 1969, 1)
+    backend.add_borrower("Paul Atreides", "paul@example.com", "", "")
+    [borrower] = backend.get_all_borrowers()
+    backend.borrow_book(lent, borrower['borrower_id'])
+
+    assert [book['book_id'] for book in backend.complete_books("dune")] == [available]
+    assert [book['book_id'] for book in backend.complete_books("dune", available_only=False)] == \
+        [available, lent]
+
+def test_backend_completion_sees_new_rows(backend):
+    backend.complete_borrowers("a")
+    backend.add_borrower("Alia Atreides", "alia@example.com", "", "")
+
+    assert [borrower['name'] for borrower in backend.complete_borrowers("alia")] == ["Alia Atreides"]
+    assert [borrower['name'] for borrower in backend.complete_borrowers("alia@ex")] == ["Alia Atreides"]
@@ -0,0 +1,65 @@
+INSERT_BOOK = "INSERT INTO books (title, author, copies, available_copies) VALUES (%s, %s, %s, %s)"
+
+def book_rows(count):
+    return [(f"Book {index:03d}", "Author", 1, 1) for index in range(count)]
+
+def titles(db):
+    return [row['title'] for row in db.execute_query("SELECT title FROM books ORDER BY title", fetch=True)]
+
+def test_clean_batch_writes_every_row(db):
+    written, failed = db.execute_many(INSERT_BOOK, book_rows(7), batch_size=3)
+
+    assert (written, failed) == (7, [])
+    assert len(titles(db)) == 7
+
+def test_bad_row_is_reported_and_the_rest_land(db):
+    rows = book_rows(5)
+    rows[3] = (None, "Author", 1, 1)
+
+    written, failed = db.execute_many(INSERT_BOOK, rows, batch_size=2)
+
+    assert written == 4
+    [(index, error)] = failed
+    assert index == 3
+    assert "NOT NULL" in error
+    assert titles(db) == ["Book 000", "Book 001", "Book 002", "Book 004"]
+
+def test_empty_input_writes_nothing(db):
+    checkouts = db.pool.stats()['checkouts']
+
+    assert db.execute_many(INSERT_BOOK, []) == (0, [])
+    assert db.pool.stats()['checkouts'] == checkouts
+
+def test_add_books_bulk_reports_rows_by_input_index(backend):
+    books = [
+        {'title': "Dune", 'author': "Frank Herbert", 'isbn': "9780441013593",
+         'category': "Science Fiction", 'year': 1965, 'copies': 2},
+        {'title': "", 'author': "Nobody", 'copies': 1},
+        {'title': "Emma", 'author': "Jane Austen", 'year': "unknown", 'copies': 1},
+        {'title': "Walden", 'author': "Henry David Thoreau", 'year': None, 'copies': 1},
+    ]
+
+    added, failed = backend.add_books_bulk(books, batch_size=2)
+
+    assert added == 2
+    assert [index for index, _ in failed] == [1, 2]
+    assert sorted(book['title'] for book in backend.get_all_books()) == ["Dune", "Walden"]
+    assert backend.search_books("Dune")[0]['available_copies'] == 2
+
+def test_add_borrowers_bulk_skips_duplicate_and_registered_emails(backend):
+    backend.add_borrower("Ada Lovelace", "ada@example.com", "", "")
+    borrowers = [
+        {'name': "Ada Again", 'email': "ada@example.com"},
+        {'name': "Alan Turing", 'email': "alan@example.com"},
+        {'name': "Alan Twice", 'email': "alan@example.com"},
+        {'name': "", 'email': "nobody@example.com"},
+    ]
+
+    added, failed = backend.add_borrowers_bulk(borrowers)
+
+    assert added == 1
+    assert [index for index, _ in failed] == [0, 2, 3]
+
+def test_empty_imports_add_nothing(backend):
+    assert backend.add_books_bulk([]) == (0, [])
+    assert backend.add_borrowers_bulk([]) == (0, [])
@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+
+from database.connection_pool import ConnectionPool, PoolTimeoutError
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def make_pool(**kwargs):
+    made = []
+
+    def factory():
+        made.append(FakeConnection())
+        return made[-1]
+
+    return ConnectionPool(factory, **kwargs), made
+
+def test_release_returns_connection_for_reuse():
+    pool, made = make_pool(min_size=0, max_size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+    assert len(made) == 1
+
+def test_nested_acquire_on_one_thread_shares_the_connection():
+    pool, made = make_pool(min_size=0, max_size=2)
+    outer = pool.acquire()
+    inner = pool.acquire()
+    assert inner is outer
+    assert outer.depth == 2
+
+    pool.release(inner)
+    assert pool.stats()['idle'] == 0
+    pool.release(outer)
+    assert pool.stats()['idle'] == 1
+
+def test_exclusive_acquire_gets_its_own_connection():
+    pool, made = make_pool(min_size=0, max_size=2)
+    shared = pool.acquire()
+    exclusive = pool.acquire(exclusive=True)
+
+    assert exclusive is not shared
+    assert len(made) == 2
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool, made = make_pool(min_size=0, max_size=1)
+    pool.acquire()
+    failures = []
+
+    def other_thread():
+        try:
+            pool.acquire(timeout=0.05)
+        except PoolTimeoutError as e:
+            failures.append(e)
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    thread.join()
+
+    assert len(failures) == 1
+    assert pool.stats()['timeouts'] == 1
+
+def test_waiting_thread_gets_released_connection():
+    pool, made = make_pool(min_size=0, max_size=1)
+    conn = pool.acquire()
+    got = []
+    thread = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+    thread.start()
+
+    pool.release(conn)
+    thread.join()
+
+    assert got == [conn]
+
+def test_discard_closes_connection_and_frees_its_slot():
+    pool, made = make_pool(min_size=0, max_size=1)
+    conn = pool.acquire()
+    pool.discard(conn)
+
+    assert conn.raw.closed
+    assert pool.stats()['size'] == 0
+    assert pool.stats()['discarded'] == 1
+
+    # The slot can be filled again, with a new connection
+    replacement = pool.acquire(timeout=0.05)
+    assert replacement is not conn
+    assert len(made) == 2
+
+def test_release_after_discard_is_ignored():
+    pool, made = make_pool(min_size=0, max_size=1)
+    conn = pool.acquire()
+    pool.discard(conn)
+    pool.release(conn)
+
+    assert pool.stats()['idle'] == 0
+
+def test_dead_idle_connection_is_replaced():
+    def validate(raw):
+        if raw.closed:
+            raise ConnectionError("gone")
+
+    pool, made = make_pool(min_size=0, max_size=1, validate=validate)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.raw.closed = True
+
+    assert pool.acquire() is not conn
+    assert pool.stats()['discarded'] == 1
+
+def test_fill_opens_min_size_connections():
+    pool, made = make_pool(min_size=2, max_size=3)
+    pool.fill()
+
+    assert len(made) == 2
+    assert pool.stats()['idle'] == 2
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        ConnectionPool(FakeConnection, min_size=3, max_size=2)
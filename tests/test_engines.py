@@ -0,0 +1,60 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from database.engines import translate_sqlite, create_engine, SQLiteEngine
+
+def test_placeholders_become_question_marks():
+    assert translate_sqlite("SELECT * FROM books WHERE book_id = %s AND isbn = %s") == \
+        "SELECT * FROM books WHERE book_id = ? AND isbn = ?"
+
+def test_datediff_uses_julianday():
+    assert translate_sqlite("SELECT DATEDIFF(CURDATE(), t.due_date) FROM transactions t") == \
+        ("SELECT CAST(julianday(DATE('now', 'localtime')) - julianday(t.due_date) AS INTEGER) "
+         "FROM transactions t")
+
+def test_date_parts_use_strftime():
+    assert translate_sqlite("WHERE YEAR(borrow_date) = %s AND MONTH(borrow_date) = %s") == \
+        ("WHERE CAST(strftime('%Y', borrow_date) AS INTEGER) = ? "
+         "AND CAST(strftime('%m', borrow_date) AS INTEGER) = ?")
+
+def test_nested_calls_are_rewritten():
+    assert translate_sqlite("SELECT DATEDIFF(DATE(NOW()), due_date)") == \
+        ("SELECT CAST(julianday(DATE(DATETIME('now', 'localtime'))) - julianday(due_date) "
+         "AS INTEGER)")
+
+def test_for_update_is_dropped():
+    assert translate_sqlite("SELECT status FROM transactions WHERE transaction_id = %s FOR UPDATE") == \
+        "SELECT status FROM transactions WHERE transaction_id = ?"
+
+def test_text_and_other_functions_are_left_alone():
+    query = "SELECT COUNT(*), COALESCE(SUM(fine_amount), 0) FROM transactions WHERE status = 'borrowed'"
+    assert translate_sqlite(query) == query
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        create_engine("postgres")
+
+def test_sqlite_round_trips_dates_and_decimals(tmp_path):
+    connection = SQLiteEngine(str(tmp_path / "types.db")).connect()
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute("CREATE TABLE t (d DATE, ts TIMESTAMP, amount DECIMAL(10,2))")
+    cursor.execute("INSERT INTO t VALUES (%s, %s, %s)",
+                   (date(2026, 3, 1), datetime(2026, 3, 1, 12, 30), Decimal("7.50")))
+    cursor.execute("SELECT * FROM t")
+
+    assert cursor.fetchall() == [{'d': date(2026, 3, 1), 'ts': datetime(2026, 3, 1, 12, 30),
+                                  'amount': Decimal("7.50")}]
+    connection.close()
+
+def test_database_creates_sqlite_schema(db):
+    tables = db.execute_query("SELECT name FROM sqlite_master WHERE type = 'table'", fetch=True)
+    assert {'users', 'books', 'borrowers', 'transactions'} <= {row['name'] for row in tables}
+
+def test_backend_date_queries_run_on_sqlite(backend):
+    backend.add_book("Dune", "Frank Herbert", "9780441013593", "Science Fiction", 1965, 1)
+
+    assert backend.get_monthly_report(2026, 1) is not None
+    assert backend.get_overdue_books() == []
+    assert backend.get_system_statistics()['total_books'] == 1
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from backend import entity_cache
+from backend.entity_cache import EntityCache
+from tests.factories import add_books
+
+class Loader:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, key):
+        self.calls.append(key)
+        return {'id': key, 'title': f"Book {key}"}
+
+def test_second_get_is_a_hit():
+    cache = EntityCache("books")
+    loader = Loader()
+
+    assert cache.get(1, loader) == {'id': 1, 'title': "Book 1"}
+    assert cache.get(1, loader) == {'id': 1, 'title': "Book 1"}
+    assert loader.calls == [1]
+    assert cache.stats()['hits'] == 1
+
+def test_rows_are_handed_out_as_copies():
+    cache = EntityCache("books")
+    cache.get(1, Loader())['title'] = "Changed"
+
+    assert cache.get(1, Loader())['title'] == "Book 1"
+
+def test_missing_rows_are_not_cached():
+    cache = EntityCache("books")
+    calls = []
+    loader = lambda key: calls.append(key)
+
+    assert cache.get(1, loader) is None
+    assert cache.get(1, loader) is None
+    assert calls == [1, 1]
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(entity_cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    cache = EntityCache("books", ttl=10)
+    loader = Loader()
+    cache.get(1, loader)
+
+    clock.now += 11
+    cache.get(1, loader)
+
+    assert loader.calls == [1, 1]
+    assert cache.stats()['expired'] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EntityCache("books", max_size=2)
+    loader = Loader()
+    cache.get(1, loader)
+    cache.get(2, loader)
+    cache.get(1, loader)
+    cache.get(3, loader)
+
+    cache.get(1, loader)
+    cache.get(2, loader)
+    assert loader.calls == [1, 2, 3, 2]
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = EntityCache("books")
+
+    def stale_loader(key):
+        # The row changes while it is being read
+        cache.invalidate(key)
+        return {'id': key, 'title': "Old"}
+
+    cache.get(1, stale_loader)
+    assert cache.get(1, Loader())['title'] == "Book 1"
+
+def test_backend_update_invalidates_cached_book(backend):
+    [book_id] = add_books(backend, 1)
+    assert backend.get_book_by_id(book_id)['title'] == "Book 000"
+
+    backend.update_book(book_id, "Renamed", "Author", "9780000000000", "Science", 2000, 1)
+
+    assert backend.get_book_by_id(book_id)['title'] == "Renamed"
+
+def test_backend_delete_invalidates_cached_book(backend):
+    [book_id] = add_books(backend, 1)
+    backend.get_book_by_id(book_id)
+
+    backend.delete_book(book_id)
+
+    assert backend.get_book_by_id(book_id) is None
@@ -0,0 +1,62 @@
+import pytest
+
+from database.engines import SQLiteCursor
+from tests.factories import add_books
+
+QUERY = "SELECT book_id, title FROM books ORDER BY book_id"
+
+def fetch_sizes(monkeypatch):
+    """Record the size of every fetchmany() chunk a cursor returns"""
+    sizes = []
+    fetchmany = SQLiteCursor.fetchmany
+
+    def recording_fetchmany(cursor, size):
+        rows = fetchmany(cursor, size)
+        sizes.append(len(rows))
+        return rows
+
+    monkeypatch.setattr(SQLiteCursor, "fetchmany", recording_fetchmany)
+    return sizes
+
+def test_rows_stream_in_chunks(backend, monkeypatch):
+    add_books(backend, 5)
+    sizes = fetch_sizes(monkeypatch)
+
+    rows = list(backend.db.iter_query(QUERY, chunk_size=2))
+
+    assert [row['title'] for row in rows] == [f"Book {index:03d}" for index in range(5)]
+    assert sizes == [2, 2, 1, 0]
+
+def test_stream_holds_its_own_connection_until_exhausted(backend):
+    add_books(backend, 3)
+    pool = backend.db.pool
+    stream = backend.db.iter_query(QUERY, chunk_size=1)
+
+    next(stream)
+    assert pool.stats()['in_use'] == 1
+    # Other queries on this thread run on another connection meanwhile
+    assert backend.get_book_statistics()['total_books'] == 3
+    assert pool.stats()['in_use'] == 1
+
+    list(stream)
+    assert pool.stats()['in_use'] == 0
+
+def test_closing_the_stream_early_releases_the_connection(backend):
+    add_books(backend, 3)
+    stream = backend.db.iter_query(QUERY, chunk_size=1)
+    next(stream)
+
+    stream.close()
+
+    assert backend.db.pool.stats()['in_use'] == 0
+
+def test_failure_raises_instead_of_ending_early(db):
+    with pytest.raises(Exception):
+        list(db.iter_query("SELECT * FROM missing_table"))
+
+    assert db.pool.stats()['in_use'] == 0
+
+def test_backend_iterators_stream_every_row(backend):
+    add_books(backend, 4)
+
+    assert len(list(backend.iter_all_books(chunk_size=3))) == 4
@@ -0,0 +1,51 @@
+from tests.factories import add_books, add_borrowers, add_history
+
+def walk(fetch, cursor, page_size):
+    """Every row of a keyset listing, read page by page"""
+    rows = []
+    after = None
+    while True:
+        page = fetch(after, page_size)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        after = cursor(page[-1])
+
+def test_book_pages_cover_every_book_once_in_title_order(backend):
+    add_books(backend, 23)
+    # Equal titles are ordered, and seeked past, by book_id
+    for _ in range(4):
+        backend.add_book("Book 010", "Another", None, "Science", 2001, 1)
+
+    rows = walk(backend.get_books_page, lambda book: (book['title'], book['book_id']), 5)
+
+    assert len(rows) == 27
+    assert [(book['title'], book['book_id']) for book in rows] == \
+        sorted((book['title'], book['book_id']) for book in backend.get_all_books())
+
+def test_borrower_pages_cover_every_borrower_once(backend):
+    add_borrowers(backend, 12)
+
+    rows = walk(backend.get_borrowers_page, lambda borrower: (borrower['name'], borrower['borrower_id']), 5)
+
+    assert [borrower['name'] for borrower in rows] == [f"Borrower {index:03d}" for index in range(12)]
+
+def history_cursor(tx):
+    return (tx['created_at'], tx['transaction_id'])
+
+def test_history_pages_are_newest_first_without_gaps(backend):
+    ids = add_history(backend, 11)
+
+    rows = walk(backend.get_transactions_page, history_cursor, 4)
+
+    # Rows created in the same second fall back to transaction_id order
+    assert [tx['transaction_id'] for tx in rows] == sorted(ids, reverse=True)
+
+def test_history_pages_apply_status_filter(backend):
+    ids = add_history(backend, 11)
+
+    rows = walk(lambda after, limit: backend.get_transactions_page(after, limit, status='returned'),
+                history_cursor, 2)
+
+    assert sorted(tx['transaction_id'] for tx in rows) == sorted(ids[::3])
+    assert {tx['status'] for tx in rows} == {'returned'}
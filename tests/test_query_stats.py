@@ -0,0 +1,94 @@
+import json
+
+from database.query_stats import QueryStats, fingerprint, query_tag, tag_queries
+
+def test_fingerprint_groups_statements_differing_only_in_literals():
+    assert fingerprint("SELECT * FROM books WHERE book_id = 5") == \
+        fingerprint("SELECT *  FROM books WHERE book_id = %s")
+    assert fingerprint("SELECT * FROM books WHERE title = 'Dune' -- by title") == \
+        "SELECT * FROM books WHERE title = ?"
+    assert fingerprint("SELECT * FROM books WHERE book_id IN (1, 2, 3)") == \
+        fingerprint("SELECT * FROM books WHERE book_id IN (%s)")
+
+def test_calls_rows_and_errors_add_up_per_statement():
+    stats = QueryStats()
+    stats.record("SELECT * FROM books WHERE book_id = 1", 2.0, rows=1)
+    stats.record("SELECT * FROM books WHERE book_id = 2", 4.0, rows=1)
+    stats.record("SELECT * FROM books WHERE book_id = 3", 6.0, error=True)
+
+    [statement] = stats.snapshot()
+    assert statement['calls'] == 3
+    assert statement['rows'] == 2
+    assert statement['errors'] == 1
+    assert statement['total_ms'] == 12.0
+    assert statement['max_ms'] == 6.0
+    assert statement['p50_ms'] == 4.0
+
+def test_queries_are_counted_per_tag():
+    stats = QueryStats()
+    with query_tag("BooksPage.refresh"):
+        stats.record("SELECT 1", 1.0)
+        stats.record("SELECT 2", 1.0)
+    stats.record("SELECT 1", 1.0)
+
+    assert stats.by_tag() == {"BooksPage.refresh": 2, "untagged": 1}
+
+def test_tag_queries_tags_public_methods_only():
+    stats = QueryStats()
+
+    @tag_queries
+    class Page:
+        def refresh(self):
+            stats.record("SELECT 1", 1.0)
+
+        def _helper(self):
+            stats.record("SELECT 2", 1.0)
+
+    Page().refresh()
+    Page()._helper()
+
+    assert stats.by_tag() == {"Page.refresh": 1, "untagged": 1}
+
+def test_slow_queries_are_logged():
+    stats = QueryStats(slow_query_ms=50.0)
+    stats.record("SELECT 1", 10.0)
+    stats.record("SELECT 2", 80.0)
+
+    [slow] = stats.slow_queries()
+    assert slow['fingerprint'] == "SELECT ?"
+    assert slow['elapsed_ms'] == 80.0
+
+def test_timed_block_records_failure():
+    stats = QueryStats()
+    try:
+        with stats.timed("SELECT 1"):
+            raise RuntimeError("driver error")
+    except RuntimeError:
+        pass
+
+    assert stats.snapshot()[0]['errors'] == 1
+
+def test_disabled_stats_record_nothing():
+    stats = QueryStats()
+    stats.enabled = False
+    stats.record("SELECT 1", 1.0)
+
+    assert stats.snapshot() == []
+
+def test_dump_writes_json_report(tmp_path):
+    stats = QueryStats()
+    stats.record("SELECT 1", 1.0)
+
+    path = stats.dump(str(tmp_path / "stats.json"))
+
+    with open(path) as file:
+        report = json.load(file)
+    assert report['statements'][0]['calls'] == 1
+
+def test_database_records_each_query(db):
+    db.execute_query("SELECT COUNT(*) FROM books", fetch=True)
+    db.execute_query("SELECT COUNT(*) FROM books", fetch=True)
+
+    [statement] = [row for row in db.query_stats() if "FROM books" in row['fingerprint']]
+    assert statement['calls'] == 2
+    assert statement['rows'] == 2
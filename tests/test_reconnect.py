@@ -0,0 +1,81 @@
+import os
+import time
+
+import pytest
+
+from database.db_connection import Database
+
+COUNT_BOOKS = "SELECT COUNT(*) AS total FROM books"
+INSERT_BOOK = "INSERT INTO books (title, author) VALUES (%s, %s)"
+
+def drop_connections(db):
+    """Close every pooled driver connection under the pool, as a server restart does"""
+    for conn in list(db.pool._idle):
+        conn.raw.close()
+
+@pytest.fixture
+def db(tmp_path):
+    # Never ping before reuse, so the dead connections are only found by the query
+    database = Database(engine="sqlite", sqlite_path=str(tmp_path / "library.db"), ping_after_idle=3600)
+    assert database.connect()
+    yield database
+    database.close()
+
+def test_read_is_replayed_once_on_a_fresh_connection(db):
+    db.execute_query(INSERT_BOOK, ("Dune", "Frank Herbert"))
+    drop_connections(db)
+
+    assert db.execute_query(COUNT_BOOKS, fetch=True) == [{'total': 1}]
+
+    [statement] = [row for row in db.query_stats() if "COUNT" in row['fingerprint']]
+    assert (statement['calls'], statement['errors']) == (2, 1)
+    assert db.connection_health()['disconnects'] == 1
+    assert db.connection_health()['state'] == 'up'
+
+def test_write_is_not_replayed(db):
+    drop_connections(db)
+
+    assert db.execute_query(INSERT_BOOK, ("Dune", "Frank Herbert")) is None
+    assert db.execute_query(COUNT_BOOKS, fetch=True) == [{'total': 0}]
+
+    # The dead connection was dropped, so the next write goes through
+    assert db.execute_query(INSERT_BOOK, ("Dune", "Frank Herbert"))
+    assert db.execute_query(COUNT_BOOKS, fetch=True) == [{'total': 1}]
+    assert db.connection_health()['disconnects'] == 1
+
+def test_unreachable_database_backs_off_then_reconnects(tmp_path):
+    folder = tmp_path / "not-yet"
+    database = Database(engine="sqlite", sqlite_path=str(folder / "library.db"),
+                        reconnect_backoff=0.05, reconnect_backoff_max=0.08)
+    attempts = []
+
+    assert not database.connect()
+    connect = database.engine.connect
+    database.engine.connect = lambda: attempts.append(1) or connect()
+
+    health = database.connection_health()
+    assert health['state'] == 'down'
+    assert health['outages'] == 1
+    assert 0 < health['retry_in'] <= 0.05
+    assert health['last_error']
+
+    # Inside the backoff window calls fail fast without trying to connect
+    assert database.execute_query(COUNT_BOOKS, fetch=True) is None
+    assert attempts == []
+
+    # Once it has passed, a failed attempt doubles the wait, up to the maximum
+    time.sleep(0.06)
+    assert database.execute_query(COUNT_BOOKS, fetch=True) is None
+    assert attempts == [1]
+    assert database._backoff == 0.08
+    assert database.connection_health()['outages'] == 1
+
+    os.makedirs(folder)
+    time.sleep(0.09)
+    assert database.execute_query(COUNT_BOOKS, fetch=True) == [{'total': 0}]
+
+    health = database.connection_health()
+    assert health['state'] == 'up'
+    assert (health['outages'], health['reconnects']) == (1, 1)
+    assert health['downtime'] > 0
+    database.close()
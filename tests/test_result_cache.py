@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+from backend.result_cache import ResultCache
+from database.table_versions import TableVersions
+from tests.factories import add_books, add_borrowers
+
+def test_write_changes_only_its_table_snapshot():
+    versions = TableVersions()
+    books = versions.snapshot(("books",))
+    borrowers = versions.snapshot(("borrowers",))
+
+    versions.bump({"books"})
+
+    assert versions.snapshot(("books",)) != books
+    assert versions.snapshot(("borrowers",)) == borrowers
+
+def test_bump_follows_cascades():
+    versions = TableVersions()
+    transactions = versions.snapshot(("transactions",))
+
+    versions.bump({"borrowers"})
+
+    assert versions.snapshot(("transactions",)) != transactions
+
+def test_unknown_write_changes_every_snapshot():
+    versions = TableVersions()
+    before = versions.snapshot(("books",))
+
+    versions.bump(None)
+
+    assert versions.snapshot(("books",)) != before
+
+def test_result_is_reused_until_its_table_changes():
+    cache = ResultCache()
+    versions = TableVersions()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'total': len(calls)}
+
+    assert cache.get_or_compute("stats", versions, ("books",), compute) == {'total': 1}
+    assert cache.get_or_compute("stats", versions, ("books",), compute) == {'total': 1}
+    versions.bump({"borrowers"})
+    assert cache.get_or_compute("stats", versions, ("books",), compute) == {'total': 1}
+    versions.bump({"books"})
+    assert cache.get_or_compute("stats", versions, ("books",), compute) == {'total': 2}
+
+def test_empty_results_are_not_cached():
+    cache = ResultCache()
+    versions = TableVersions()
+    calls = []
+
+    cache.get_or_compute("report", versions, ("books",), lambda: calls.append(1) or [])
+    cache.get_or_compute("report", versions, ("books",), lambda: calls.append(1) or [])
+
+    assert len(calls) == 2
+
+def test_cached_results_are_copies():
+    cache = ResultCache()
+    versions = TableVersions()
+    cache.get_or_compute("report", versions, ("books",), lambda: [{'count': 1}])[0]['count'] = 99
+
+    assert cache.get_or_compute("report", versions, ("books",), lambda: []) == [{'count': 1}]
+
+def test_backend_statistics_follow_writes(backend):
+    add_books(backend, 2)
+    assert backend.get_book_statistics()['total_books'] == 2
+
+    add_books(backend, 1)
+
+    assert backend.get_book_statistics()['total_books'] == 3
+
+def test_overdue_books_are_keyed_on_the_date_asked_for(backend):
+    [book_id] = add_books(backend, 1)
+    [borrower_id] = add_borrowers(backend, 1)
+    borrowed = date.today()
+    backend.borrow_book(book_id, borrower_id, borrowed, borrowed + timedelta(days=14))
+
+    assert backend.get_overdue_books(borrowed) == []
+    # Same tables, later day: not served from the entry cached above
+    later = backend.get_overdue_books(borrowed + timedelta(days=20))
+    assert [loan['book_id'] for loan in later] == [book_id]
+    assert later[0]['days_overdue'] == 6
@@ -0,0 +1,46 @@
+import pytest
+
+from database.row_formats import check_row_format, convert_rows, record_class
+
+DESCRIPTION = (("book_id",), ("title",))
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        check_row_format("json")
+
+def test_tuple_rows_pass_through():
+    rows = [(1, "Dune")]
+    assert convert_rows(rows, DESCRIPTION, "tuple") is rows
+
+def test_record_rows_have_attribute_access():
+    [row] = convert_rows([(1, "Dune")], DESCRIPTION, "record")
+
+    assert row.book_id == 1
+    assert row.title == "Dune"
+    assert row == (1, "Dune")
+
+def test_record_class_is_built_once_per_shape():
+    assert record_class(("book_id", "title")) is record_class(("book_id", "title"))
+
+def test_invalid_column_names_are_renamed():
+    [row] = convert_rows([(3,)], (("COUNT(*)",),), "record")
+    assert row[0] == 3
+
+@pytest.mark.parametrize("row_format, expected", [
+    ("dict", {'book_id': 1, 'title': "Dune"}),
+    ("tuple", (1, "Dune")),
+    ("record", (1, "Dune")),
+])
+def test_execute_query_returns_each_shape(db, row_format, expected):
+    db.execute_query("INSERT INTO books (title, author) VALUES (%s, %s)", ("Dune", "Frank Herbert"))
+
+    [row] = db.execute_query("SELECT book_id, title FROM books", fetch=True, row_format=row_format)
+
+    assert row == expected
+
+def test_iter_query_returns_records(db):
+    db.execute_query("INSERT INTO books (title, author) VALUES (%s, %s)", ("Dune", "Frank Herbert"))
+
+    [row] = db.iter_query("SELECT book_id, title FROM books", row_format="record")
+
+    assert row.title == "Dune"
@@ -0,0 +1,125 @@
+from components.widgets import RowSource
+from tests.factories import add_history
+
+ROWS = list(range(25))
+
+def fetch(after, limit):
+    """Keyset fetch over ROWS: the rows greater than after"""
+    start = 0 if after is None else after + 1
+    return ROWS[start:start + limit]
+
+def cursor(row):
+    return row
+
+def seek(position):
+    return ROWS[position - 1] if position <= len(ROWS) else None
+
+def read(source, start, stop):
+    """Read what rows start..stop need, as VirtualTreeview does off the Tk thread"""
+    chunks = source.missing(start, stop)
+    if chunks is not None:
+        source.store(chunks[0], source.reader(*chunks)())
+    return chunks
+
+def test_of_holds_every_row():
+    source = RowSource.of(ROWS, chunk_size=10)
+
+    assert source.length() == 25
+    assert [source.row(index) for index in (0, 12, 24)] == [0, 12, 24]
+    assert source.row(25) is None
+    assert source.missing(0, 40) is None
+
+def test_far_chunk_is_read_through_one_seek():
+    seeks = []
+    source = RowSource(fetch, cursor, seek=lambda position: seeks.append(position) or seek(position),
+                       chunk_size=5)
+
+    assert read(source, 15, 20) == (3, 3)
+
+    assert seeks == [15]
+    assert [source.row(index) for index in range(15, 20)] == [15, 16, 17, 18, 19]
+    assert source.row(0) is None
+
+def test_next_chunk_reads_on_from_the_one_before():
+    seeks = []
+    source = RowSource(fetch, cursor, seek=lambda position: seeks.append(position) or seek(position),
+                       chunk_size=5)
+    read(source, 0, 5)
+
+    read(source, 5, 10)
+
+    assert seeks == []
+    assert source.row(9) == 9
+
+def test_short_chunk_fixes_the_length():
+    source = RowSource(fetch, cursor, seek=seek, total=100, chunk_size=10)
+    assert source.length() == 100
+
+    read(source, 20, 30)
+
+    assert source.end == 25
+    assert source.length() == 25
+    assert source.missing(20, 40) is None
+
+def test_seek_past_the_end_fixes_the_length():
+    source = RowSource(fetch, cursor, seek=seek, chunk_size=10)
+
+    read(source, 40, 50)
+
+    assert source.end == 40
+
+def test_without_seek_reading_starts_after_the_last_chunk_held():
+    source = RowSource(fetch, cursor, chunk_size=5)
+    read(source, 0, 5)
+
+    assert source.missing(15, 20) == (1, 3)
+    read(source, 15, 20)
+    assert source.row(17) == 17
+
+def test_without_seek_reading_past_an_empty_chunk_finds_nothing():
+    source = RowSource(fetch, cursor, chunk_size=5)
+    source.store(0, [[]])
+
+    assert source.reader(1, 2)() == []
+    assert source.end == 0
+
+def test_evict_drops_chunks_farthest_from_the_view():
+    source = RowSource(fetch, cursor, seek=seek, chunk_size=5, max_chunks=2)
+    read(source, 0, 20)
+
+    source.evict(16)
+
+    assert source.row(0) is None
+    assert source.row(5) is None
+    assert [source.row(index) for index in (10, 15)] == [10, 15]
+
+def test_history_cursor_seeks_to_a_position(backend):
+    add_history(backend, 11)
+    everything = backend.get_transactions_page(None, 100)
+
+    cursor = backend.get_transactions_cursor(6)
+    page = backend.get_transactions_page(cursor, 3)
+
+    assert page == everything[6:9]
+    assert backend.get_transactions_cursor(12) is None
+
+def test_history_cursor_honours_status_filter(backend):
+    add_history(backend, 11)
+    borrowed = backend.get_transactions_page(None, 100, status='borrowed')
+
+    cursor = backend.get_transactions_cursor(2, status='borrowed')
+
+    assert backend.get_transactions_page(cursor, 2, status='borrowed') == borrowed[2:4]
+
+def test_row_source_walks_history(backend):
+    add_history(backend, 11)
+    everything = backend.get_transactions_page(None, 100)
+    source = RowSource(backend.get_transactions_page,
+                       lambda tx: (tx['created_at'], tx['transaction_id']),
+                       seek=backend.get_transactions_cursor, chunk_size=4)
+
+    read(source, 8, 12)
+    read(source, 0, 8)
+
+    assert source.end == 11
+    assert [source.row(index) for index in range(11)] == everything
@@ -0,0 +1,79 @@
+from backend.search_index import CatalogIndex, tokenize
+
+BOOKS = [
+    {'book_id': 1, 'title': "Dune", 'author': "Frank Herbert", 'category': "Science Fiction",
+     'isbn': "978-0-441-01359-3"},
+    {'book_id': 2, 'title': "Dune Messiah", 'author': "Frank Herbert", 'category': "Science Fiction",
+     'isbn': "9780441172696"},
+    {'book_id': 3, 'title': "The Left Hand of Darkness", 'author': "Ursula K. Le Guin",
+     'category': "Science Fiction", 'isbn': "9780441478125"},
+    {'book_id': 4, 'title': "Frankenstein", 'author': "Mary Shelley", 'category': "Gothic",
+     'isbn': "9780486282114"},
+]
+
+def built_index():
+    index = CatalogIndex()
+    index.build(BOOKS)
+    return index
+
+def ids(results):
+    return [book_id for book_id, _ in results]
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Émile ZOLA's Œuvre") == ["emile", "zola", "s", "œuvre"]
+
+def test_every_term_must_match():
+    assert sorted(ids(built_index().search("dune herbert"))) == [1, 2]
+    assert ids(built_index().search("dune shelley")) == []
+
+def test_last_term_matches_as_prefix():
+    assert ids(built_index().search("darkn")) == [3]
+    assert sorted(ids(built_index().search("frank"))) == [1, 2, 4]
+
+def test_title_match_outranks_author_match():
+    # "frank" starts a title word of book 4 but only an author name of books 1 and 2
+    assert ids(built_index().search("frank"))[0] == 4
+
+def test_isbn_matches_with_or_without_hyphens():
+    index = built_index()
+    assert ids(index.search("9780441013593")) == [1]
+    assert ids(index.search("978-0-441-01359-3")) == [1]
+
+def test_stopwords_only_query_finds_nothing():
+    assert built_index().search("the of") == []
+
+def test_add_and_remove_keep_index_current():
+    index = built_index()
+    index.add({'book_id': 5, 'title': "Children of Dune", 'author': "Frank Herbert",
+               'category': "Science Fiction", 'isbn': None})
+    assert 5 in ids(index.search("children dune"))
+
+    index.add({'book_id': 5, 'title': "Renamed", 'author': "Someone", 'category': "", 'isbn': None})
+    assert ids(index.search("children")) == []
+
+    index.remove(5)
+    assert ids(index.search("renamed")) == []
+
+def test_backend_search_follows_writes(backend):
+    book_id = backend.add_book("Dune", "Frank Herbert", "9780441013593", "Science Fiction", 1965, 1)
+    assert [book['book_id'] for book in backend.search_catalog("dune")] == [book_id]
+
+    backend.update_book(book_id, "Arrakis", "Frank Herbert", "9780441013593", "Science Fiction", 1965, 1)
+    assert backend.search_catalog("dune") == []
+    assert [book['title'] for book in backend.search_catalog("arrakis")] == ["Arrakis"]
+
+def test_failed_build_is_not_marked_built(backend, monkeypatch):
+    backend.add_book("Dune", "Frank Herbert", "9780441013593", "Science Fiction", 1965, 1)
+
+    def broken_stream(query, params=None, chunk_size=500, row_format="dict"):
+        yield {'book_id': 1, 'title': "Dune", 'author': "", 'category': "", 'isbn': ""}
+        raise ConnectionError("lost connection mid-read")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(backend.db, "iter_query", broken_stream)
+        backend.search_catalog("dune")
+        assert not backend.search_index.built
+
+    # The next search builds the index again once the database answers
+    assert [book['title'] for book in backend.search_catalog("dune")] == ["Dune"]
+    assert backend.search_index.built
@@ -0,0 +1,78 @@
+from database.statement_cache import StatementCache
+
+class FakeCursor:
+    def __init__(self, query_number):
+        self.query_number = query_number
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self):
+        self.prepared = []
+
+    def cursor(self, prepared=False, dictionary=False):
+        self.prepared.append(dictionary)
+        return FakeCursor(len(self.prepared))
+
+def test_same_statement_reuses_its_cursor():
+    cache = StatementCache(FakeConnection())
+    first = cache.get("SELECT 1")
+
+    assert cache.get("SELECT 1") is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_row_shape_is_part_of_the_key():
+    connection = FakeConnection()
+    cache = StatementCache(connection)
+
+    assert cache.get("SELECT 1", dictionary=True) is not cache.get("SELECT 1", dictionary=False)
+    assert connection.prepared == [True, False]
+
+def test_least_recently_used_cursor_is_evicted_and_closed():
+    cache = StatementCache(FakeConnection(), capacity=2)
+    oldest = cache.get("SELECT 1")
+    cache.get("SELECT 2")
+    cache.get("SELECT 1")
+
+    cache.get("SELECT 3")
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert not oldest.closed
+    assert cache.get("SELECT 1") is oldest
+
+def test_invalidate_closes_and_forgets_the_cursor():
+    cache = StatementCache(FakeConnection())
+    broken = cache.get("SELECT 1")
+
+    cache.invalidate("SELECT 1")
+
+    assert broken.closed
+    assert cache.get("SELECT 1") is not broken
+
+def test_clear_closes_every_cursor():
+    cache = StatementCache(FakeConnection())
+    cursors = [cache.get("SELECT 1"), cache.get("SELECT 2")]
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert all(cursor.closed for cursor in cursors)
+
+def test_repeated_queries_hit_the_cache(db):
+    for _ in range(3):
+        db.execute_query("SELECT COUNT(*) AS total FROM books", fetch=True)
+
+    stats = db.statement_cache_stats()
+    assert stats['hits'] >= 2
+    assert stats['statements'] >= 1
+
+def test_failing_statement_is_dropped_from_the_cache(db):
+    query = "SELECT * FROM missing_table"
+
+    assert db.execute_query(query, fetch=True) is None
+
+    caches = list(db._statement_caches)
+    assert all((query, True) not in cache._cursors for cache in caches)
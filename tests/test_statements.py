@@ -0,0 +1,54 @@
+import pytest
+
+from database.statements import describe, READ, WRITE, INSERT
+
+@pytest.mark.parametrize("sql, kind, table", [
+    ("SELECT * FROM books", READ, None),
+    ("  select count(*) from borrowers", READ, None),
+    ("SHOW TABLES", READ, None),
+    ("WITH recent AS (SELECT * FROM transactions) SELECT * FROM recent", READ, None),
+    ("INSERT INTO books (title) VALUES (%s)", INSERT, "books"),
+    ("INSERT IGNORE INTO `Borrowers` (name) VALUES (%s)", INSERT, "borrowers"),
+    ("REPLACE INTO users (username) VALUES (%s)", INSERT, "users"),
+    ("UPDATE books SET copies = 2", WRITE, "books"),
+    ("DELETE FROM transactions WHERE transaction_id = %s", WRITE, "transactions"),
+    ("CREATE TABLE IF NOT EXISTS audit (id INT)", WRITE, "audit"),
+    ("WITH old AS (SELECT 1) DELETE FROM transactions", WRITE, "transactions"),
+])
+def test_describe_classifies_statement(sql, kind, table):
+    statement = describe(sql)
+    assert statement.kind == kind
+    assert statement.table == table
+
+def test_keywords_inside_strings_and_comments_are_ignored():
+    assert describe("/* DELETE FROM books */ SELECT 'UPDATE books' FROM books").is_read
+    assert describe("-- SELECT\nUPDATE books SET title = 'SELECT'").table == "books"
+
+def test_describe_is_cached_per_sql_text():
+    assert describe("SELECT 1") is describe("SELECT 1")
+
+def test_insert_returns_new_row_id(db):
+    first = db.execute_query("INSERT INTO books (title, author, copies, available_copies) VALUES ('A', 'B', 1, 1)")
+    second = db.execute_query("INSERT INTO books (title, author, copies, available_copies) VALUES ('C', 'D', 1, 1)")
+    assert second == first + 1
+
+def test_write_returns_row_count(db):
+    for title in ("A", "B", "C"):
+        db.execute_query("INSERT INTO books (title, author, copies, available_copies) VALUES (%s, 'X', 1, 1)",
+                         (title,))
+    assert db.execute_query("UPDATE books SET copies = 2 WHERE title <> %s", ("A",)) == 2
+
+def test_write_with_fetch_returns_none(db):
+    db.execute_query("INSERT INTO books (title, author, copies, available_copies) VALUES ('A', 'B', 1, 1)")
+
+    assert db.execute_query("UPDATE books SET copies = 3", fetch=True) is None
+    assert db.execute_query("SELECT copies FROM books", fetch=True) == [{'copies': 3}]
+
+def test_write_bumps_its_table_version(db):
+    books = db.table_versions.snapshot(("books",))
+    borrowers = db.table_versions.snapshot(("borrowers",))
+
+    db.execute_query("INSERT INTO books (title, author, copies, available_copies) VALUES ('A', 'B', 1, 1)")
+
+    assert db.table_versions.snapshot(("books",)) != books
+    assert db.table_versions.snapshot(("borrowers",)) == borrowers
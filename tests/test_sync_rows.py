@@ -0,0 +1,104 @@
+from components.widgets import ModernTreeview, _longest_increasing
+
+class FakeTree:
+    """The Treeview calls sync_rows makes, recorded instead of drawn"""
+    def __init__(self):
+        self._shown_values = {}
+        self.items = []
+        self.values = {}
+        self.calls = []
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def delete(self, *iids):
+        self.calls.append(("delete",) + iids)
+        for iid in iids:
+            self.items.remove(iid)
+            del self.values[iid]
+
+    def insert(self, parent, index, iid=None, values=()):
+        self.calls.append(("insert", iid))
+        self.items.insert(index, iid)
+        self.values[iid] = values
+
+    def item(self, iid, values=()):
+        self.calls.append(("item", iid))
+        self.values[iid] = values
+
+    def sync_rows(self, rows, key=None):
+        ModernTreeview.sync_rows(self, rows, key)
+
+    def shown(self):
+        return [self.values[iid] for iid in self.items]
+
+ROWS = [(1, "Dune"), (2, "Emma"), (3, "Ulysses"), (4, "Walden")]
+
+def synced_tree(rows=ROWS):
+    tree = FakeTree()
+    tree.sync_rows(rows)
+    tree.calls.clear()
+    return tree
+
+def test_first_sync_inserts_every_row():
+    tree = FakeTree()
+
+    tree.sync_rows(ROWS)
+
+    assert tree.shown() == ROWS
+    assert tree.calls == [("insert", "1"), ("insert", "2"), ("insert", "3"), ("insert", "4")]
+
+def test_unchanged_rows_are_not_touched():
+    tree = synced_tree()
+
+    tree.sync_rows(ROWS)
+
+    assert tree.calls == []
+
+def test_changed_row_is_updated_in_place():
+    tree = synced_tree()
+    rows = [ROWS[0], (2, "Emma, revised"), ROWS[2], ROWS[3]]
+
+    tree.sync_rows(rows)
+
+    assert tree.shown() == rows
+    assert tree.calls == [("item", "2")]
+
+def test_new_and_deleted_rows_touch_only_themselves():
+    tree = synced_tree()
+    rows = [ROWS[0], (5, "Beloved"), ROWS[2], ROWS[3]]
+
+    tree.sync_rows(rows)
+
+    assert tree.shown() == rows
+    assert tree.calls == [("delete", "2"), ("insert", "5")]
+
+def test_moved_row_is_the_only_one_reinserted():
+    tree = synced_tree()
+    rows = [ROWS[3], ROWS[0], ROWS[1], ROWS[2]]
+
+    tree.sync_rows(rows)
+
+    assert tree.shown() == rows
+    assert tree.calls == [("delete", "4"), ("insert", "4")]
+
+def test_duplicate_keys_keep_the_first_row():
+    tree = FakeTree()
+
+    tree.sync_rows([(1, "Dune"), (1, "Dune again")])
+
+    assert tree.shown() == [(1, "Dune")]
+
+def test_custom_key():
+    tree = FakeTree()
+    tree.sync_rows([("Dune", 1), ("Emma", 2)], key=lambda values: values[1])
+
+    assert tree.items == ["1", "2"]
+
+def test_longest_increasing_keeps_the_largest_ordered_run():
+    position = {item: index for index, item in enumerate("abcde")}
+
+    assert _longest_increasing(list("eabcd"), position) == set("abcd")
+    assert _longest_increasing(list("badce"), position) in ({"a", "c", "e"}, {"b", "d", "e"},
+                                                           {"a", "d", "e"}, {"b", "c", "e"})
+    assert _longest_increasing([], position) == set()
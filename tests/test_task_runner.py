@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from components import task_runner
+from components.task_runner import TaskRunner
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks only run when the test polls"""
+    def after(self, ms, callback):
+        pass
+
+@pytest.fixture
+def runner(monkeypatch):
+    shown = []
+    monkeypatch.setattr(task_runner.MessageBox, "show_error", shown.append)
+    tasks = TaskRunner(FakeRoot(), max_workers=2)
+    tasks.shown_errors = shown
+    yield tasks
+    tasks.shutdown()
+
+def finish(runner, *tasks):
+    """Wait for the workers, then deliver their results as the Tk poll would"""
+    for task in tasks:
+        task.future.result(timeout=5)
+    runner._poll()
+
+def test_result_goes_to_on_done(runner):
+    results = []
+    task = runner.submit(lambda: 42, results.append)
+
+    finish(runner, task)
+
+    assert results == [42]
+
+def test_work_error_goes_to_on_error(runner):
+    errors = []
+    task = runner.submit(lambda: 1 / 0, on_error=errors.append)
+
+    finish(runner, task)
+
+    assert isinstance(errors[0], ZeroDivisionError)
+
+def test_on_done_error_goes_to_on_error(runner):
+    errors = []
+    stats = {'total_fines': None}
+    task = runner.submit(lambda: stats, lambda stats: f"${stats['total_fines']:.2f}",
+                         on_error=errors.append)
+
+    finish(runner, task)
+
+    assert isinstance(errors[0], TypeError)
+
+def test_unhandled_errors_are_shown(runner):
+    def show(result):
+        raise ValueError("bad row")
+    task = runner.submit(lambda: 1, show)
+
+    finish(runner, task)
+
+    assert runner.shown_errors == ["Operation failed: bad row"]
+
+def test_broken_error_handler_does_not_stop_later_tasks(runner):
+    def broken(error):
+        raise RuntimeError("handler failed")
+    results = []
+    first = runner.submit(lambda: 1 / 0, on_error=broken)
+    second = runner.submit(lambda: "next", results.append)
+
+    finish(runner, first, second)
+
+    assert results == ["next"]
+
+def test_same_key_replaces_the_pending_task(runner):
+    release = threading.Event()
+    results = []
+    owner = object()
+    first = runner.submit(lambda: release.wait(5) and "old", results.append, owner=owner, key="load")
+    second = runner.submit(lambda: "new", results.append, owner=owner, key="load")
+    release.set()
+
+    finish(runner, first, second)
+
+    assert results == ["new"]
+
+def test_cancel_drops_the_owners_tasks(runner):
+    release = threading.Event()
+    results = []
+    page, other = object(), object()
+    runner.submit(lambda: release.wait(5), results.append, owner=page, key="a")
+    runner.submit(lambda: release.wait(5), results.append, owner=page, key="b")
+    kept = runner.submit(lambda: "other page", results.append, owner=other)
+
+    assert runner.cancel(page) == 2
+    release.set()
+    finish(runner, kept)
+
+    assert results == ["other page"]
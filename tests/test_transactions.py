@@ -0,0 +1,122 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from database.engines import DriverError
+from tests.factories import add_books, add_borrowers
+
+def test_borrow_takes_a_copy_and_return_puts_it_back(backend):
+    [book_id] = add_books(backend, 1, copies=2)
+    [borrower_id] = add_borrowers(backend, 1)
+
+    transaction_id, message = backend.borrow_book(book_id, borrower_id)
+    assert transaction_id, message
+    assert backend.get_book_by_id(book_id)['available_copies'] == 1
+
+    success, message = backend.return_book(transaction_id)
+    assert success, message
+    assert backend.get_book_by_id(book_id)['available_copies'] == 2
+    assert backend.get_transaction_by_id(transaction_id)['status'] == 'returned'
+
+def test_borrow_refuses_when_no_copy_is_left(backend):
+    [book_id] = add_books(backend, 1, copies=1)
+    first, second = add_borrowers(backend, 2)
+    assert backend.borrow_book(book_id, first)[0]
+
+    transaction_id, message = backend.borrow_book(book_id, second)
+
+    assert transaction_id is None
+    assert message == "Book not available for borrowing"
+    assert backend.get_book_by_id(book_id)['available_copies'] == 0
+
+def test_borrow_refuses_borrower_with_overdue_loan(backend):
+    first_book, second_book = add_books(backend, 2)
+    [borrower_id] = add_borrowers(backend, 1)
+    borrowed = date.today() - timedelta(days=30)
+    assert backend.borrow_book(first_book, borrower_id, borrowed, borrowed + timedelta(days=14))[0]
+
+    transaction_id, message = backend.borrow_book(second_book, borrower_id)
+
+    assert transaction_id is None
+    assert message == "Borrower has 1 overdue book(s)"
+    # The refused checkout was rolled back
+    assert backend.get_book_by_id(second_book)['available_copies'] == 1
+
+def test_borrow_refuses_unknown_borrower(backend):
+    [book_id] = add_books(backend, 1)
+
+    transaction_id, message = backend.borrow_book(book_id, 999)
+
+    assert transaction_id is None
+    assert message == "Borrower not found"
+    assert backend.get_book_by_id(book_id)['available_copies'] == 1
+
+def test_concurrent_borrows_lend_the_last_copy_once(backend):
+    [book_id] = add_books(backend, 1, copies=1)
+    borrower_ids = add_borrowers(backend, 6)
+    results = []
+    start = threading.Barrier(len(borrower_ids))
+
+    def borrow(borrower_id):
+        start.wait()
+        results.append(backend.borrow_book(book_id, borrower_id))
+
+    threads = [threading.Thread(target=borrow, args=(borrower_id,)) for borrower_id in borrower_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len([transaction_id for transaction_id, _ in results if transaction_id]) == 1
+    assert backend.get_book_by_id(book_id)['available_copies'] == 0
+    assert len(backend.get_active_loans()) == 1
+
+def test_late_return_charges_a_fine(backend):
+    [book_id] = add_books(backend, 1)
+    [borrower_id] = add_borrowers(backend, 1)
+    borrowed = date(2026, 1, 1)
+    transaction_id, _ = backend.borrow_book(book_id, borrower_id, borrowed, borrowed + timedelta(days=14))
+
+    success, message = backend.return_book(transaction_id, borrowed + timedelta(days=17))
+
+    assert success
+    assert message == "Book returned successfully. Fine: $15.00"
+    assert float(backend.get_transaction_by_id(transaction_id)['fine_amount']) == 15.0
+
+def test_second_return_is_refused_and_keeps_copies(backend):
+    [book_id] = add_books(backend, 1)
+    [borrower_id] = add_borrowers(backend, 1)
+    transaction_id, _ = backend.borrow_book(book_id, borrower_id)
+    assert backend.return_book(transaction_id)[0]
+
+    success, message = backend.return_book(transaction_id)
+
+    assert not success
+    assert message == "Book already returned"
+    assert backend.get_book_by_id(book_id)['available_copies'] == 1
+
+def test_transaction_rolls_back_on_error(db):
+    db.execute_query("INSERT INTO books (title, author, copies, available_copies) VALUES ('T', 'A', 1, 1)")
+    try:
+        with db.transaction() as tx:
+            tx.execute("UPDATE books SET available_copies = 0")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    assert db.execute_query("SELECT available_copies FROM books", fetch=True)[0]['available_copies'] == 1
+
+def test_failed_query_inside_transaction_rolls_back_the_whole_block(db):
+    db.execute_query("INSERT INTO books (title, author, copies, available_copies) VALUES ('T', 'A', 1, 1)")
+    with pytest.raises(DriverError):
+        with db.transaction() as tx:
+            tx.execute("UPDATE books SET available_copies = 0")
+            db.execute_query("INSERT INTO no_such_table (x) VALUES (1)")
+            tx.execute("UPDATE books SET copies = 5")
+
+    row = db.execute_query("SELECT copies, available_copies FROM books", fetch=True)[0]
+    assert (row['copies'], row['available_copies']) == (1, 1)
+
+def test_failed_query_outside_transaction_still_returns_none(db):
+    assert db.execute_query("INSERT INTO no_such_table (x) VALUES (1)") is None
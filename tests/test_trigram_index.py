@@ -0,0 +1,146 @@
+import os
+
+import pytest
+
+from backend import trigram_index
+from backend.trigram_index import TrigramIndex, trigrams
+
+BOOKS = [
+    {'book_id': 1, 'title': "Dune", 'author': "Frank Herbert"},
+    {'book_id': 2, 'title': "Foundation", 'author': "Isaac Asimov"},
+    {'book_id': 3, 'title': "Neuromancer", 'author': "William Gibson"},
+]
+
+def built_index():
+    index = TrigramIndex("book_id", ("title", "author"))
+    index.build(BOOKS)
+    return index
+
+def ids(results):
+    return [row_id for row_id, _ in results]
+
+def test_trigrams_are_padded():
+    assert trigrams("dune") == {"  d", " du", "dun", "une", "ne "}
+
+def test_misspelled_words_still_match():
+    index = built_index()
+    assert ids(index.search("fundation")) == [2]
+    assert ids(index.search("asimof")) == [2]
+    assert ids(index.search("nuromancer gibsen")) == [3]
+
+def test_every_word_must_match():
+    assert built_index().search("foundation gibson") == []
+
+def test_exact_match_ranks_first():
+    index = built_index()
+    index.add({'book_id': 4, 'title': "Dunes", 'author': "Someone"})
+    assert ids(index.search("dune"))[0] == 1
+
+def test_unrelated_text_finds_nothing():
+    assert built_index().search("zzzz") == []
+
+def test_stopwords_are_neither_indexed_nor_searched():
+    index = TrigramIndex("book_id", ("title",))
+    index.build([{'book_id': 1, 'title': "The Lord of the Rings"}])
+
+    assert index.stats()['words'] == 2
+    assert index.search("the of") == []
+    assert ids(index.search("lord of the ring")) == [1]
+
+class Reads:
+    rows = 0
+
+class CountingRows(set):
+    """Posting list that counts the row ids a search walks"""
+    def __iter__(self):
+        for row_id in super().__iter__():
+            Reads.rows += 1
+            yield row_id
+
+class CountingDocuments(dict):
+    """Row id -> word ids, counting the rows a search looks up"""
+    def __getitem__(self, row_id):
+        Reads.rows += 1
+        return super().__getitem__(row_id)
+
+def test_broad_words_read_a_bounded_number_of_rows(monkeypatch):
+    monkeypatch.setattr(trigram_index, "MAX_CANDIDATES", 20)
+    monkeypatch.setattr(Reads, "rows", 0)
+    index = TrigramIndex("book_id", ("title",))
+    index.build({'book_id': book_id, 'title': f"History of war {book_id}"} for book_id in range(1, 1001))
+    index._postings = [CountingRows(posting) for posting in index._postings]
+    index._documents = CountingDocuments(index._documents)
+
+    results = index.search("histroy war", limit=5)
+
+    assert len(results) == 5
+    # 20 candidates from one word, each checked once for the other
+    assert Reads.rows <= 40
+
+def test_rare_word_narrows_the_broad_ones():
+    index = TrigramIndex("book_id", ("title",))
+    rows = [{'book_id': book_id, 'title': f"History of war volume {book_id}"} for book_id in range(1, 1001)]
+    rows.append({'book_id': 1001, 'title': "History of the Peloponnesian War"})
+    index.build(rows)
+
+    assert ids(index.search("peloponesian history war")) == [1001]
+
+def test_add_and_remove_keep_index_current():
+    index = built_index()
+    index.add({'book_id': 4, 'title': "Hyperion", 'author': "Dan Simmons"})
+    assert ids(index.search("hyperon")) == [4]
+
+    index.remove(4)
+    assert index.search("hyperion") == []
+    assert len(index) == 3
+
+def test_failed_build_leaves_index_empty_and_unbuilt():
+    index = built_index()
+
+    def broken_rows():
+        yield {'book_id': 9, 'title': "Partial", 'author': "Row"}
+        raise ConnectionError("lost connection mid-read")
+
+    with pytest.raises(ConnectionError):
+        index.build(broken_rows())
+
+    assert len(index) == 0
+    assert index.search("partial") == []
+
+def test_saved_index_loads_back(tmp_path):
+    path = str(tmp_path / "books.pickle")
+    built_index().save(path)
+
+    loaded = TrigramIndex("book_id", ("title", "author"))
+    assert loaded.load(path)
+    assert loaded.built
+    assert ids(loaded.search("fundation")) == [2]
+
+def test_index_saved_for_other_fields_is_not_loaded(tmp_path):
+    path = str(tmp_path / "books.pickle")
+    built_index().save(path)
+
+    assert not TrigramIndex("book_id", ("title",)).load(path)
+    assert not TrigramIndex("book_id", ("title", "author")).load(str(tmp_path / "missing.pickle"))
+
+def test_backend_fuzzy_search_and_saved_copy(backend):
+    backend.add_book("Foundation", "Isaac Asimov", "9780553293357", "Science Fiction", 1951, 1)
+
+    assert [book['title'] for book in backend.fuzzy_search_books("fundation")] == ["Foundation"]
+    backend.save_search_indexes()
+    assert os.path.exists(backend._index_path("books_fuzzy"))
+
+def test_backend_failed_build_is_neither_built_nor_saved(backend, monkeypatch):
+    backend.add_book("Foundation", "Isaac Asimov", "9780553293357", "Science Fiction", 1951, 1)
+
+    def broken_stream(query, params=None, chunk_size=500, row_format="dict"):
+        yield {'book_id': 1, 'title': "Foundation", 'author': "Isaac Asimov"}
+        raise ConnectionError("lost connection mid-read")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(backend.db, "iter_query", broken_stream)
+        assert backend.fuzzy_search_books("foundation") == []
+        assert not backend.book_fuzzy_index.built
+        assert not os.path.exists(backend._index_path("books_fuzzy"))
+
+    assert [book['title'] for book in backend.fuzzy_search_books("fundation")] == ["Foundation"]
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 import re
+import unicodedata
 
 def validate_email(email):
     """Validate email format"""
@@ -73,4 +74,11 @@ def validate_borrower_data(name, email):
         errors.append("Name must be at least 2 characters")
     if not validate_email(email):
         errors.append("Valid email is required")
-    return errors
\ No newline at end of file
+    return errors
+
+def fold_text(text):
+    """Lower-case, accent-free text, for matching the way the database collation does"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in text if not unicodedata.combining(char)).casefold()
@@ -0,0 +1,46 @@
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Taken when main.py first imports this module, before anything heavy is loaded
+PROCESS_START = time.perf_counter()
+
+class StartupTimer:
+    """Named checkpoints of a startup sequence, logged as one report.
+
+    mark(label) records the time since the previous checkpoint and since
+    start, so a report reads as a list of phases with a running total. The
+    same timer is shared by the main thread and the background preload.
+    """
+    def __init__(self, name, start=None):
+        self.name = name
+        self.start = PROCESS_START if start is None else start
+        self._last = self.start
+        self._marks = []           # (label, phase ms, total ms)
+        self._lock = threading.Lock()
+
+    def mark(self, label):
+        """End the current phase as label"""
+        now = time.perf_counter()
+        with self._lock:
+            self._marks.append((label, (now - self._last) * 1000, (now - self.start) * 1000))
+            self._last = now
+
+    def marks(self):
+        with self._lock:
+            return [{'phase': label, 'ms': round(phase, 1), 'total_ms': round(total, 1)}
+                    for label, phase, total in self._marks]
+
+    def report(self):
+        """Log every phase so far and return the total in ms"""
+        marks = self.marks()
+        lines = [f"  {mark['phase']:<32} {mark['ms']:>8.1f} ms {mark['total_ms']:>9.1f} ms"
+                 for mark in marks]
+        total = marks[-1]['total_ms'] if marks else 0.0
+        logger.info(f"{self.name} took {total:.1f} ms\n" + "\n".join(lines))
+        return total
+
+# Process start to the login screen
+STARTUP = StartupTimer("Startup")